@@ -0,0 +1,105 @@
+"""
+Benchmark of the arrival scheduler against the previous rejection sampling of the DNA
+sequences. The previous setup process drew random DNA sequences until it found one not yet
+synthesized, so the draws per arrival grew as the dataset was consumed, and it never stopped
+once the dataset was exhausted. For each dataset size, 99% of the dataset is consumed by both
+samplers, and the draws and the wall time per arrival, overall and over the last 1% of the
+arrivals, are reported.
+Then a small dataset is synthesized until it is exhausted with each arrival process, the
+trace replaying the arrivals of the uniform arrivals, and the DNA sequences arrived and
+synthesized, the time of the last arrival and the wall time are reported.
+
+Run from the root of the repository:
+    python -m benchmarks.arrival_scheduler_benchmark
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import numpy as np
+import pandas as pd
+from src.simulation import ProteinSinthesisProcess
+from src.utils.arrivals import ArrivalScheduler, ArrivalProcess, ARRIVAL_PROCESSES, TRACE, TRACE_COLUMN
+
+DATASET_SIZES = [10_000, 100_000, 1_000_000]
+CONSUMED_FRACTION = 0.99
+NUMBER_GENES = 60
+GENE_LENGTH = 600
+SIMULATION_TIME = 100_000 # seconds, long enough to exhaust the dataset
+
+def rejection_sampling(number_sequences, arrivals, rng):
+    """
+    Draw arrivals as the previous setup process, return the draws of each arrival.
+    """
+    available = np.ones(number_sequences, dtype=bool)
+    draws = np.zeros(arrivals, dtype=np.int64)
+    for arrival in range(arrivals):
+        while True:
+            draws[arrival] += 1
+            sequence_id = rng.randrange(number_sequences)
+            if available[sequence_id]:
+                available[sequence_id] = False
+                break
+    return draws
+
+def scheduler_sampling(number_sequences, arrivals, seed):
+    """
+    Draw arrivals with the arrival scheduler, one draw per arrival.
+    """
+    scheduler = ArrivalScheduler(number_sequences, ArrivalProcess(), seed)
+    for arrival, (delay, sequence_id) in zip(range(arrivals), scheduler):
+        pass
+    return np.ones(arrivals, dtype=np.int64)
+
+def run_sampling(dataset_sizes, seed):
+    print(f'{"sampler":>10} {"rows":>9} {"draws/arrival":>14} {"last 1% draws/arrival":>22} {"us/arrival":>11}')
+    for dataset_size in dataset_sizes:
+        arrivals = int(dataset_size * CONSUMED_FRACTION)
+        tail = max(arrivals - int(dataset_size * (CONSUMED_FRACTION - 0.01)), 1)
+        for sampler in ('rejection', 'scheduler'):
+            start = time.perf_counter()
+            if sampler == 'rejection':
+                draws = rejection_sampling(dataset_size, arrivals, random.Random(seed))
+            else:
+                draws = scheduler_sampling(dataset_size, arrivals, seed)
+            wall_time = time.perf_counter() - start
+            print(f'{sampler:>10} {dataset_size:>9} {draws.mean():>14.2f} {draws[-tail:].mean():>22.1f} '
+                f'{wall_time / arrivals * 1e6:>11.2f}')
+
+def make_genes(number_genes, seed):
+    rng = random.Random(seed)
+    return pd.DataFrame([{'ID': f'gene{i}', 'category': 'random',
+        'sequence': 'TATAAAA' + ''.join(rng.choice('ACGT') for _ in range(GENE_LENGTH))} for i in range(number_genes)])
+
+def simulate(genes_df, seed, **arrivals):
+    with contextlib.redirect_stdout(io.StringIO()): # silence the simulation
+        process = ProteinSinthesisProcess(genes_df, number_resources=20, number_rna_polymerases=3,
+            number_ribosomes=3, number_rna_transfers_per_codon=50, random_seed=seed, **arrivals)
+        start = time.perf_counter()
+        process.run(SIMULATION_TIME)
+        wall_time = time.perf_counter() - start
+    return process, wall_time
+
+def run_simulations(number_genes, seed):
+    genes_df = make_genes(number_genes, seed)
+    trace = None
+
+    print(f'\n{"arrivals":>10} {"DNA seqs arrived":>17} {"synthesized":>12} {"last arrival (s)":>17} {"wall time (s)":>14}')
+    for arrival_process in ARRIVAL_PROCESSES:
+        process, wall_time = simulate(genes_df, seed, arrival_process=arrival_process, arrival_trace=trace)
+        df = process.dna_sequences_df
+        if trace is None: # replay the first arrivals in the trace
+            trace = df[TRACE_COLUMN].dropna().tolist()
+        print(f'{arrival_process:>10} {len(process.arrivals) - process.arrivals.remaining():>17} '
+            f'{df["protein_synthesized"].notna().sum():>12} {df[TRACE_COLUMN].max():>17.1f} {wall_time:>14.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DATASET_SIZES)
+    parser.add_argument('--genes', type=int, default=NUMBER_GENES)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run_sampling(args.sizes, args.seed)
+    run_simulations(args.genes, args.seed)
@@ -0,0 +1,66 @@
+"""
+Benchmark of the latency sketches of the resources against the full history. Processes
+request a resource, as the RNA polymerases, the ribosomes or the transfer RNA of a codon in
+a pool, at random times and use it for a random time. The p50, p95 and p99 of the wait time
+and the usage time estimated by the sketches are compared with the exact percentiles of the
+full history, and the number of buckets of the sketches is reported with the number of
+entries of the history.
+
+Run from the root of the repository:
+    python -m benchmarks.latency_sketch_benchmark
+"""
+import argparse
+import random
+import numpy as np
+import simpy
+from src.resources.resource import EukaryoticCellResource
+from src.resources.pool import EukaryoticCellPool, PoolResource
+from src.resources.latency import LATENCY_PERCENTILES
+
+NUMBER_REQUESTS = [1_000, 100_000]
+CAPACITY = 3
+MEAN_INTERARRIVAL_TIME = 1.
+MEAN_USAGE_TIME = 2.8 # close to the capacity, long queues
+
+def requester(env, resource, usage_time):
+    with resource.request() as request:
+        yield request
+        resource.available(request)
+        yield env.timeout(usage_time)
+
+def arrivals(env, resource, requests, rng):
+    for _ in range(requests):
+        yield env.timeout(round(rng.expovariate(1 / MEAN_INTERARRIVAL_TIME), 4))
+        env.process(requester(env, resource, round(rng.expovariate(1 / MEAN_USAGE_TIME), 4)))
+
+def make_resource(env, kind):
+    if kind == 'resource':
+        return EukaryoticCellResource(env, capacity=CAPACITY)
+    return PoolResource(EukaryoticCellPool(env, [CAPACITY]), 0)
+
+def run(numbers_requests, seed):
+    print(f'{"resource":>9} {"requests":>9} {"latency":>11} {"percentile":>11} {"history":>9} {"sketch":>9} '
+        f'{"rel. error":>11} {"entries":>8} {"buckets":>8}')
+    for kind in ('resource', 'pool'):
+        for requests in numbers_requests:
+            env = simpy.Environment()
+            resource = make_resource(env, kind)
+            env.process(arrivals(env, resource, requests, random.Random(seed)))
+            env.run()
+
+            history = resource.queue_history().to_numpy(copy=False) # views, the simulation has ended
+            for latency, sketch in [('wait_time', resource.wait_time_sketch), ('usage_time', resource.usage_time_sketch)]:
+                for percentile in LATENCY_PERCENTILES:
+                    exact = np.percentile(history[latency], percentile)
+                    estimate = sketch.quantile(percentile / 100)
+                    error = abs(estimate - exact) / exact if exact > 0 else abs(estimate - exact)
+                    print(f'{kind:>9} {requests:>9} {latency:>11} {f"p{percentile}":>11} {exact:>9.4f} '
+                        f'{estimate:>9.4f} {error:>11.2e} {len(history[latency]):>8} {len(sketch._buckets):>8}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, nargs='+', default=NUMBER_REQUESTS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.requests, args.seed)
@@ -0,0 +1,101 @@
+"""
+Benchmark of the event throughput of the array-backed molecules pool against the SimPy
+resources and containers. Processes acquire and release transfer RNA of random codons
+through TransferRNA, and get and release random amounts of nucleotides through
+Nucleotides. Each workload is run with the separate SimPy resources or containers and with
+the pool, and the number of processed events, the wall time, the events per second and the
+acquisitions per second are reported. The nucleotides workload is also run with the initial
+amounts of the parameters grids, as read from the json files (floats as 5e+4).
+
+Run from the root of the repository:
+    python -m benchmarks.molecules_pool_benchmark
+"""
+import argparse
+import json
+import random
+import time
+import simpy
+from src.resources.nucleotides import Nucleotides
+from src.resources.transfer_mrna import TransferRNA
+
+CODONS_PATH = 'data/codons.json'
+PARAMETERS_PATHS = ['data/parameters_ribosome.json', 'data/parameters_rna_polymerases.json']
+NUCLEOTIDES_PARAMETERS = ['uracil_initial_amount', 'adenine_initial_amount', 'guanine_initial_amount',
+    'cytosine_initial_amount']
+NUMBER_PROCESSES = 100
+ACQUISITIONS_PER_PROCESS = 2_000
+TRNA_PER_CODON = [1_000, 2] # without and with waiting requests
+NUCLEOTIDES_INITIAL_AMOUNT = 10_000
+MAX_NUCLEOTIDES_AMOUNT = 100 # maximum amount of nucleotides got at once
+ATTACH_TIME = 1e-3
+
+def trna_worker(env, trna, codons, acquisitions, rng):
+    for _ in range(acquisitions):
+        codon = rng.choice(codons)
+        with trna.trna_resources_dict[codon].request() as request:
+            yield request
+            trna.trna_resources_dict[codon].available(request)
+            yield env.timeout(ATTACH_TIME)
+
+def nucleotides_worker(env, nucleotides, acquisitions, rng):
+    for _ in range(acquisitions):
+        base, amount = rng.choice('UAGC'), rng.randint(1, MAX_NUCLEOTIDES_AMOUNT)
+        with nucleotides.request(base, amount) as request:
+            yield request
+        nucleotides.release(base, amount)
+        yield env.timeout(ATTACH_TIME)
+
+def simulate(env, workers):
+    """
+    Run the workers, return the number of processed events and the wall time.
+    """
+    for worker in workers:
+        env.process(worker)
+
+    events = 0
+    start = time.perf_counter()
+    while env.peek() < float('inf'):
+        env.step()
+        events += 1
+    return events, time.perf_counter() - start
+
+def trna_workload(use_pool, trna_per_codon, processes, acquisitions, seed):
+    env = simpy.Environment()
+    codons = list(json.load(open(CODONS_PATH)).keys())
+    trna = TransferRNA(env, amount=trna_per_codon, codons_list=codons, random_seed=seed, use_pool=use_pool)
+    rng = random.Random(seed)
+    return simulate(env, [trna_worker(env, trna, codons, acquisitions, rng) for _ in range(processes)])
+
+def nucleotides_workload(use_pool, processes, acquisitions, seed, initial_amounts=[NUCLEOTIDES_INITIAL_AMOUNT] * 4):
+    env = simpy.Environment()
+    nucleotides = Nucleotides(env, *initial_amounts, random_seed=seed, use_pool=use_pool)
+    rng = random.Random(seed)
+    return simulate(env, [nucleotides_worker(env, nucleotides, acquisitions, rng) for _ in range(processes)])
+
+def run(processes, acquisitions, trna_per_codon_list, seed):
+    workloads = [(f'tRNA ({trna_per_codon} per codon)', lambda use_pool, trna_per_codon=trna_per_codon:
+        trna_workload(use_pool, trna_per_codon, processes, acquisitions, seed)) for trna_per_codon in trna_per_codon_list]
+    workloads.append(('nucleotides', lambda use_pool: nucleotides_workload(use_pool, processes, acquisitions, seed)))
+    for parameters_path in PARAMETERS_PATHS: # initial amounts of the parameters grids
+        parameters = json.load(open(parameters_path))
+        initial_amounts = [parameters[name][0] for name in NUCLEOTIDES_PARAMETERS]
+        workloads.append((f'nucleotides ({parameters_path.split("/")[-1][:-5]})',
+            lambda use_pool, initial_amounts=initial_amounts: nucleotides_workload(
+                use_pool, processes, acquisitions, seed, initial_amounts)))
+
+    print(f'{"workload":>40} {"storage":>9} {"events":>9} {"wall time (s)":>14} {"events/s":>10} {"acquisitions/s":>15}')
+    for name, workload in workloads:
+        for use_pool in (False, True):
+            events, wall_time = workload(use_pool)
+            print(f'{name:>40} {"pool" if use_pool else "SimPy":>9} {events:>9} {wall_time:>14.3f} '
+                f'{events/wall_time:>10.0f} {processes*acquisitions/wall_time:>15.0f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=NUMBER_PROCESSES)
+    parser.add_argument('--acquisitions', type=int, default=ACQUISITIONS_PER_PROCESS)
+    parser.add_argument('--trna', type=int, nargs='+', default=TRNA_PER_CODON)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.processes, args.acquisitions, args.trna, args.seed)
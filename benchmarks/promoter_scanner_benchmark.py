@@ -0,0 +1,77 @@
+"""
+Benchmark of the promoter scanner against the previous implementation of
+Nucleus.find_promoters_positions on synthetic DNA sequences.
+
+Run from the root of the repository:
+    python -m benchmarks.promoter_scanner_benchmark
+"""
+import argparse
+import random
+import time
+from src.process.transcription import PROMOTERS, MIN_LENGTH_PROMOTER
+from src.utils.promoter_scanner import PromoterScanner
+
+SEQUENCE_LENGTHS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+LEGACY_MAX_LENGTH = 100_000 # the previous implementation is quadratic
+PROMOTERS_PER_KB = 2
+
+def legacy_find_promoters_positions(dna_sequence, promoters_list):
+    """
+    Previous implementation of Nucleus.find_promoters_positions.
+    """
+    promoter_positions_list = sorted([i for promoter in promoters_list for i, _ in
+        enumerate(dna_sequence) if dna_sequence[i:].startswith(promoter)])
+
+    i = 0
+    while i < len(promoter_positions_list)-1:
+        if promoter_positions_list[i+1] - promoter_positions_list[i] < MIN_LENGTH_PROMOTER:
+            del promoter_positions_list[i+1]
+        else: i += 1
+
+    return promoter_positions_list
+
+def synthetic_sequence(length, rng):
+    """
+    Random DNA sequence with promoters inserted at random positions.
+    """
+    sequence = [rng.choice('ACGT') for _ in range(length)]
+    promoters = [promoter for promoters_list in PROMOTERS.values() for promoter in promoters_list]
+
+    for _ in range(max(1, length * PROMOTERS_PER_KB // 1000)):
+        promoter = rng.choice(promoters)
+        position = rng.randrange(0, length - len(promoter))
+        sequence[position:position+len(promoter)] = promoter
+
+    return ''.join(sequence)
+
+def run(lengths, legacy_max_length, seed):
+    rng = random.Random(seed)
+    scanner = PromoterScanner(PROMOTERS, MIN_LENGTH_PROMOTER)
+
+    print(f'{"length":>12} {"scanner (s)":>12} {"legacy (s)":>12} {"speedup":>10} {"same output":>12}')
+    for length in lengths:
+        dna_sequence = synthetic_sequence(length, rng)
+
+        start = time.perf_counter()
+        promoters_positions_dict = scanner.scan(dna_sequence)
+        scanner_time = time.perf_counter() - start
+
+        if length <= legacy_max_length:
+            start = time.perf_counter()
+            legacy_positions_dict = {promoter: legacy_find_promoters_positions(dna_sequence, PROMOTERS[promoter])
+                for promoter in PROMOTERS}
+            legacy_time = time.perf_counter() - start
+
+            print(f'{length:>12} {scanner_time:>12.4f} {legacy_time:>12.4f} '
+                f'{legacy_time/scanner_time:>10.1f} {str(legacy_positions_dict == promoters_positions_dict):>12}')
+        else:
+            print(f'{length:>12} {scanner_time:>12.4f} {"-":>12} {"-":>10} {"-":>12}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=SEQUENCE_LENGTHS)
+    parser.add_argument('--legacy-max-length', type=int, default=LEGACY_MAX_LENGTH)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.legacy_max_length, args.seed)
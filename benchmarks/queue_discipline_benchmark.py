@@ -0,0 +1,79 @@
+"""
+Benchmark of the queue disciplines of the RNA polymerases and the ribosomes. The protein
+synthesis of a set of random genes, of random length and with promoter boxes, is simulated
+with each discipline, and the throughput, in proteins synthesized per simulated hour, and the
+p50, p95 and p99 of the wait time of the RNA polymerases and of the ribosomes are reported.
+
+Run from the root of the repository:
+    python -m benchmarks.queue_discipline_benchmark
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+import pandas as pd
+from src.simulation import ProteinSinthesisProcess
+from src.process.transcription import PROMOTERS
+from src.resources.scheduling import QUEUE_DISCIPLINES
+
+NUMBER_GENES = 400
+MIN_GENE_LENGTH = 300
+MAX_GENE_LENGTH = 3_000
+SIMULATION_TIME = 1_500 # seconds
+NUMBER_RESOURCES = 20
+NUMBER_RNA_POLYMERASES = 3
+NUMBER_RIBOSOMES = 3
+NUMBER_RNA_TRANSFERS_PER_CODON = 50
+
+def make_genes(number_genes, seed):
+    """
+    Return a dataframe of random genes, each one with one to three promoter boxes.
+    """
+    rng = random.Random(seed)
+    boxes = [box for boxes in PROMOTERS.values() for box in boxes]
+    genes = []
+    for i in range(number_genes):
+        gene = [rng.choice('ACGT') for _ in range(rng.randint(MIN_GENE_LENGTH, MAX_GENE_LENGTH))]
+        for _ in range(rng.randint(1, 3)):
+            position = rng.randint(0, len(gene) - 10)
+            gene[position:position+7] = list(rng.choice(boxes))
+        genes.append({'ID': f'gene{i}', 'sequence': ''.join(gene), 'category': 'random'})
+    return pd.DataFrame(genes)
+
+def simulate(genes_df, queue_discipline, simulation_time, seed):
+    with contextlib.redirect_stdout(io.StringIO()): # silence the simulation
+        process = ProteinSinthesisProcess(genes_df.copy(), number_resources=NUMBER_RESOURCES,
+            number_rna_polymerases=NUMBER_RNA_POLYMERASES, number_ribosomes=NUMBER_RIBOSOMES,
+            number_rna_transfers_per_codon=NUMBER_RNA_TRANSFERS_PER_CODON, random_seed=seed,
+            queue_discipline=queue_discipline)
+        start = time.perf_counter()
+        process.run(simulation_time)
+        wall_time = time.perf_counter() - start
+
+    synthesized = process.dna_sequences_df[process.dna_sequences_df['protein_synthesized'].notna()]
+    proteins = synthesized['number_of_proteins_synthesized'].sum()
+    return (proteins, len(synthesized), process.eukaryotic_cell.nucleus.rna_polymerase.wait_time_sketch,
+        process.eukaryotic_cell.ribosome.ribosomes.wait_time_sketch, wall_time)
+
+def run(number_genes, simulation_time, seed):
+    genes_df = make_genes(number_genes, seed)
+
+    print(f'{"discipline":>19} {"proteins/h":>11} {"DNA seqs":>9} {"RNA polymerase wait p50/p95/p99 (s)":>36} '
+        f'{"ribosome wait p50/p95/p99 (s)":>30} {"wall time (s)":>14}')
+    for queue_discipline in QUEUE_DISCIPLINES:
+        proteins, sequences, rna_polymerase_wait, ribosome_wait, wall_time = simulate(
+            genes_df, queue_discipline, simulation_time, seed)
+        rna_polymerase_percentiles = '/'.join(f'{value:.1f}' for value in rna_polymerase_wait.percentiles().values())
+        ribosome_percentiles = '/'.join(f'{value:.1f}' for value in ribosome_wait.percentiles().values())
+        print(f'{queue_discipline:>19} {proteins / simulation_time * 3600:>11.0f} {sequences:>9} '
+            f'{rna_polymerase_percentiles:>36} {ribosome_percentiles:>30} {wall_time:>14.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--genes', type=int, default=NUMBER_GENES)
+    parser.add_argument('--time', type=float, default=SIMULATION_TIME)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.genes, args.time, args.seed)
@@ -0,0 +1,99 @@
+"""
+Benchmark of the results collector against the previous per-completion update of the
+dataframe of DNA sequences. For each dataset size, the results of a number of synthesized
+DNA sequences are saved, and the dataframe with the results is built once at the end. The
+previous implementation looked up the row of each DNA sequence comparing the sequences of
+the whole dataframe and wrote the results in the row. The wall time per result and the
+equality of the dataframes are reported.
+
+Run from the root of the repository:
+    python -m benchmarks.results_collector_benchmark
+"""
+import argparse
+import random
+import time
+import pandas as pd
+from src.utils.results_collector import ResultsCollector, RESULTS_COLUMNS
+
+DATASET_SIZES = [1_000, 10_000, 60_000]
+NUMBER_RESULTS = 500
+SEQUENCE_LENGTH = 1_000
+
+def legacy_save_proteins_synthesized(dna_sequences_df, dna_sequence, mrna_sequences, polypeptides_chain,
+        polypeptides_chain_ext, request_start_process_time, start_process_time, start_transcription_time,
+        start_translation_time, end_translation_time, end_process_time, promoters_box, proteins_sintetized):
+    row_index = dna_sequences_df[dna_sequences_df['sequence'] == dna_sequence].index[0]
+
+    results = {
+        'ID': dna_sequences_df.iloc[row_index]['ID'],
+        'sequence': dna_sequence,
+        'category': dna_sequences_df.iloc[row_index]['category'],
+        'mrna_sequences': mrna_sequences,
+        'length_mrna_sequences': [len(mrna) for mrna in mrna_sequences] if mrna_sequences else 0,
+        'polypeptides_chains': polypeptides_chain,
+        'polypeptides_chains_ext': polypeptides_chain_ext,
+        'number_of_proteins_synthesized_per_mrna': proteins_sintetized,
+        'number_of_proteins_synthesized': sum(proteins_sintetized) if proteins_sintetized else 0,
+        'protein_synthesized': True if mrna_sequences else False, # boolean
+        'request_start_process_time': request_start_process_time,
+        'start_process_time': start_process_time,
+        'start_transcription_time': start_transcription_time,
+        'start_translation_time': start_translation_time,
+        'end_translation_time': end_translation_time,
+        'end_process_time': end_process_time,
+        'promoters_box': promoters_box
+    }
+    dna_sequences_df.iloc[row_index] = results
+
+    return dna_sequences_df
+
+def make_results(dna_sequences, number_results, rng):
+    results = []
+    for row in rng.sample(range(len(dna_sequences)), number_results):
+        time = rng.uniform(0, 1000)
+        results.append({'row': row, 'mrna_sequences': ['CH3GPPP-AUGUAA-AAAA'], 'polypeptides_chain': ['NH2-M-COOH'],
+            'polypeptides_chain_ext': ['NH2-Met-COOH'], 'request_start_process_time': time,
+            'start_process_time': time + 1, 'start_transcription_time': [time + 1],
+            'start_translation_time': [time + 2], 'end_translation_time': [time + 3],
+            'end_process_time': time + 3, 'proteins_sintetized': [rng.randint(1, 5)]})
+    return results
+
+def run(dataset_sizes, number_results, seed):
+    rng = random.Random(seed)
+
+    print(f'{"rows":>8} {"legacy (ms/result)":>19} {"collector (ms/result)":>22} {"speedup":>8} {"same dataframe":>15}')
+    for dataset_size in dataset_sizes:
+        dna_sequences_df = pd.DataFrame({'ID': [f'id{i}' for i in range(dataset_size)],
+            'sequence': [''.join(rng.choice('ACGT') for _ in range(SEQUENCE_LENGTH)) for _ in range(dataset_size)],
+            'category': 'random'})
+        results = make_results(dna_sequences_df['sequence'].values, number_results, rng)
+
+        legacy_df = dna_sequences_df.copy()
+        for column in RESULTS_COLUMNS:
+            legacy_df[column] = None
+        start = time.perf_counter()
+        for result in results:
+            result = dict(result)
+            dna_sequence = legacy_df['sequence'].values[result.pop('row')]
+            legacy_df = legacy_save_proteins_synthesized(legacy_df, dna_sequence, promoters_box=None, **result)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        collector = ResultsCollector(dna_sequences_df)
+        for result in results:
+            collector.append(**result)
+        collector_df = collector.to_dataframe()
+        collector_time = time.perf_counter() - start
+
+        print(f'{dataset_size:>8} {legacy_time / number_results * 1e3:>19.3f} '
+            f'{collector_time / number_results * 1e3:>22.3f} {legacy_time / collector_time:>8.1f} '
+            f'{str(legacy_df.equals(collector_df)):>15}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DATASET_SIZES)
+    parser.add_argument('--results', type=int, default=NUMBER_RESULTS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.sizes, args.results, args.seed)
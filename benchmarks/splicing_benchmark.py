@@ -0,0 +1,79 @@
+"""
+Benchmark of the single pass splicing against the previous implementation of
+Nucleus.splicing, that rebuilt the mRNA for each removed intron base and released
+each intron nucleotide with its own degradation process.
+The extron sequences are a subset of the codons, so that the synthetic mRNAs contain introns.
+
+Run from the root of the repository:
+    python -m benchmarks.splicing_benchmark
+"""
+import argparse
+import json
+import random
+import time
+import simpy
+from src.process.transcription import Nucleus, LENGTH_METHYL_CAP, LENGTH_EXTRON_SEQUENCE
+from src.resources.nucleotides import Nucleotides
+
+MRNA_LENGTHS = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_LENGTH = 1_000_000 # the previous implementation is quadratic
+EXTRON_FRACTION = 0.9 # fraction of the codons used as extron sequences
+CODONS_PATH = 'data/codons.json'
+
+class LegacyNucleus(Nucleus):
+    """
+    Nucleus with the previous implementation of the splicing.
+    """
+    def splicing(self, rna_sequence):
+        i = LENGTH_METHYL_CAP
+        while i+3 < len(rna_sequence):
+            if rna_sequence[i:i+LENGTH_EXTRON_SEQUENCE] in self.extron_sequences_list:
+                i += LENGTH_EXTRON_SEQUENCE
+            else:
+                intron = rna_sequence[i]
+                self.release_nucleotide(intron)
+                rna_sequence = rna_sequence[:i] + rna_sequence[i+1:]
+
+        return rna_sequence
+
+def splice(nucleus_class, extron_sequences_list, rna_sequence, seed):
+    """
+    Splice a capped mRNA, return the mature mRNA, the number of scheduled events and the wall time.
+    """
+    env = simpy.Environment()
+    nucleotides = Nucleotides(env, 0, 0, 0, 0, random_seed=seed)
+    nucleus = nucleus_class(env, extron_sequences_list=extron_sequences_list, editing_sites_dict={},
+        number_rna_polymerases=1, nucleotides=nucleotides, random_seed=seed)
+
+    start = time.perf_counter()
+    mrna_sequence = nucleus.splicing(rna_sequence)
+    wall_time = time.perf_counter() - start
+
+    return mrna_sequence, len(env._queue), wall_time
+
+def run(lengths, legacy_max_length, seed):
+    rng = random.Random(seed)
+    codons = list(json.load(open(CODONS_PATH)).keys())
+    extron_sequences_list = {codon: None for codon in rng.sample(codons, int(len(codons) * EXTRON_FRACTION))}.keys()
+
+    print(f'{"length":>10} {"single pass (s)":>16} {"events":>8} {"legacy (s)":>12} {"events":>8} {"same mRNA":>10}')
+    for length in lengths:
+        rna_sequence = 'CH3GPPP-' + ''.join(rng.choice('UAGC') for _ in range(length))
+
+        mrna_sequence, events, wall_time = splice(Nucleus, extron_sequences_list, rna_sequence, seed)
+        if length <= legacy_max_length:
+            legacy_mrna_sequence, legacy_events, legacy_wall_time = splice(
+                LegacyNucleus, extron_sequences_list, rna_sequence, seed)
+            print(f'{length:>10} {wall_time:>16.4f} {events:>8} {legacy_wall_time:>12.4f} {legacy_events:>8} '
+                f'{str(mrna_sequence == legacy_mrna_sequence):>10}')
+        else:
+            print(f'{length:>10} {wall_time:>16.4f} {events:>8} {"-":>12} {"-":>8} {"-":>10}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=MRNA_LENGTHS)
+    parser.add_argument('--legacy-max-length', type=int, default=LEGACY_MAX_LENGTH)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.legacy_max_length, args.seed)
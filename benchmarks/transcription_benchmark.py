@@ -0,0 +1,102 @@
+"""
+Benchmark of the single process per gene transcription against the previous implementation
+of Nucleus.trascript_gene, that spawned two processes for each base of the gene.
+Both implementations find the complement bases with the transcription kernel, so the
+simulated end times and the nucleotides level history are checked to be identical.
+
+Run from the root of the repository:
+    python -m benchmarks.transcription_benchmark
+"""
+import argparse
+import random
+import time
+import simpy
+from src.process.transcription import Nucleus
+from src.resources.nucleotides import Nucleotides
+from src.variables.variables import EukaryoticCellVariables
+
+GENES_LENGTHS = [1_000, 5_000, 10_000, 20_000]
+NUCLEOTIDES_INITIAL_AMOUNT = 10_000 # low enough to wait for the degraded nucleotides
+
+class LegacyNucleus(Nucleus):
+    """
+    Nucleus with the previous implementation of the transcription from a gene to a pre-mRNA.
+    """
+    def trascript_gene(self, dna_sequence, variables, sequence_count):
+        messenger_rna_sequence = ''
+        complement_base_queue = []
+
+        for base in self.transcription_kernel.transcript(dna_sequence):
+            complement_base_process = yield self.env.process(self.request_nucleotide(base))
+            complement_base_queue.append(complement_base_process)
+
+            yield complement_base_process
+            complement_base = complement_base_process.value
+            messenger_rna_sequence += complement_base
+
+            while complement_base_queue:
+                complement_base_queue.pop(0)
+
+        return messenger_rna_sequence
+
+def transcript_genes(nucleus_class, genes, seed):
+    """
+    Transcript the genes one after the other, return the mRNA sequences, the end time of
+    each transcription, the nucleotides level history, the number of events and the wall time.
+    """
+    random.seed(seed)
+    env = simpy.Environment()
+    nucleotides = Nucleotides(env, NUCLEOTIDES_INITIAL_AMOUNT, NUCLEOTIDES_INITIAL_AMOUNT,
+        NUCLEOTIDES_INITIAL_AMOUNT, NUCLEOTIDES_INITIAL_AMOUNT, random_seed=seed)
+    nucleus = nucleus_class(env, extron_sequences_list=[], editing_sites_dict={},
+        number_rna_polymerases=1, nucleotides=nucleotides, random_seed=seed)
+    variables = EukaryoticCellVariables()
+    mrna_sequences, end_times = [], []
+
+    def transcript_all():
+        for seq_count, gene in enumerate(genes):
+            mrna_sequence = yield env.process(nucleus.trascript_gene(gene, variables, seq_count))
+            mrna_sequences.append(mrna_sequence)
+            end_times.append(env.now)
+            for base in mrna_sequence: # degrade the mRNA to refill the nucleotides
+                nucleotides.release(base, 1)
+
+    env.process(transcript_all())
+
+    events = 0
+    start = time.perf_counter()
+    while env.peek() != float('inf'):
+        env.step()
+        events += 1
+    wall_time = time.perf_counter() - start
+
+    history = {base: container.level_history() for base, container
+        in nucleotides.nucleotides_containers_dict.items()}
+    return mrna_sequences, end_times, history, events, wall_time
+
+def histories_to_dict(history):
+    # the histories are compared by their columns
+    return {base: level_history.to_dict() for base, level_history in history.items()}
+
+def run(genes_lengths, seed):
+    rng = random.Random(seed)
+    genes = [''.join(rng.choice('ACGT') for _ in range(length)) for length in genes_lengths]
+
+    legacy = transcript_genes(LegacyNucleus, genes, seed)
+    flattened = transcript_genes(Nucleus, genes, seed)
+
+    print(f'{"implementation":>16} {"events":>10} {"wall time (s)":>14}')
+    print(f'{"legacy":>16} {legacy[3]:>10} {legacy[4]:>14.3f}')
+    print(f'{"single process":>16} {flattened[3]:>10} {flattened[4]:>14.3f}')
+    print(f'speedup: {legacy[4]/flattened[4]:.1f}x')
+    print(f'same mRNA sequences: {legacy[0] == flattened[0]}')
+    print(f'identical end times: {legacy[1] == flattened[1]}')
+    print(f'identical nucleotides history: {histories_to_dict(legacy[2]) == histories_to_dict(flattened[2])}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=GENES_LENGTHS)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.seed)
@@ -0,0 +1,56 @@
+"""
+Benchmark of the chunked transcription against the exact per-nucleotide transcription.
+For each transcription granularity the number of events, the wall time and the error
+against the exact mode are reported: the error on the end time of the transcription of
+each gene and the error on the nucleotides levels sampled every second.
+
+Run from the root of the repository:
+    python -m benchmarks.transcription_granularity_benchmark
+"""
+import argparse
+import functools
+import random
+import numpy as np
+from src.process.transcription import Nucleus
+from benchmarks.transcription_benchmark import transcript_genes, GENES_LENGTHS
+
+GRANULARITIES = [10, 100, 1000]
+SAMPLING_TIME = 1 # seconds between the samples of the nucleotides levels
+
+def levels_at(level_history, times):
+    """
+    Level of a container at the given times.
+    """
+    level_history = level_history.to_numpy(copy=False) # views, the history is no longer recorded
+    i = np.searchsorted(level_history['time'], times, side='right') - 1
+    return level_history['level'][i]
+
+def run(genes_lengths, granularities, seed):
+    rng = random.Random(seed)
+    genes = [''.join(rng.choice('ACGT') for _ in range(length)) for length in genes_lengths]
+
+    _, exact_end_times, exact_history, exact_events, exact_wall_time = transcript_genes(Nucleus, genes, seed)
+    times = np.arange(0, exact_end_times[-1], SAMPLING_TIME)
+
+    print(f'{"granularity":>12} {"events":>10} {"wall time (s)":>14} {"max end time error (s)":>24} '
+        f'{"max level error":>16} {"mean level error":>17}')
+    print(f'{"exact":>12} {exact_events:>10} {exact_wall_time:>14.3f} {0:>24.2e} {0:>16} {0:>17}')
+    for granularity in granularities:
+        _, end_times, history, events, wall_time = transcript_genes(
+            functools.partial(Nucleus, transcription_granularity=granularity), genes, seed)
+
+        end_time_error = np.max(np.abs(np.array(end_times) - np.array(exact_end_times)))
+        level_errors = np.concatenate([np.abs(levels_at(history[base], times) -
+            levels_at(exact_history[base], times)) for base in history])
+
+        print(f'{granularity:>12} {events:>10} {wall_time:>14.3f} {end_time_error:>24.2e} '
+            f'{level_errors.max():>16.0f} {level_errors.mean():>17.2f}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=GENES_LENGTHS)
+    parser.add_argument('--granularities', type=int, nargs='+', default=GRANULARITIES)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.granularities, args.seed)
@@ -0,0 +1,89 @@
+"""
+Benchmark of the transcription kernel against the previous per-base transcription, that
+resolved the ambiguity symbols and placed the transcription errors with one random draw
+per base. Besides the wall time, the statistics of the two implementations are compared:
+the transcription error rate and the frequency of the bases chosen for each ambiguity symbol.
+
+Run from the root of the repository:
+    python -m benchmarks.transcription_kernel_benchmark
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from src.process.transcription import BASE_COMPLEMENT_DNA2RNA, RNA_POLYMERASE_ERROR_RATE
+from src.utils.transcription_kernel import TranscriptionKernel
+from src.variables.nucleotides_allocations import NucleotidesSymbolsAllocations
+
+SEGMENT_LENGTH = 1_000_000
+AMBIGUITY_RATE = 0.05 # fraction of ambiguity symbols in the synthetic segment
+AMBIGUITY_SYMBOLS = [s for s in NucleotidesSymbolsAllocations if len(NucleotidesSymbolsAllocations[s]) > 1]
+
+def legacy_transcript(dna_sequence):
+    """
+    Previous per-base implementation of the ambiguity resolution and of find_complement_base.
+    """
+    dna_sequence = ''.join([random.choice(NucleotidesSymbolsAllocations[n]) for n in dna_sequence])
+
+    rna_sequence = []
+    for base in dna_sequence:
+        if random.random() > RNA_POLYMERASE_ERROR_RATE:
+            complement_base = BASE_COMPLEMENT_DNA2RNA[base]
+        else:
+            complement_base = random.choice([b for b in list(BASE_COMPLEMENT_DNA2RNA.values())
+                if b != BASE_COMPLEMENT_DNA2RNA[base]])
+        rna_sequence.append(complement_base)
+
+    return ''.join(rna_sequence)
+
+def statistics(dna_sequence, rna_sequence):
+    """
+    Transcription error rate on the unambiguous bases and frequency of the complement bases
+    for each ambiguity symbol.
+    """
+    errors = sum(1 for base, rna_base in zip(dna_sequence, rna_sequence)
+        if base in BASE_COMPLEMENT_DNA2RNA and BASE_COMPLEMENT_DNA2RNA[base] != rna_base)
+    unambiguous = sum(1 for base in dna_sequence if base in BASE_COMPLEMENT_DNA2RNA)
+
+    frequencies = dict()
+    for symbol in AMBIGUITY_SYMBOLS:
+        counts = Counter(rna_base for base, rna_base in zip(dna_sequence, rna_sequence) if base == symbol)
+        total = sum(counts.values())
+        frequencies[symbol] = {rna_base: count / total for rna_base, count in sorted(counts.items())}
+
+    return errors / unambiguous, frequencies
+
+def run(length, seed):
+    rng = random.Random(seed)
+    dna_sequence = ''.join(rng.choice(AMBIGUITY_SYMBOLS) if rng.random() < AMBIGUITY_RATE
+        else rng.choice('ACGT') for _ in range(length))
+
+    random.seed(seed)
+    start = time.perf_counter()
+    legacy_rna_sequence = legacy_transcript(dna_sequence)
+    legacy_time = time.perf_counter() - start
+
+    kernel = TranscriptionKernel(NucleotidesSymbolsAllocations, BASE_COMPLEMENT_DNA2RNA,
+        RNA_POLYMERASE_ERROR_RATE, seed)
+    start = time.perf_counter()
+    kernel_rna_sequence = kernel.transcript(dna_sequence)
+    kernel_time = time.perf_counter() - start
+
+    print(f'segment of {length} bases: per-base {legacy_time:.3f} s, kernel {kernel_time:.4f} s, '
+        f'speedup {legacy_time/kernel_time:.0f}x')
+
+    legacy_error_rate, legacy_frequencies = statistics(dna_sequence, legacy_rna_sequence)
+    kernel_error_rate, kernel_frequencies = statistics(dna_sequence, kernel_rna_sequence)
+    print(f'error rate: per-base {legacy_error_rate:.2e}, kernel {kernel_error_rate:.2e}, '
+        f'expected {RNA_POLYMERASE_ERROR_RATE:.2e}')
+    for symbol in AMBIGUITY_SYMBOLS:
+        print(f'{symbol}: per-base ' + ', '.join(f'{b} {f:.3f}' for b, f in legacy_frequencies[symbol].items()) +
+            ' | kernel ' + ', '.join(f'{b} {f:.3f}' for b, f in kernel_frequencies[symbol].items()))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--length', type=int, default=SEGMENT_LENGTH)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.length, args.seed)
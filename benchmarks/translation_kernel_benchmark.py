@@ -0,0 +1,72 @@
+"""
+Benchmark of the translation kernel against the Biopython translation previously used in
+Ribosome.elongation. The one-letter and three-letter polypeptides chains of the kernel are
+checked to match Biopython for the standard table on random mRNA sequences.
+Biopython is only needed to run this benchmark.
+
+Run from the root of the repository:
+    python -m benchmarks.translation_kernel_benchmark
+"""
+import argparse
+import json
+import random
+import time
+import warnings
+from Bio import BiopythonWarning
+from Bio.Seq import Seq
+from Bio.SeqUtils import seq3
+from src.process.translation import PEPTIDES_PATH
+from src.utils.translation_kernel import TranslationKernel
+
+CODONS_PATH = 'data/codons.json'
+MRNA_LENGTHS = [100, 1_000, 10_000]
+MRNA_NUMBER = 1_000 # number of mRNA sequences for each length
+STOP_CODONS_RATE = 0.2 # fraction of mRNA sequences with stop codons
+
+def biopython_translate(mrna_sequence):
+    """
+    Previous Biopython translation of Ribosome.elongation.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', BiopythonWarning)
+        polypeptides_chain = str(Seq(mrna_sequence).translate(stop_symbol='', to_stop=True))
+    return polypeptides_chain, seq3(polypeptides_chain)
+
+def kernel_translate(kernel, mrna_sequence):
+    polypeptides_chain = kernel.translate(kernel.encode(mrna_sequence))
+    return polypeptides_chain, kernel.three_letter(polypeptides_chain)
+
+def random_mrna(length, rng, stop_codons):
+    codons = [''.join(rng.choice('UCAG') for _ in range(3)) for _ in range(length // 3)]
+    if not stop_codons: # replace the stop codons to translate the whole sequence
+        codons = [codon if codon not in ('UAA', 'UAG', 'UGA') else 'UUU' for codon in codons]
+    return ''.join(codons) + ''.join(rng.choice('UCAG') for _ in range(length % 3))
+
+def run(lengths, number, seed):
+    rng = random.Random(seed)
+    kernel = TranslationKernel(json.load(open(CODONS_PATH)), json.load(open(PEPTIDES_PATH)))
+
+    print(f'{"length":>8} {"Biopython (s)":>14} {"kernel (s)":>11} {"speedup":>8} {"same chains":>12}')
+    for length in lengths:
+        mrna_sequences = [random_mrna(length + rng.randrange(3), rng, rng.random() < STOP_CODONS_RATE)
+            for _ in range(number)]
+
+        start = time.perf_counter()
+        biopython_chains = [biopython_translate(mrna_sequence) for mrna_sequence in mrna_sequences]
+        biopython_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        kernel_chains = [kernel_translate(kernel, mrna_sequence) for mrna_sequence in mrna_sequences]
+        kernel_time = time.perf_counter() - start
+
+        print(f'{length:>8} {biopython_time:>14.4f} {kernel_time:>11.4f} {biopython_time/kernel_time:>8.1f} '
+            f'{str(biopython_chains == kernel_chains):>12}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=MRNA_LENGTHS)
+    parser.add_argument('--number', type=int, default=MRNA_NUMBER)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.number, args.seed)
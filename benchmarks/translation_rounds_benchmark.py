@@ -0,0 +1,127 @@
+"""
+Benchmark of the peak memory of the translation of a long-lived mRNA, translated by a
+ribosome after the other for a fixed number of rounds before being degraded.
+The translation loop of EukaryoticCell.translation_process is compared with the previous
+recursive implementation, that started a nested process for each round and kept all the
+processes alive until the mRNA was degraded. The end time of the translation is checked
+to be the same. The peak memory also includes the request history of the resources, that
+grows with the number of rounds for both implementations.
+
+Run from the root of the repository:
+    python -m benchmarks.translation_rounds_benchmark
+"""
+import argparse
+import random
+import time
+import tracemalloc
+import simpy
+from src.process.protein_synthesis import EukaryoticCell
+from src.process.translation import Ribosome, LENGTH_POLY_A_TAIL
+from src.variables.variables import EukaryoticCellVariables
+
+ROUNDS = [100, 1_000, 5_000] # number of ribosome rounds before the mRNA degradation
+MRNA_LENGTH = 90 # number of nucleotides translated in each round
+NUMBER_RIBOSOMES = 10
+NUMBER_RNA_TRANSFERS_PER_CODON = 100
+NUCLEOTIDES_INITIAL_AMOUNT = 1000
+PROCESSES_FILE_PATTERN = '*/simpy/events.py' # file allocating the SimPy processes
+CELL_FILE_PATTERN = '*/protein_synthesis.py' # file allocating the generators of EukaryoticCell
+
+class LegacyEukaryoticCell(EukaryoticCell):
+    """
+    Eukaryotic cell with the previous recursive implementation of the translation process.
+    """
+    def translation_process(self, variables, mrna, seq_count):
+        translation_process = self.env.process(self.ribosome.translate(mrna, variables, seq_count))
+        variables.translation_queue.append(translation_process)
+
+        yield translation_process
+        protein, protein_extended_name, mrna_degradated = translation_process.value
+
+        if variables.proteins_sintetized[seq_count] == 1:
+            variables.proteins_list[seq_count] = protein # polypeptides chain
+            variables.proteins_extended_name_list[seq_count] = protein_extended_name
+
+        while variables.translation_queue:
+            variables.translation_queue.pop(0)
+
+        if not mrna_degradated:
+            yield self.env.timeout(round(random.random()*10, ndigits=4)) # time to find the next ribosome
+            yield self.env.process(self.translation_process(variables, mrna, seq_count))
+
+class RoundsRibosome(Ribosome):
+    """
+    Ribosome degrading the mRNA sequence after a fixed number of rounds. In the last round,
+    before the degradation, the memory held by the SimPy processes and by the generators of
+    EukaryoticCell is measured.
+    """
+    def __init__(self, rounds, **kwargs):
+        super().__init__(**kwargs)
+        self.rounds = rounds
+        self.rounds_count = 0
+        self.processes_memory = None
+
+    def compute_degradation_probability(self, mrna_length, mrna_degradation_rate):
+        self.rounds_count += 1
+        if self.rounds_count < self.rounds:
+            return 0.
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(True, PROCESSES_FILE_PATTERN), tracemalloc.Filter(True, CELL_FILE_PATTERN)])
+        self.processes_memory = sum(stat.size for stat in snapshot.statistics('filename'))
+        return 1.
+
+def translate(cell_class, mrna, rounds, seed):
+    """
+    Translate a mRNA for a number of rounds, return the end time, the memory held by the
+    processes in the last round, the peak memory and the wall time.
+    """
+    env = simpy.Environment()
+    cell = cell_class(env, number_rna_polymerases=1, number_ribosomes=NUMBER_RIBOSOMES,
+        number_rna_transfers_per_codon=NUMBER_RNA_TRANSFERS_PER_CODON,
+        uracil_initial_amount=NUCLEOTIDES_INITIAL_AMOUNT, adenine_initial_amount=NUCLEOTIDES_INITIAL_AMOUNT,
+        guanine_initial_amount=NUCLEOTIDES_INITIAL_AMOUNT, cytosine_initial_amount=NUCLEOTIDES_INITIAL_AMOUNT,
+        random_seed=seed)
+    cell.ribosome = RoundsRibosome(rounds, environment=env, number_ribosomes=NUMBER_RIBOSOMES,
+        number_rna_transfers_per_codon=NUMBER_RNA_TRANSFERS_PER_CODON, codons_list=cell.extron_list,
+        nucleotides=cell.nucleotides, amminoacids=cell.amminoacids, random_seed=seed)
+
+    variables = EukaryoticCellVariables()
+    variables.dna_sequences_to_transcript_list = [None]
+    variables._init_transcription_translation_var()
+    variables.mrna_sequences_list[0] = mrna
+    variables.poly_adenine_tail_len[0] = LENGTH_POLY_A_TAIL
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    env.process(cell.translation_process(variables, mrna, seq_count=0))
+    env.run()
+    wall_time = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return env.now, cell.ribosome.processes_memory, peak_memory, wall_time
+
+def run(rounds_list, mrna_length, seed):
+    rng = random.Random(seed)
+    codons = [''.join(rng.choice('UCAG') for _ in range(3)) for _ in range(mrna_length // 3 - 1)]
+    codons = [codon if codon not in ('UAA', 'UAG', 'UGA') else 'UUU' for codon in codons]
+    mrna = 'CH3GPPP-' + 'AUG' + ''.join(codons) + 'A' * LENGTH_POLY_A_TAIL
+
+    print(f'{"":>8} {"loop":>38} {"recursive":>38}')
+    print(f'{"rounds":>8}' + f' {"processes (KiB)":>16} {"peak (KiB)":>11} {"time (s)":>9}' * 2 + f' {"same end time":>14}')
+    for rounds in rounds_list:
+        results = [translate(cell_class, mrna, rounds, seed) for cell_class in (EukaryoticCell, LegacyEukaryoticCell)]
+
+        print(f'{rounds:>8}' + ''.join(f' {processes_memory/1024:>16.1f} {peak_memory/1024:>11.1f} {wall_time:>9.3f}'
+            for _, processes_memory, peak_memory, wall_time in results) +
+            f' {str(results[0][0] == results[1][0]):>14}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, nargs='+', default=ROUNDS)
+    parser.add_argument('--mrna-length', type=int, default=MRNA_LENGTH)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.rounds, args.mrna_length, args.seed)
@@ -0,0 +1,75 @@
+"""
+Benchmark of the bulk acquisition of the transfer RNA against the per-codon acquisition in
+Ribosome.elongation. For each ORF length a number of ribosomes translate the same mRNA at
+the same time; the number of events, the wall time and the end time of the translations are
+reported, and the number of requests recorded in the history of each codon is checked to be
+the same. With few transfer RNA per codon the resources are contended and the bulk
+acquisition falls back to the per-codon acquisition.
+
+Run from the root of the repository:
+    python -m benchmarks.trna_acquisition_benchmark
+"""
+import argparse
+import json
+import random
+import time
+import simpy
+from src.process.translation import Ribosome
+from src.resources.nucleotides import Nucleotides
+
+CODONS_PATH = 'data/codons.json'
+ORF_LENGTHS = [300, 3_000, 30_000] # number of codons
+NUMBER_RIBOSOMES = 4
+NUMBER_RNA_TRANSFERS_PER_CODON = [100, 2] # without and with contended resources
+
+def elongate(trna_bulk_acquisition, mrna, number_rna_transfers_per_codon, seed):
+    """
+    Elongate the mRNA with NUMBER_RIBOSOMES ribosomes, return the end time, the number of
+    requests of each codon, the number of processed events and the wall time.
+    """
+    env = simpy.Environment()
+    codons_dict = json.load(open(CODONS_PATH))
+    ribosome = Ribosome(env, number_ribosomes=NUMBER_RIBOSOMES,
+        number_rna_transfers_per_codon=number_rna_transfers_per_codon, codons_list=codons_dict.keys(),
+        nucleotides=Nucleotides(env, 0, 0, 0, 0, random_seed=seed), amminoacids=codons_dict.values(),
+        random_seed=seed, trna_bulk_acquisition=trna_bulk_acquisition)
+    translation = ribosome.prepare_translation(mrna)
+
+    events = 0
+    start = time.perf_counter()
+    for _ in range(NUMBER_RIBOSOMES):
+        env.process(ribosome.elongation(translation))
+    while env.peek() < float('inf'):
+        env.step()
+        events += 1
+    wall_time = time.perf_counter() - start
+
+    requests_count = {codon: len(resource.queue_history()['request_time'])
+        for codon, resource in ribosome.rna_transfer.trna_resources_dict.items()}
+    return env.now, requests_count, events, wall_time
+
+def run(orf_lengths, numbers_rna_transfers_per_codon, seed):
+    rng = random.Random(seed)
+    sense_codons = [codon for codon, aminoacid in json.load(open(CODONS_PATH)).items() if aminoacid != 'STOP']
+
+    print(f'{"codons":>8} {"tRNA":>5} {"per codon events":>17} {"(s)":>7} {"bulk events":>12} {"(s)":>7} '
+        f'{"end time diff (s)":>18} {"same requests":>14}')
+    for orf_length in orf_lengths:
+        mrna = 'CH3GPPP-' + 'AUG' + ''.join(rng.choice(sense_codons) for _ in range(orf_length)) + 'UAA' + 'AAAAA'
+        for number_rna_transfers_per_codon in numbers_rna_transfers_per_codon:
+            end_time, requests_count, events, wall_time = elongate(False, mrna, number_rna_transfers_per_codon, seed)
+            bulk_end_time, bulk_requests_count, bulk_events, bulk_wall_time = elongate(
+                True, mrna, number_rna_transfers_per_codon, seed)
+
+            print(f'{orf_length:>8} {number_rna_transfers_per_codon:>5} {events:>17} {wall_time:>7.3f} '
+                f'{bulk_events:>12} {bulk_wall_time:>7.3f} {bulk_end_time - end_time:>18.2e} '
+                f'{str(requests_count == bulk_requests_count):>14}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lengths', type=int, nargs='+', default=ORF_LENGTHS)
+    parser.add_argument('--trna', type=int, nargs='+', default=NUMBER_RNA_TRANSFERS_PER_CODON)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    run(args.lengths, args.trna, args.seed)
@@ -36,6 +36,21 @@ class EukaryoticCell:
         The random seed for the simulation environment.
     verbose : bool, optional
         If True, print simulation information. Default is False.
+    promoter_index : PromoterIndex, optional
+        The index of the promoters of the dataset. Default is None.
+    transcription_granularity : int, optional
+        The number of nucleotides transcribed in a single step. Default is 1.
+    trna_bulk_acquisition : bool, optional
+        If True, the ribosomes request the transfer RNA once for each codon type. Default is False.
+    use_molecules_pool : bool, optional
+        If True, the nucleotides and the transfer RNA are stored in array-backed pools. Default is False.
+    history_spill_folder : str, optional
+        The folder where the histories of the resources are written in chunks during the
+        simulation. Default is None, the histories are kept in memory.
+    history_resolution : float, optional
+        The duration of the buckets in which the histories are aggregated. Default is None.
+    queue_discipline : str, optional
+        The discipline of the queues of the RNA polymerases and the ribosomes. Default is 'fifo'.
 
     Attributes
     ----------
@@ -67,7 +82,9 @@ class EukaryoticCell:
     """
     def __init__(self, environment, number_rna_polymerases,number_ribosomes, number_rna_transfers_per_codon, 
             uracil_initial_amount, adenine_initial_amount, guanine_initial_amount,
-            cytosine_initial_amount, random_seed, verbose=False):
+            cytosine_initial_amount, random_seed, verbose=False, promoter_index=None,
+            transcription_granularity=1, trna_bulk_acquisition=False, use_molecules_pool=False,
+            history_spill_folder=None, history_resolution=None, queue_discipline='fifo'):
         self.env = environment
         self.verbose = verbose
         random.seed(random_seed)
@@ -81,7 +98,10 @@ class EukaryoticCell:
             adenine_initial_amount=adenine_initial_amount,
             guanine_initial_amount=guanine_initial_amount,
             cytosine_initial_amount=cytosine_initial_amount,
-            random_seed=random_seed
+            random_seed=random_seed,
+            use_pool=use_molecules_pool,
+            history_spill_folder=history_spill_folder,
+            history_resolution=history_resolution
             )
 
         self.nucleus = Nucleus(
@@ -90,7 +110,12 @@ class EukaryoticCell:
             editing_sites_dict={},
             number_rna_polymerases=number_rna_polymerases,
             nucleotides=self.nucleotides,
-            random_seed=random_seed
+            random_seed=random_seed,
+            promoter_index=promoter_index,
+            transcription_granularity=transcription_granularity,
+            history_spill_folder=history_spill_folder,
+            history_resolution=history_resolution,
+            queue_discipline=queue_discipline
             )
         
         self.ribosome = Ribosome(
@@ -100,7 +125,12 @@ class EukaryoticCell:
             codons_list=self.extron_list,
             nucleotides=self.nucleotides,
             amminoacids=self.amminoacids,
-            random_seed=random_seed
+            random_seed=random_seed,
+            trna_bulk_acquisition=trna_bulk_acquisition,
+            use_molecules_pool=use_molecules_pool,
+            history_spill_folder=history_spill_folder,
+            history_resolution=history_resolution,
+            queue_discipline=queue_discipline
             )
         
     def synthesize_protein(self, variables):
@@ -164,9 +194,6 @@ class EukaryoticCell:
         """
         Start the transcription and translation of a DNA sequence.
         """
-        # init list to store simpy processes for finding complement base
-        variables.complement_base_queue_dict[seq_count] = []
-
         # transcription process
         transcription_process = self.env.process(
             self.nucleus.transcript(dna_sequence, variables, seq_count))
@@ -197,22 +224,24 @@ class EukaryoticCell:
     
     def translation_process(self, variables, mrna, seq_count):
         """
-        Start the translation of a mRNA sequence.
+        Start the translation of a mRNA sequence, the mRNA sequence is translated by a ribosome
+        after the other until it is degraded.
         """
-        # translation process
-        translation_process = self.env.process(self.ribosome.translate(mrna, variables, seq_count))
-        variables.translation_queue.append(translation_process)
-        
-        yield translation_process
-        protein, protein_extended_name, mrna_degradated = translation_process.value
+        mrna_degradated = False
+        while not mrna_degradated:
+            # translation process
+            translation_process = self.env.process(self.ribosome.translate(mrna, variables, seq_count))
+            variables.translation_queue.append(translation_process)
+            
+            yield translation_process
+            protein, protein_extended_name, mrna_degradated = translation_process.value
 
-        if variables.proteins_sintetized[seq_count] == 1:
-            variables.proteins_list[seq_count] = protein # polypeptides chain
-            variables.proteins_extended_name_list[seq_count] = protein_extended_name
+            if variables.proteins_sintetized[seq_count] == 1:
+                variables.proteins_list[seq_count] = protein # polypeptides chain
+                variables.proteins_extended_name_list[seq_count] = protein_extended_name
 
-        while variables.translation_queue:
-            variables.translation_queue.pop(0)
-        
-        if not mrna_degradated:
-            yield self.env.timeout(round(random.random()*10, ndigits=4)) # time to find the next ribosome
-            yield self.env.process(self.translation_process(variables, mrna, seq_count))
\ No newline at end of file
+            while variables.translation_queue:
+                variables.translation_queue.pop(0)
+            
+            if not mrna_degradated:
+                yield self.env.timeout(round(random.random()*10, ndigits=4)) # time to find the next ribosome
@@ -1,6 +1,12 @@
 import random
+from collections import Counter
 from src.variables.nucleotides_allocations import NucleotidesSymbolsAllocations
 from src.resources.resource import EukaryoticCellResource
+from src.resources.history import history_spill_path
+from src.resources.scheduling import FIFO
+from src.utils.promoter_scanner import PromoterScanner
+from src.utils.transcription_kernel import TranscriptionKernel
+from src.utils.rna_editor import RNAEditor
 
 BASE_COMPLEMENT_DNA2RNA = {
     'A': 'U', 
@@ -19,6 +25,11 @@ PROMOTERS = {
     'CAATbox': ['CCAAT'], # CAAT box
     'GCbox': ['GGGCGG'], # GC box
 }
+PROMOTER_PRIORITY = { # priority of the jobs of each promoter box, lower values first
+    'TATAbox': 0,
+    'CAATbox': 1,
+    'GCbox': 2,
+}
 LENGTH_PROMOTER = {
     'TATAbox': 7,
     'CAATbox': 5,
@@ -33,6 +44,8 @@ REPLICATION_TIME = 2e-2 # seconds to replicate a nucleotide
 CLEAVAGE_TIME = 1e-2 # seconds to cleave the mRNA
 TRANSCRIPTION_TIMEOUT = 1
 RNA_POLYMERASE_ERROR_RATE = 10e-4 # 1 error per 10^4 nucleotides
+TRANSCRIPTION_GRANULARITY = 1 # number of nucleotides transcribed in a single step
+MIN_LEVEL_CHUNKED_TRANSCRIPTION = 1000 # below this level nucleotides are transcribed one at a time
 
 class Nucleus:
     """
@@ -53,6 +66,25 @@ class Nucleus:
         The nucleotides in the cell.
     random_seed : int
         The random seed for the simulation environment.
+    promoter_index : PromoterIndex, optional
+        The index of the promoters of the dataset, consulted before scanning a DNA sequence.
+        Default is None.
+    transcription_granularity : int, optional
+        The number of nucleotides transcribed in a single step, with one request per base type
+        and one timeout for the whole chunk. When the level of a requested nucleotide is below
+        MIN_LEVEL_CHUNKED_TRANSCRIPTION the nucleotides are transcribed one at a time.
+        Default is 1, exact per-nucleotide transcription.
+    history_spill_folder : str, optional
+        The folder where the histories of the resources are written in chunks during the
+        simulation. Default is None, the histories are kept in memory.
+    history_resolution : float, optional
+        The duration of the buckets in which the histories of the resources are aggregated.
+        Default is None, every event is recorded.
+    queue_discipline : str, optional
+        The discipline selecting the next DNA sequence to transcript among the ones waiting
+        for a RNA polymerase, one of the keys of QUEUE_DISCIPLINES. The requests carry the
+        length of the DNA sequence, the priority of its promoter box and the DNA sequence
+        they belong to as hints. Default is FIFO.
 
     Attributes
     ----------
@@ -60,12 +92,24 @@ class Nucleus:
         The simulation environment.
     extron_sequences_list : list
         The list of extron sequences.
+    extron_sequences_set : frozenset
+        The set of extron sequences, to check if a sequence is an extron in constant time.
     editing_sites_dict : dict
         The dictionary of editing sites.
+    rna_editor : RNAEditor
+        The editor to replace the editing sites of a RNA sequence in a single pass.
     rna_polymerase : EukaryoticCellResource
         The RNA polymerase resource.
     nucleotides : Nucleotides
         The nucleotides in the cell.
+    promoter_scanner : PromoterScanner
+        The scanner to find the promoters in a DNA sequence.
+    promoter_index : PromoterIndex
+        The index of the promoters of the dataset.
+    transcription_granularity : int
+        The number of nucleotides transcribed in a single step.
+    transcription_kernel : TranscriptionKernel
+        The kernel to resolve the ambiguity symbols and find the complement bases of a DNA sequence.
 
     Methods
     -------
@@ -79,8 +123,6 @@ class Nucleus:
         Start the transcription process of a DNA sequence.
     trascript_gene(dna_sequence, variables, sequence_count)
         Start the transcription of a gene.
-    find_complement_base(base)
-        Find the complement base of a base.
     splicing(rna_sequence)
         Remove the introns from a RNA sequence.
     editing(rna_sequence)
@@ -101,16 +143,28 @@ class Nucleus:
         Release a nucleotide.
     """
     def __init__(self, environment, extron_sequences_list, editing_sites_dict, 
-            number_rna_polymerases, nucleotides, random_seed):
+            number_rna_polymerases, nucleotides, random_seed, promoter_index=None,
+            transcription_granularity=TRANSCRIPTION_GRANULARITY, history_spill_folder=None,
+            history_resolution=None, queue_discipline=FIFO):
         self.env = environment
 
         self.extron_sequences_list = extron_sequences_list
+        self.extron_sequences_set = frozenset(extron_sequences_list)
         self.editing_sites_dict = editing_sites_dict
-        self.editing_sites_dict = dict(sorted(self.editing_sites_dict.items(), 
-            key=lambda x: len(x[0]), reverse=False)) # sort by length of key
+        self.rna_editor = RNAEditor(self.editing_sites_dict) # compile the editing sites once
         
-        self.rna_polymerase = EukaryoticCellResource(self.env, capacity=number_rna_polymerases)
+        self.rna_polymerase = EukaryoticCellResource(self.env, capacity=number_rna_polymerases,
+            history_spill_path=history_spill_path(history_spill_folder, 'rna_polymerase_history'),
+            history_resolution=history_resolution, queue_discipline=queue_discipline)
         self.nucleotides = nucleotides
+        self.promoter_scanner = PromoterScanner(PROMOTERS, MIN_LENGTH_PROMOTER)
+        self.promoter_index = promoter_index
+
+        if int(transcription_granularity) < 1:
+            raise ValueError('transcription_granularity must be a positive integer')
+        self.transcription_granularity = int(transcription_granularity)
+        self.transcription_kernel = TranscriptionKernel(NucleotidesSymbolsAllocations,
+            BASE_COMPLEMENT_DNA2RNA, RNA_POLYMERASE_ERROR_RATE, random_seed)
 
         random.seed(random_seed)
     
@@ -120,50 +174,47 @@ class Nucleus:
         The promoter is the region of a DNA sequence where the RNA polymerase binds to start the transcription.
         The DNA sequence is split in the promoter regions.
         """
-        for promoter in PROMOTERS:
-            promoter_positions_list = self.find_promoters_positions(dna_sequence, PROMOTERS[promoter])
-            if len(promoter_positions_list) != 0:
-                variables.promoters_box = promoter
-                promoter_length = LENGTH_PROMOTER[promoter]
-                break
+        # look up the promoters in the index of the dataset, if available, by row of the dataset
+        # or by hash of the DNA sequence when it is not identified by row
+        if self.promoter_index is None:
+            indexed = None
+        elif variables.sequence_id is not None:
+            indexed = self.promoter_index.lookup_row(variables.sequence_id)
+        else:
+            indexed = self.promoter_index.lookup(dna_sequence)
+
+        if indexed is not None:
+            promoter, segments = indexed
+        else: # find the promoters of all the boxes in a single pass
+            promoter, promoter_positions_list = self.promoter_scanner.find(dna_sequence)
+            segments = self.promoter_scanner.segments(
+                promoter_positions_list, LENGTH_PROMOTER.get(promoter, 0), len(dna_sequence))
         
-        if len(promoter_positions_list) == 0:
+        if promoter is None:
             return None
         else:
-            # split the DNA sequence in the promoter regions
-            dna_sequences_list = []
+            variables.promoters_box = promoter
 
-            for i in range(len(promoter_positions_list)-1):
-                dna_sequences_list.append(dna_sequence[promoter_positions_list[i]+promoter_length
-                    :promoter_positions_list[i+1]])
-                
-            dna_sequences_list.append(dna_sequence[promoter_positions_list[-1]+promoter_length:])
-            
-            return dna_sequences_list
+            # split the DNA sequence in the promoter regions
+            return [dna_sequence[start:end] for start, end in segments]
     
     def find_promoters_positions(self, dna_sequence, promoters_list):
         """
         Find the positions of the promoters in a DNA sequence.
         """
-        # find promoter sequences in the DNA sequence
-        promoter_positions_list = sorted([i for promoter in promoters_list for i, _ in 
-            enumerate(dna_sequence) if dna_sequence[i:].startswith(promoter)])
-        
-        # if dist between promoters is less than 100, consider it as a single promoter
-        i = 0
-        while i < len(promoter_positions_list)-1: 
-            if promoter_positions_list[i+1] - promoter_positions_list[i] < MIN_LENGTH_PROMOTER:
-                del promoter_positions_list[i+1]  
-            else: i += 1
+        promoters_positions_dict = PromoterScanner(
+            {'promoter': promoters_list}, MIN_LENGTH_PROMOTER).scan(dna_sequence)
         
-        return promoter_positions_list
+        return promoters_positions_dict['promoter']
 
     def transcript(self, dna_sequence, variables, seq_count): # enzime: RNA polymerase
         """
         Start the transcription process of a DNA sequence.
         """
-        with self.rna_polymerase.request() as request:
+        with self.rna_polymerase.request(size=len(dna_sequence), owner=variables.sequence_count,
+                priority=PROMOTER_PRIORITY.get(variables.promoters_box)) as request:
             yield request  # wait for RNA polymerase to be available
+            self.rna_polymerase.available(request) # register the time when the resource is available
 
             # start transcript processes for DNA sequence
             messenger_rna_sequence = yield self.env.process(
@@ -175,11 +226,6 @@ class Nucleus:
         """
         Transcription process of a DNA sequence.
         """
-        self.rna_polymerase.available() # register the time when the resource is available
-        
-        # make sequence univoque to transcript
-        dna_sequence = ''.join([random.choice(NucleotidesSymbolsAllocations[n]) for n in dna_sequence])
-
         # transcript from gene to pre-mRNA
         messenger_rna_sequence = yield self.env.process(
             self.trascript_gene(dna_sequence, variables, seq_count))
@@ -189,7 +235,7 @@ class Nucleus:
 
         # elongation phase
         messenger_rna_sequence = self.splicing(messenger_rna_sequence)
-        messenger_rna_sequence = self.editing(messenger_rna_sequence)
+        messenger_rna_sequence = yield self.env.process(self.editing(messenger_rna_sequence))
         
         # post-transcriptional modifications
         yield self.env.process(self.cleavage())
@@ -203,35 +249,35 @@ class Nucleus:
     def trascript_gene(self, dna_sequence, variables, sequence_count):
         """
         Transcription from a gene to a pre-mRNA, the first step of the transcription process.
-        The DNA sequence is transcribed to a messenger RNA sequence.
+        The DNA sequence is made univoque and transcribed to a messenger RNA sequence, for each base
+        the complement nucleotide is requested and replicated within the single process of the gene.
+        With a transcription granularity greater than one, the nucleotides of each chunk are
+        reserved together, without events, and replicated at once while their levels are high enough.
         """
-        messenger_rna_sequence = ''
+        # resolve the ambiguity symbols and find the complement bases, with the transcription errors
+        messenger_rna_sequence = self.transcription_kernel.transcript(dna_sequence)
 
-        for base in dna_sequence:
-            complement_base_process = yield self.env.process(self.find_complement_base(base))
-            variables.complement_base_queue_dict[sequence_count].append(complement_base_process)
+        for i in range(0, len(messenger_rna_sequence), self.transcription_granularity):
+            complement_bases = messenger_rna_sequence[i:i+self.transcription_granularity]
+            bases_count = Counter(complement_bases)
 
-            yield complement_base_process
-            complement_base = complement_base_process.value
-            messenger_rna_sequence += complement_base
-
-            # wait for all the transcription gene process to be completed
-            while variables.complement_base_queue_dict[sequence_count]:
-                variables.complement_base_queue_dict[sequence_count].pop(0)
+            if (len(complement_bases) > 1 and self._chunk_available(bases_count)
+                    and self.nucleotides.try_reserve(bases_count)):
+                # replicate the reserved complement nucleotides of the chunk
+                yield self.env.timeout(REPLICATION_TIME * len(complement_bases))
+            else:
+                for complement_base in complement_bases:
+                    # request the complement nucleotide and replicate it
+                    with self.nucleotides.request(complement_base, 1) as request:
+                        yield request
+                    yield self.env.timeout(REPLICATION_TIME) # time to replicate a nucleotide
 
         return messenger_rna_sequence
     
-    def find_complement_base(self, base):
-        """
-        Find the complement base of a base.
-        """
-        if random.random() > RNA_POLYMERASE_ERROR_RATE:
-            complement_base = BASE_COMPLEMENT_DNA2RNA[base]
-        else: 
-            complement_base = random.choice([b for b in list(BASE_COMPLEMENT_DNA2RNA.values()) 
-                if b != BASE_COMPLEMENT_DNA2RNA[base]])
-
-        return self.request_nucleotide(complement_base)
+    def _chunk_available(self, bases_count):
+        # transcript the chunk at once only if the nucleotides are far from running out
+        return all(self.nucleotides.level(base) >= max(amount, MIN_LEVEL_CHUNKED_TRANSCRIPTION)
+            for base, amount in bases_count.items())
     
     def capping(self, rna_sequence):
         """
@@ -242,35 +288,48 @@ class Nucleus:
     def splicing(self, rna_sequence):
         """
         Remove the introns (non coding regions) from a RNA sequence.
+        The sequence is scanned once and the nucleotides of the introns are degraded
+        with a single release for each base type.
         """
         # remove introns: non-coding regions
+        exons_list = [rna_sequence[:LENGTH_METHYL_CAP]]
+        introns_count = Counter()
         i = LENGTH_METHYL_CAP # index
         while i+3 < len(rna_sequence):
-            if rna_sequence[i:i+LENGTH_EXTRON_SEQUENCE] in self.extron_sequences_list:
+            extron = rna_sequence[i:i+LENGTH_EXTRON_SEQUENCE]
+            if extron in self.extron_sequences_set:
+                exons_list.append(extron)
                 i += LENGTH_EXTRON_SEQUENCE
             else: 
-                intron = rna_sequence[i]
-                self.release_nucleotide(intron) # degrade intron
-                rna_sequence = rna_sequence[:i] + rna_sequence[i+1:]
+                introns_count[rna_sequence[i]] += 1
+                i += 1
+        exons_list.append(rna_sequence[i:])
 
-        return rna_sequence
+        for intron, amount in introns_count.items():
+            self.release_nucleotide(intron, amount) # degrade introns
+
+        return ''.join(exons_list)
 
     def editing(self, rna_sequence):
         """
         Edit a RNA sequence, replacing the editing sites with the edited sites.
+        The nucleotides of the edited sites are reserved together and the ones of the editing
+        sites are degraded, with a single release for each base type.
         """
-        for editing_site in self.editing_sites_dict.keys():
-            # find the editing site in the rna sequence
-            editing_site_count = rna_sequence.count(editing_site)
-            for base in editing_site: # request the nucleotides to edit the rna sequence
-                self.request_nucleotide(base, editing_site_count)
-            
-            # edit the rna sequence
-            rna_sequence = rna_sequence.replace(editing_site, self.editing_sites_dict[editing_site])
-            
-            # degrade the editing site
-            for base in editing_site:
-                self.release_nucleotide(base, editing_site_count)
+        # edit the rna sequence
+        rna_sequence, removed_bases_count, inserted_bases_count = self.rna_editor.edit(rna_sequence)
+
+        # reserve the nucleotides to edit the rna sequence
+        inserted_bases_count = {base: amount for base, amount in inserted_bases_count.items()
+            if base in BASE_COMPLEMENT_RNA2DNA}
+        if inserted_bases_count:
+            with self.nucleotides.reserve(inserted_bases_count) as reservation:
+                yield reservation
+
+        # degrade the editing sites
+        for base, amount in removed_bases_count.items():
+            if base in BASE_COMPLEMENT_RNA2DNA:
+                self.release_nucleotide(base, amount)
 
         return rna_sequence
     
@@ -1,10 +1,15 @@
-from Bio.Seq import Seq
-from Bio.SeqUtils import seq3
-from Bio import BiopythonWarning
-import warnings
+import json
 import random
+import numpy as np
 from src.resources.resource import EukaryoticCellResource
 from src.resources.transfer_mrna import TransferRNA
+from src.resources.history import history_spill_path
+from src.resources.scheduling import FIFO
+from src.process.transcription import PROMOTER_PRIORITY
+from src.utils.translation_kernel import TranslationKernel
+
+DATA_PATH = 'data/'
+PEPTIDES_PATH = DATA_PATH + 'peptides.json'
 
 START_CODON = 'AUG' # start codon
 AMINO_GROUP = 'NH2-' # amino group
@@ -17,6 +22,7 @@ TRANSFER_RNA_ATTACH_TIME = 1e-3 # seconds to attach each transfer RNA
 ELONGATION_TIME = 5e-2 # seconds to add each amino acid
 TRANSLATION_TIMEOUT = 10
 MRNA_DECODED_ERROR_RATE = 1e-4 # 1 mistake every 10.000 amino acids
+TRNA_BULK_ACQUISITION = False # request the transfer RNA once for each codon type
 
 class Ribosome:
     """
@@ -39,6 +45,23 @@ class Ribosome:
         The list of amminoacids.
     random_seed : int
         The random seed for the simulation environment.
+    trna_bulk_acquisition : bool, optional
+        If True, the transfer RNA of each codon type is requested once for all the codons of
+        the mRNA sequence, with the combined attach time, and per codon when its resource is
+        contended. Default is False.
+    use_molecules_pool : bool, optional
+        If True, the transfer RNA are stored in a single EukaryoticCellPool. Default is False.
+    history_spill_folder : str, optional
+        The folder where the histories of the resources are written in chunks during the
+        simulation. Default is None, the histories are kept in memory.
+    history_resolution : float, optional
+        The duration of the buckets in which the histories of the resources are aggregated.
+        Default is None, every event is recorded.
+    queue_discipline : str, optional
+        The discipline selecting the next mRNA sequence to translate among the ones waiting
+        for a ribosome, one of the keys of QUEUE_DISCIPLINES. The requests carry the length
+        of the mRNA sequence, the priority of the promoter box and the DNA sequence they
+        belong to as hints. Default is FIFO.
 
     Attributes
     ----------
@@ -50,6 +73,12 @@ class Ribosome:
         The transfer RNA in the cell.
     nucleotides : Nucleotides
         The nucleotides in the cell.
+    translation_kernel : TranslationKernel
+        The kernel to translate the mRNA sequences with the integer codon table.
+    rng : numpy.random.Generator
+        The random generator of the errors in the translation process.
+    trna_bulk_acquisition : bool
+        If True, the transfer RNA of each codon type is requested once.
 
     Methods
     -------
@@ -63,11 +92,15 @@ class Ribosome:
         Activation of the translation process.
     initialization(mrna_sequence)
         Initialization of the translation process.
-    elongation(mrna_sequence)
+    prepare_translation(mrna_sequence)
+        Compute the translation of a mRNA sequence, shared by all the ribosomes translating it.
+    elongation(translation)
         Elongation of the translation process.
-    request_trna(codon)
+    acquire_trna_bulk(codons)
+        Acquire the transfer RNA of the codons, once for each codon type.
+    request_trna(codon, request=None)
         Request transfer RNA with the correct anticodon.
-    compute_degradation_probability(mrna_sequence, mrna_degradation_rate)
+    compute_degradation_probability(mrna_length, mrna_degradation_rate)
         Compute the probability of the mRNA degradation.
     mrna_degradation(mrna_sequence, poly_adenine_tail_len)
         Degradation of the mRNA sequence, enzima: ribonuclease.
@@ -75,14 +108,23 @@ class Ribosome:
         Release a nucleotide in the cell.
     """ 
     def __init__(self, environment, number_ribosomes, number_rna_transfers_per_codon,
-            codons_list, nucleotides, amminoacids, random_seed):
+            codons_list, nucleotides, amminoacids, random_seed, trna_bulk_acquisition=TRNA_BULK_ACQUISITION,
+            use_molecules_pool=False, history_spill_folder=None, history_resolution=None,
+            queue_discipline=FIFO):
         # ribonucleoprotein complex in the cytoplasm
         self.env = environment
-        self.ribosomes = EukaryoticCellResource(self.env, capacity=number_ribosomes)
+        self.ribosomes = EukaryoticCellResource(self.env, capacity=number_ribosomes,
+            history_spill_path=history_spill_path(history_spill_folder, 'ribosome_history'),
+            history_resolution=history_resolution, queue_discipline=queue_discipline)
         self.rna_transfer = TransferRNA(self.env, amount=number_rna_transfers_per_codon,
-            codons_list=codons_list, random_seed=random_seed)
+            codons_list=codons_list, random_seed=random_seed, use_pool=use_molecules_pool,
+            history_spill_folder=history_spill_folder, history_resolution=history_resolution)
         self.nucleotides = nucleotides
         self.amminoacids = amminoacids
+        self.translation_kernel = TranslationKernel(
+            dict(zip(codons_list, amminoacids)), json.load(open(PEPTIDES_PATH)))
+        self.rng = np.random.default_rng(random_seed)
+        self.trna_bulk_acquisition = trna_bulk_acquisition
         
         random.seed(random_seed)
 
@@ -90,8 +132,10 @@ class Ribosome:
         """
         Start the translation process.
         """
-        with self.ribosomes.request() as request:
+        with self.ribosomes.request(size=len(mrna_sequence), owner=variables.sequence_count,
+                priority=PROMOTER_PRIORITY.get(variables.promoters_box)) as request:
             yield request # wait for a ribosome to be available
+            self.ribosomes.available(request) # register the time when the resource is available
             
             polypeptides_chain, polypeptides_chain_ext, mrna_degradated = yield self.env.process(
                 self.translation_process(mrna_sequence, variables, seq_count))
@@ -102,24 +146,27 @@ class Ribosome:
         """
         Translation process.
         """
-        self.ribosomes.available() # register the time when the resource is available
         variables.proteins_sintetized[seq_count] += 1
 
-        # translation process
-        mrna_sequence = self.degradation_cap_tail(mrna_sequence)
-        initial_mrna_sequence = mrna_sequence
+        # translation of the mRNA, computed by the first ribosome and reused by the following ones
+        translation = variables.translation_cache.get(seq_count)
+        if translation is None:
+            translation = self.prepare_translation(mrna_sequence)
+            variables.translation_cache[seq_count] = translation
 
+        # translation process
         yield self.env.process(self.activation())
-        mrna_sequence = self.initialization(mrna_sequence)
         polypeptides_chain, polypeptides_chain_ext = yield self.env.process(
-            self.elongation(mrna_sequence))
+            self.elongation(translation))
         
         yield self.env.timeout(TRANSLATION_TIMEOUT)
 
         # mRNA degradation
-        if self.compute_degradation_probability(initial_mrna_sequence, 
+        if self.compute_degradation_probability(translation['mrna_length'], 
             variables.mrna_degradation_rate[seq_count]) >= random.random():
-            self.mrna_degradation(initial_mrna_sequence, variables.poly_adenine_tail_len[seq_count])
+            self.mrna_degradation(self.degradation_cap_tail(mrna_sequence), 
+                variables.poly_adenine_tail_len[seq_count])
+            del variables.translation_cache[seq_count] # evict the translation of the degraded mRNA
             mrna_degradated = True
         else:
             variables.mrna_degradation_rate[seq_count] += 1e-4
@@ -143,41 +190,49 @@ class Ribosome:
 
     def initialization(self, mrna_sequence):
         """
-        Initialization of the translation process, find the start codon for the translation.
+        Initialization of the translation process, find the position of the start codon for the translation.
         """
         start_codon = START_CODON # start codon
-        start_codon_position = str(mrna_sequence).find(start_codon)
+        return mrna_sequence.find(start_codon)
+    
+    def prepare_translation(self, mrna_sequence):
+        """
+        Compute the translation of a mature mRNA sequence: the position of the start codon,
+        the integer codons from the start codon and the error-free polypeptides chain.
+        The translation is the same for all the ribosomes translating the mRNA.
+        """
+        mrna_sequence = self.degradation_cap_tail(mrna_sequence)
+        start_codon_position = self.initialization(mrna_sequence)
+        codons = self.translation_kernel.encode(mrna_sequence[start_codon_position+LENGTH_CODON:])
 
-        return mrna_sequence[start_codon_position+LENGTH_CODON:]
+        return {
+            'mrna_length': len(mrna_sequence),
+            'start_codon_position': start_codon_position,
+            'codons': codons,
+            'polypeptides_chain': self.translation_kernel.translate(codons),
+            }
     
-    def elongation(self, mrna_sequence):
+    def elongation(self, translation):
         """
         Elongation of the translation process.
         Request transfer RNA with the correct anticodon.
         """
-        for i in range(int(len(mrna_sequence) // LENGTH_CODON)):
-            j = i * LENGTH_CODON
-            codon = mrna_sequence[j:j+LENGTH_CODON]
-            with self.rna_transfer.trna_resources_dict[codon].request() as request:
-                yield request
-                yield self.env.process(self.request_trna(codon))
-
-        # translation of the mRNA sequence
-        mrna_sequence = Seq(mrna_sequence)
-        with warnings.catch_warnings():
-            warnings.simplefilter('ignore', BiopythonWarning)
-            polypeptides_chain_seq = mrna_sequence.translate(stop_symbol='', to_stop=True)
+        if self.trna_bulk_acquisition:
+            yield self.env.process(self.acquire_trna_bulk(translation['codons']))
+        else:
+            for codon in translation['codons'].tolist():
+                codon = self.translation_kernel.codons[codon]
+                with self.rna_transfer.trna_resources_dict[codon].request() as request:
+                    yield request
+                    yield self.env.process(self.request_trna(codon, request))
         
         # error in the translation process
-        polypeptides_chain_list = list(polypeptides_chain_seq)
-        polypeptides_chain = ''
-        for amminoacid in polypeptides_chain_list:
-            polypeptides_chain = polypeptides_chain + (random.choice([a for a in list(self.amminoacids) 
-                 if a != amminoacid]) if random.random() <= MRNA_DECODED_ERROR_RATE else amminoacid)
+        polypeptides_chain = self.translation_kernel.mutate(
+            translation['polypeptides_chain'], MRNA_DECODED_ERROR_RATE, self.rng)
 
         if len(polypeptides_chain) > 0:
             yield self.env.timeout(ELONGATION_TIME * len(polypeptides_chain)) # 0.05 seconds to add each amino acid
-            polypeptides_chain_ext = seq3(polypeptides_chain)
+            polypeptides_chain_ext = self.translation_kernel.three_letter(polypeptides_chain)
 
             polypeptides_chain = AMINO_GROUP + polypeptides_chain + CARBOXYL_GROUP
             polypeptides_chain_ext = AMINO_GROUP + polypeptides_chain_ext + CARBOXYL_GROUP
@@ -186,26 +241,51 @@ class Ribosome:
         else:
             return None, None
     
-    def request_trna(self, codon):
+    def acquire_trna_bulk(self, codons):
+        """
+        Acquire the transfer RNA of the codons from the histogram of the codons: the transfer
+        RNA of each codon type is requested once and attached for the combined attach time.
+        The codons of a codon type whose resource is contended are acquired one by one.
+        """
+        codons_count = np.bincount(codons, minlength=len(self.translation_kernel.codons))
+        for codon, amount in zip(self.translation_kernel.codons, codons_count.tolist()):
+            if amount == 0:
+                continue
+
+            trna_resource = self.rna_transfer.trna_resources_dict[codon]
+            if trna_resource.contended():
+                for _ in range(amount):
+                    with trna_resource.request() as request:
+                        yield request
+                        yield self.env.process(self.request_trna(codon, request))
+            else:
+                yield self.env.process(trna_resource.hold(amount, TRANSFER_RNA_ATTACH_TIME))
+
+    def request_trna(self, codon, request=None):
         """
         Request transfer RNA with the correct anticodon.
         """
-        self.rna_transfer.trna_resources_dict[codon].available()
+        self.rna_transfer.trna_resources_dict[codon].available(request)
         yield self.env.timeout(TRANSFER_RNA_ATTACH_TIME)
 
-    def compute_degradation_probability(self, mrna_sequence, mrna_degradation_rate):
+    def compute_degradation_probability(self, mrna_length, mrna_degradation_rate):
         """
         Compute the probability of the mRNA degradation according to the length of the mRNA sequence.
         """
-        return 1 - (1 - mrna_degradation_rate) ** len(mrna_sequence)
+        return 1 - (1 - mrna_degradation_rate) ** mrna_length
 
     def mrna_degradation(self, mrna_sequence, poly_adenine_tail_len):
         """
         Degradation of the mRNA sequence, enzime: ribonuclease.
+        The nucleotides of the mRNA sequence and of the poly-A tail are counted per base and
+        released in batches.
         """
         # enzima: ribonuclease
-        [self.release_nucleotide(nucleotide) for nucleotide in mrna_sequence]
-        self.release_nucleotide('A', poly_adenine_tail_len)
+        bases_count = np.bincount(np.frombuffer(mrna_sequence.encode('ascii'), dtype=np.uint8), minlength=256)
+        bases_count = {base: int(bases_count[ord(base)]) for base in self.nucleotides.nucleotides_containers_dict}
+        bases_count['A'] += poly_adenine_tail_len
+
+        self.nucleotides.release_degraded(bases_count, self.rng)
     
     def release_nucleotide(self, base, amount=1):
         """
@@ -1,18 +1,77 @@
 import simpy.resources.container as SimpyContainer
-import json
+from heapq import heappush, heappop
 import random
+from src.resources.history import History, BucketedHistory, LEVEL_HISTORY_COLUMNS, LEVEL_BUCKETS_SERIES
 
 MIN_DEGRADATION_TIME = 60 # seconds
 MAX_DEGRADATION_TIME = 180 # seconds
 
+class Recycler:
+    """
+    This class returns amounts to a container after a delay with a single process. The
+    pending returns are kept in a heap of (due time, amount), the process wakes at the
+    earliest due time and applies together all the returns due by then. The process is
+    started by the first pending return and ends when there are no pending returns.
+
+    Parameters:
+    -----------
+    env : simpy.Environment
+        The simulation environment
+    apply : callable
+        The function called with the amount to return
+
+    Methods:
+    --------
+    push(delay, amount)
+        Return the amount after the delay
+    pending()
+        Return the total amount of the pending returns
+    """
+    def __init__(self, env, apply):
+        self._env = env
+        self._apply = apply
+        self._returns = []
+        self._process = None
+        self._wake = None
+        self._wake_time = float('inf')
+
+    def push(self, delay, amount):
+        due_time = self._env.now + delay
+        heappush(self._returns, (due_time, amount))
+
+        if self._process is None:
+            self._process = self._env.process(self._recycle())
+        elif due_time < self._wake_time and self._wake is not None and not self._wake.triggered:
+            self._wake.succeed() # wake the process earlier
+
+    def pending(self):
+        return sum(amount for _, amount in self._returns)
+
+    def _recycle(self):
+        while self._returns:
+            self._wake_time = self._returns[0][0]
+            self._wake = self._env.event()
+            yield self._env.timeout(max(self._wake_time - self._env.now, 0)) | self._wake
+            if self._wake.triggered: # a return is due earlier
+                continue
+
+            amount = 0
+            while self._returns and self._returns[0][0] <= self._wake_time:
+                amount += heappop(self._returns)[1]
+            self._apply(amount)
+
+        self._process = None
+        self._wake = None
+        self._wake_time = float('inf')
+
 class EukaryoticCellContainer(SimpyContainer.Container):
     """
     This class extends the simpy Container class to add the degradation of the
     amount in the container. The degradation time is a random value between
-    MIN_DEGRADATION_TIME and MAX_DEGRADATION_TIME. The degradation time is
-    simulated using a timeout event in the simpy environment.
+    MIN_DEGRADATION_TIME and MAX_DEGRADATION_TIME. The released amounts are put
+    back into the container by a single Recycler process after the degradation time.
     The level and time when the amount is put or get from the container are
-    saved in a history dictionary.
+    saved in a history dictionary, or aggregated in buckets of the history resolution.
     
     Parameters:
     -----------
@@ -24,57 +83,99 @@ class EukaryoticCellContainer(SimpyContainer.Container):
         The initial amount in the container
     random_seed : int
         The random seed for the degradation time
+    history_spill_path : str, optional
+        The path of the file where the history is written in chunks during the simulation,
+        if None the history is kept in memory
+    history_resolution : float, optional
+        The duration of the buckets of the history, if None every level is recorded
 
     Attributes:
     -----------
-    _history : dict
-        The history of the level and time in the container
+    _history : History or BucketedHistory
+        The columnar history of the level and time in the container
+    on_put : callable
+        The function called without arguments after an amount is put into the container
+        and the waiting gets are served, None by default
 
     Methods:
     --------
     get(*args, **kwargs)
         Get the amount from the container
+    can_get(amount)
+        Return True if the amount can be taken at once, without waiting gets before
+    take(amount)
+        Take the amount from the container at once, without an event
     put(amount)
         Put the amount into the container
+    release(amount, degradation_time=None)
+        Put the amount into the container after the degradation time, random if None
     level_history()
         Return the level history
     save_history(path_to_save)
-        Save the level history in a json file
+        Save the level history in a json file, or in a history file if it is spilled
     """
-    def __init__(self, env, capacity, init, random_seed):
+    def __init__(self, env, capacity, init, random_seed, history_spill_path=None, history_resolution=None):
         super().__init__(env, capacity, init)
         random.seed(random_seed)
+        self.history_spill_path = history_spill_path
+        self.history_resolution = history_resolution
+        self.on_put = None
+        self._recycler = Recycler(env, self._put_degraded)
         self._reset_history()
         
     def get(self, *args, **kwargs):
         get = super().get(*args, **kwargs) # get the amount from the container
 
-        # save level and time in the history
-        self._history['level'].append(self.level)
-        self._history['time'].append(self._env.now)
+        self._record_level()
 
         return get
+
+    def can_get(self, amount):
+        return not self.get_queue and self.level >= amount
+
+    def take(self, amount):
+        self._level -= amount # the caller checks can_get first
+
+        self._record_level()
     
     def put(self, amount):
         degradation_time = round(random.uniform(
             MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME), 4)
         yield self._env.timeout(degradation_time)
 
-        super().put(amount) # put the amount into the container
-
-        # save level and time in the history
-        self._history['level'].append(self.level)
-        self._history['time'].append(self._env.now)
+        self._put_degraded(amount)
     
+    def release(self, amount, degradation_time=None):
+        if degradation_time is None:
+            degradation_time = round(random.uniform(
+                MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME), 4)
+        self._recycler.push(degradation_time, amount)
+
+    def _put_degraded(self, amount):
+        put = super().put(amount) # put the amount into the container
+        if self.on_put is not None: # after the waiting gets are served
+            put.callbacks.append(lambda event: self.on_put())
+
+        self._record_level()
+
     def level_history(self):
         return self._history
     
     def save_history(self, path_to_save):
-        with open(path_to_save, 'w') as outfile:
-            json.dump(self.level_history(), outfile)
+        self.level_history().save(path_to_save)
         
+    def _record_level(self):
+        # save level and time in the history
+        if self.history_resolution is not None:
+            self._history.record('level', self._env.now, self.level)
+        else:
+            self._history.append('level', self.level)
+            self._history.append('time', self._env.now)
+
     def _reset_history(self):
-        self._history = {
-            'level': [self.level],
-            'time': [self._env.now]
-            }
\ No newline at end of file
+        if self.history_resolution is not None:
+            self._history = BucketedHistory(LEVEL_BUCKETS_SERIES, self.history_resolution,
+                spill_path=self.history_spill_path)
+        else:
+            self._history = History(LEVEL_HISTORY_COLUMNS, spill_path=self.history_spill_path)
+        self._record_level()
\ No newline at end of file
@@ -0,0 +1,364 @@
+from array import array
+import numpy as np
+import struct
+import shutil
+import json
+import os
+import sys
+
+QUEUE_HISTORY_COLUMNS = {
+    'queue': 'q',
+    'request_time': 'd', # time when the request is made
+    'available_time': 'd', # time when the resource is available
+    'wait_time': 'd', # time the request waited in the queue
+    'end_time': 'd', # time when the resource is released
+    'usage_time': 'd' # time the resource is used
+    }
+LEVEL_HISTORY_COLUMNS = {
+    'level': 'd',
+    'time': 'd'
+    }
+BUCKET_STATS = ['time', 'min', 'max', 'last', 'count', 'mean'] # statistics of each bucket
+STEP_SERIES = 'step' # series of levels, the mean is weighted by the time of each level
+SAMPLE_SERIES = 'sample' # series of samples, the mean is the mean of the samples
+QUEUE_BUCKETS_SERIES = {
+    'queue': STEP_SERIES, # queue length at each request
+    'wait_time': SAMPLE_SERIES, # wait time of each request, at the availability time
+    'usage_time': SAMPLE_SERIES # usage time of each request, at the release time
+    }
+LEVEL_BUCKETS_SERIES = {
+    'level': STEP_SERIES
+    }
+HISTORY_CHUNK_SIZE = 65536 # number of entries of a column written to the history file at once
+HISTORY_FILE_MAGIC = b'ECHIST1\n'
+HISTORY_FILE_EXTENSION = '.hist'
+HISTORY_SPILL_SUFFIX = '.spill' # suffix of the history files written during the simulation
+CHUNK_HEADER = struct.Struct('<BI') # column index, number of entries
+
+class History:
+    """
+    This class stores the history of a resource or a container in columns. Each column is
+    an array of machine integers or floats, that grows geometrically, instead of a list of
+    Python objects. The columns are accessed by name as the values of a dictionary.
+    With a spill path, the columns are written to an append-only binary file in chunks of
+    chunk_size entries as the simulation runs, so that the memory used is bounded; only the
+    entries not yet written are kept in memory, the last entry of each column is always kept.
+
+    The history file starts with HISTORY_FILE_MAGIC, followed by the length and the json
+    header with the byte order and the typecode of each column. Each chunk is the index of
+    the column and the number of entries, followed by the raw entries.
+
+    Parameters:
+    -----------
+    columns : dict
+        The dictionary with the name of each column as the key and the array typecode
+        ('q' for integers, 'd' for floats) as the value
+    spill_path : str, optional
+        The path of the history file, if None the history is kept in memory
+    chunk_size : int, optional
+        The number of entries of a column written to the history file at once
+
+    Methods:
+    --------
+    append(name, value)
+        Append a value to a column
+    extend(name, values)
+        Append values to a column
+    keys()
+        Return the names of the columns
+    items()
+        Return the (name, column) pairs
+    to_numpy(copy=True)
+        Return the columns as NumPy arrays, copies of the columns or views on them
+    to_dict()
+        Return the columns as lists
+    save(path_to_save)
+        Save the history in a json file, or in a history file if the history is spilled
+    """
+    __slots__ = ('_columns', '_spill_path', '_chunk_size')
+
+    def __init__(self, columns, spill_path=None, chunk_size=HISTORY_CHUNK_SIZE):
+        self._columns = {name: array(typecode) for name, typecode in columns.items()}
+        self._spill_path = spill_path
+        self._chunk_size = chunk_size
+
+        if self._spill_path is not None:
+            with open(self._spill_path, 'wb') as history_file:
+                _write_header(history_file, columns)
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def append(self, name, value):
+        column = self._columns[name]
+        column.append(value)
+        if self._spill_path is not None and len(column) > self._chunk_size:
+            self._spill(name)
+
+    def extend(self, name, values):
+        column = self._columns[name]
+        column.extend(values)
+        if self._spill_path is not None and len(column) > self._chunk_size:
+            self._spill(name)
+
+    def keys(self):
+        return self._columns.keys()
+
+    def items(self):
+        return self._columns.items()
+
+    def to_numpy(self, copy=True):
+        """
+        Return the dictionary of the columns as NumPy arrays. By default the arrays are copies,
+        safe to take while the simulation records the history. If copy is False, the arrays
+        are zero-copy views on the columns, for the analysis of a history no longer recorded:
+        while a view exists its column cannot grow, and appending to it raises a BufferError.
+        """
+        if copy:
+            return {name: np.frombuffer(column, dtype=column.typecode).copy() for name, column in self._columns.items()}
+        return {name: np.frombuffer(column, dtype=column.typecode) for name, column in self._columns.items()}
+
+    def to_dict(self):
+        return {name: column.tolist() for name, column in self._columns.items()}
+
+    def save(self, path_to_save, tail=None):
+        """
+        Save the history in a json file. If the history is spilled, the history file with the
+        entries still in memory is saved instead, with the HISTORY_FILE_EXTENSION extension.
+        The entries of tail, a dictionary of arrays by column, are saved after the history.
+        """
+        tail = tail if tail is not None else dict()
+        if self._spill_path is None:
+            with open(path_to_save, 'w') as outfile:
+                json.dump({name: column.tolist() + tail[name].tolist() if name in tail else column.tolist()
+                    for name, column in self._columns.items()}, outfile)
+            return
+
+        path_to_save = os.path.splitext(path_to_save)[0] + HISTORY_FILE_EXTENSION
+        shutil.copyfile(self._spill_path, path_to_save)
+        with open(path_to_save, 'ab') as history_file:
+            for index, (name, column) in enumerate(self._columns.items()):
+                _write_chunk(history_file, index, column)
+                if name in tail:
+                    _write_chunk(history_file, index, tail[name])
+
+    def _spill(self, name):
+        # write all the entries but the last one, read by the owner of the history
+        column = self._columns[name]
+        index = list(self._columns).index(name)
+        with open(self._spill_path, 'ab') as history_file:
+            _write_chunk(history_file, index, column[:-1])
+        del column[:-1]
+
+class _Bucket:
+    # statistics of the open bucket of a series
+    __slots__ = ('start', 'origin', 'min', 'max', 'last', 'count', 'total', 'last_time')
+
+    def __init__(self, start, origin, value):
+        self.start = start # start time of the bucket
+        self.origin = origin # time from which the mean is computed
+        self.min = value
+        self.max = value
+        self.last = value
+        self.count = 0
+        self.total = 0. # sum of the samples, or integral of the levels over time
+        self.last_time = origin
+
+class BucketedHistory:
+    """
+    This class stores the history of a resource or a container aggregated in buckets of
+    fixed duration, so that its size grows with the simulated time instead of the number of
+    events. For each series and each bucket with at least one event, the start time of the
+    bucket, the min, the max, the last value, the number of values and the mean are stored
+    in the columns '<series>_<statistic>' of a History. The mean of a step series, as a
+    level, is weighted by the time spent at each level, the level at the start of a bucket is
+    the last level of the previous bucket; the mean of a sample series is the mean of the
+    samples. The open buckets are included when the history is exported or saved.
+    The values are bucketed by the time they are recorded, which must not decrease within
+    a series: the queue length at the request time, the wait time at the time the resource
+    is available, the usage time at the release time and the level at the time it changes.
+
+    Parameters:
+    -----------
+    series : dict
+        The dictionary with the name of each series as the key and STEP_SERIES or
+        SAMPLE_SERIES as the value
+    resolution : float
+        The duration of the buckets
+    spill_path : str, optional
+        The path of the history file, if None the history is kept in memory
+    chunk_size : int, optional
+        The number of buckets of a column written to the history file at once
+
+    Methods:
+    --------
+    record(name, time, value, count=1)
+        Record count values of a series at a time
+    keys()
+        Return the names of the columns
+    items()
+        Return the (name, column) pairs, with the open buckets
+    to_numpy(copy=True)
+        Return the columns as NumPy arrays, with the open buckets
+    to_dict()
+        Return the columns as lists, with the open buckets
+    save(path_to_save)
+        Save the history in a json file, or in a history file if the history is spilled
+    """
+    __slots__ = ('resolution', '_kinds', '_buckets', '_series', '_history')
+
+    def __init__(self, series, resolution, spill_path=None, chunk_size=HISTORY_CHUNK_SIZE):
+        if resolution <= 0:
+            raise ValueError('the resolution of the history must be positive')
+        self.resolution = resolution
+        self._kinds = dict(series)
+        self._buckets = {name: None for name in series}
+        self._series = {f'{name}_{stat}': name for name in series for stat in BUCKET_STATS} # series of each column
+        self._history = History({f'{name}_{stat}': 'q' if stat == 'count' else 'd'
+            for name in series for stat in BUCKET_STATS}, spill_path=spill_path, chunk_size=chunk_size)
+
+    def __getitem__(self, name):
+        return self._column(name)
+
+    def __iter__(self):
+        return iter(self._history)
+
+    def __len__(self):
+        return len(self._history)
+
+    def record(self, name, time, value, count=1):
+        bucket = self._buckets[name]
+        start = (time // self.resolution) * self.resolution
+
+        if bucket is None:
+            bucket = self._buckets[name] = _Bucket(start, time, value)
+        elif start < bucket.start: # the bucket of the time is already closed
+            raise ValueError(f'time {time} of series {name} earlier than its open bucket at {bucket.start}')
+        elif start > bucket.start:
+            self._close(name, bucket)
+            carried = bucket.last if self._kinds[name] == STEP_SERIES else value
+            bucket = self._buckets[name] = _Bucket(start, start, carried)
+
+        if self._kinds[name] == STEP_SERIES:
+            bucket.total += bucket.last * (max(time, bucket.last_time) - bucket.last_time)
+            bucket.last_time = max(time, bucket.last_time)
+        else:
+            bucket.total += value * count
+        bucket.min = min(bucket.min, value)
+        bucket.max = max(bucket.max, value)
+        bucket.last = value
+        bucket.count += count
+
+    def keys(self):
+        return self._history.keys()
+
+    def items(self):
+        # each column is built when it is reached
+        return ((name, self._column(name)) for name in self._history)
+
+    def to_numpy(self, copy=True):
+        """
+        Return the dictionary of the columns as NumPy arrays, with the open buckets. The
+        arrays are always new arrays, the closed buckets followed by the open one, copy is
+        accepted for the interface of History.
+        """
+        tail = self._open_rows()
+        return {name: np.concatenate([np.frombuffer(column, dtype=column.typecode), tail[name]])
+            for name, column in self._history.items()}
+
+    def to_dict(self):
+        return {name: column.tolist() for name, column in self.to_numpy().items()}
+
+    def save(self, path_to_save):
+        self._history.save(path_to_save, tail=self._open_rows())
+
+    def _mean(self, name, bucket, end):
+        if self._kinds[name] == SAMPLE_SERIES:
+            return bucket.total / bucket.count
+        if end <= bucket.origin:
+            return bucket.last
+        return (bucket.total + bucket.last * (end - bucket.last_time)) / (end - bucket.origin)
+
+    def _row(self, name, bucket, end):
+        return {f'{name}_time': bucket.start, f'{name}_min': bucket.min, f'{name}_max': bucket.max,
+            f'{name}_last': bucket.last, f'{name}_count': bucket.count, f'{name}_mean': self._mean(name, bucket, end)}
+
+    def _close(self, name, bucket):
+        for column, value in self._row(name, bucket, bucket.start + self.resolution).items():
+            self._history.append(column, value)
+
+    def _column(self, name):
+        # the closed buckets of a single column, followed by its open bucket
+        column = self._history[name]
+        series = self._series[name]
+        bucket = self._buckets[series]
+        tail = array(column.typecode, [self._row(series, bucket, bucket.last_time)[name]] if bucket is not None else [])
+        return np.concatenate([np.frombuffer(column, dtype=column.typecode), tail])
+
+    def _open_rows(self):
+        # the mean of an open bucket is computed up to its last event
+        tail = {name: array(column.typecode) for name, column in self._history.items()}
+        for name, bucket in self._buckets.items():
+            if bucket is not None:
+                for column, value in self._row(name, bucket, bucket.last_time).items():
+                    tail[column].append(value)
+        return tail
+
+def _write_header(history_file, columns):
+    header = json.dumps({'byteorder': sys.byteorder, 'columns': columns}).encode('ascii')
+    history_file.write(HISTORY_FILE_MAGIC)
+    history_file.write(struct.pack('<I', len(header)))
+    history_file.write(header)
+
+def _write_chunk(history_file, index, column):
+    if len(column) > 0:
+        history_file.write(CHUNK_HEADER.pack(index, len(column)))
+        history_file.write(column.tobytes())
+
+def read_history(path):
+    """
+    Read a history file and return the dictionary of the columns as NumPy arrays, with the
+    chunks of each column concatenated.
+    """
+    with open(path, 'rb') as history_file:
+        if history_file.read(len(HISTORY_FILE_MAGIC)) != HISTORY_FILE_MAGIC:
+            raise ValueError(f'{path} is not a history file')
+        header_length, = struct.unpack('<I', history_file.read(4))
+        header = json.loads(history_file.read(header_length))
+
+        byteorder = '<' if header['byteorder'] == 'little' else '>'
+        dtypes = [np.dtype(typecode).newbyteorder(byteorder) for typecode in header['columns'].values()]
+        chunks_list = [[] for _ in dtypes]
+        while True:
+            chunk_header = history_file.read(CHUNK_HEADER.size)
+            if len(chunk_header) < CHUNK_HEADER.size:
+                break
+            index, length = CHUNK_HEADER.unpack(chunk_header)
+            chunks_list[index].append(np.frombuffer(
+                history_file.read(length * dtypes[index].itemsize), dtype=dtypes[index]))
+
+    return {name: np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+        for name, chunks, dtype in zip(header['columns'], chunks_list, dtypes)}
+
+def history_spill_path(folder, name):
+    """
+    Return the path of the history file written during the simulation by a resource or a
+    container in a folder, None if the folder is None.
+    """
+    return os.path.join(folder, name + HISTORY_SPILL_SUFFIX + HISTORY_FILE_EXTENSION) if folder is not None else None
+
+def load_history(path):
+    """
+    Load a saved history: the json file if it exists, otherwise the history file with the
+    same name and the HISTORY_FILE_EXTENSION extension.
+    """
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return read_history(os.path.splitext(path)[0] + HISTORY_FILE_EXTENSION)
@@ -0,0 +1,125 @@
+import math
+
+LATENCY_RELATIVE_ACCURACY = 0.01 # relative error of the quantiles
+LATENCY_PERCENTILES = [50, 95, 99]
+MIN_LATENCY = 1e-9 # smaller latencies are counted as zero, as the floating point noise of the times
+
+class LatencySketch:
+    """
+    This class represents a streaming sketch of the distribution of a latency, as the wait
+    time or the usage time of a resource. The latencies are counted in logarithmic buckets,
+    bucket i holding the latencies in (gamma^(i-1), gamma^i] with
+    gamma = (1 + accuracy) / (1 - accuracy), so that the quantiles are estimated with a
+    relative error below the accuracy and the memory grows with the logarithm of the range
+    of the latencies instead of their number. The latencies below MIN_LATENCY, as the wait
+    times of the requests served at once, are counted apart as zero.
+
+    Parameters:
+    -----------
+    accuracy : float, optional
+        The relative error of the quantiles
+
+    Attributes:
+    -----------
+    count : int
+        The number of latencies added
+    zero_count : int
+        The number of latencies counted as zero
+    total : float
+        The sum of the latencies
+    min : float
+        The minimum latency
+    max : float
+        The maximum latency
+
+    Methods:
+    --------
+    add(value, count=1)
+        Add count times a latency
+    merge(other)
+        Add the latencies of another sketch with the same accuracy
+    quantile(q)
+        Return the estimate of the q quantile, q between 0 and 1
+    percentiles(percentiles)
+        Return the dictionary of the estimates of the percentiles
+    summary()
+        Return the dictionary with the count, the mean, the min, the max and the LATENCY_PERCENTILES
+    """
+    __slots__ = ('accuracy', '_gamma', '_log_gamma', '_buckets', 'count', 'zero_count', 'total', 'min', 'max')
+
+    def __init__(self, accuracy=LATENCY_RELATIVE_ACCURACY):
+        if not 0 < accuracy < 1:
+            raise ValueError('the accuracy of the sketch must be between 0 and 1')
+        self.accuracy = accuracy
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets = dict() # index of the bucket: number of latencies
+        self.count = 0
+        self.zero_count = 0
+        self.total = 0.
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value, count=1):
+        if value < MIN_LATENCY:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        if other.accuracy != self.accuracy:
+            raise ValueError('the sketches must have the same accuracy')
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.zero_count += other.zero_count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        # linear interpolation between the latencies of the two closest ranks, as numpy.percentile,
+        # so that the tail quantiles of a few latencies are not rounded down to the lower rank
+        rank = q * (self.count - 1) # rank of the quantile among the sorted latencies
+        lower_rank = math.floor(rank)
+        lower = self._latency(lower_rank)
+        if rank == lower_rank:
+            return lower
+        return lower + (rank - lower_rank) * (self._latency(lower_rank + 1) - lower)
+
+    def _latency(self, rank):
+        # estimate of the latency of an integer rank among the sorted latencies
+        if rank < self.zero_count:
+            return max(self.min, 0.)
+
+        cumulative_count = self.zero_count
+        for index in sorted(self._buckets):
+            cumulative_count += self._buckets[index]
+            if rank < cumulative_count:
+                break
+        # the estimate in the middle of the bucket has relative error below the accuracy
+        estimate = 2 * self._gamma ** index / (self._gamma + 1)
+        return min(max(estimate, self.min), self.max)
+
+    def percentiles(self, percentiles=LATENCY_PERCENTILES):
+        return {f'p{percentile}': self.quantile(percentile / 100) for percentile in percentiles}
+
+    def summary(self):
+        summary = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count > 0 else None,
+            'min': self.min if self.count > 0 else None,
+            'max': self.max if self.count > 0 else None,
+            }
+        summary.update(self.percentiles())
+        return summary
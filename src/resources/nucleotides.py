@@ -1,6 +1,37 @@
-from src.resources.container import EukaryoticCellContainer
+import numpy as np
+import simpy
+from src.resources.container import EukaryoticCellContainer, MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME
+from src.resources.pool import EukaryoticCellPool, PoolContainer
+from src.resources.history import history_spill_path
 import os
 NUCLEOTIDES_NAMES = ['uracil', 'adenine', 'guanine', 'cytosine']
+DEGRADATION_BUCKETS = 8 # number of degradation times of the nucleotides of a degraded sequence
+
+class NucleotidesReservation(simpy.events.Event):
+    """
+    This class represents a reservation of several bases at once in Nucleotides. The
+    reservation is triggered when the levels of all the bases can satisfy it, and the bases
+    are taken together. Used as a context manager, the reservation is cancelled on exit if it
+    is still waiting; the bases taken are consumed.
+
+    Parameters:
+    -----------
+    nucleotides : Nucleotides
+        The nucleotides of the cell
+    bases_count : dict
+        The dictionary with the base as the key and the amount to reserve as the value
+    """
+    def __init__(self, nucleotides, bases_count):
+        super().__init__(nucleotides.env)
+        self.nucleotides = nucleotides
+        self.bases_count = bases_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.triggered:
+            self.nucleotides._reservations.remove(self)
 
 class Nucleotides:
     """
@@ -23,11 +54,21 @@ class Nucleotides:
         The initial amount of cytosine in the cell
     random_seed : int
         The random seed for the degradation time
+    use_pool : bool, optional
+        If True, the nucleotides are stored in a single EukaryoticCellPool
+    history_spill_folder : str, optional
+        The folder where the histories are written in chunks during the simulation, if None
+        the histories are kept in memory
+    history_resolution : float, optional
+        The duration of the buckets in which the histories are aggregated, if None every
+        event is recorded
 
     Attributes:
     -----------
     env : simpy.Environment
         The simulation environment
+    pool : EukaryoticCellPool
+        The pool of the nucleotides, None if the nucleotides have separate containers
     nucleotides_containers_dict : dict
         The dictionary with the nucleotide name as the key and the container as the value
     
@@ -35,31 +76,125 @@ class Nucleotides:
     --------
     request(nucleotide, amount)
         Request the amount of the nucleotide
+    reserve(bases_count)
+        Reserve the amounts of several bases at once, a single event
+    try_reserve(bases_count)
+        Reserve the amounts of several bases at once if available now, without waiting
     release(nucleotide, amount)
-        Release the amount of the nucleotide
+        Release the amount of the nucleotide, put back into the cell after the degradation time
+    release_degraded(bases_count, rng, buckets)
+        Release the nucleotides of a degraded sequence in batches
+    level(nucleotide)
+        Return the amount of the nucleotide available in the cell
     save_history(path_to_save)
         Save the level history of the containers in a json file
     """
     def __init__(self, environment, uracil_initial_amount, adenine_initial_amount, 
-            guanine_initial_amount, cytosine_initial_amount, random_seed):
+            guanine_initial_amount, cytosine_initial_amount, random_seed, use_pool=False,
+            history_spill_folder=None, history_resolution=None):
         self.env = environment
+        self.history_spill_folder = history_spill_folder
+        self.history_resolution = history_resolution
+        self.pool = EukaryoticCellPool(self.env, [uracil_initial_amount, adenine_initial_amount,
+            guanine_initial_amount, cytosine_initial_amount]) if use_pool else None
 
         self.nucleotides_containers_dict = {
-            'U': self._init_nucleotide(uracil_initial_amount, random_seed), # uracil
-            'A': self._init_nucleotide(adenine_initial_amount, random_seed), # adenine
-            'G': self._init_nucleotide(guanine_initial_amount, random_seed), # guanine
-            'C': self._init_nucleotide(cytosine_initial_amount, random_seed), # cytosine
+            'U': self._init_nucleotide(0, uracil_initial_amount, random_seed), # uracil
+            'A': self._init_nucleotide(1, adenine_initial_amount, random_seed), # adenine
+            'G': self._init_nucleotide(2, guanine_initial_amount, random_seed), # guanine
+            'C': self._init_nucleotide(3, cytosine_initial_amount, random_seed), # cytosine
         }
 
-    def _init_nucleotide(self, amount, random_seed):
-        return EukaryoticCellContainer(
-            self.env, capacity=float('inf'), init=amount, random_seed=random_seed)
+        # reservations waiting for several bases, served when a base is put back in FIFO order
+        # among the reservations sharing a base
+        self._reservations = []
+        for container in self.nucleotides_containers_dict.values():
+            container.on_put = self._serve_reservations
+
+    def _init_nucleotide(self, index, amount, random_seed):
+        spill_path = history_spill_path(
+            self.history_spill_folder, f'nucleotides_history_{NUCLEOTIDES_NAMES[index]}')
+        if self.pool is not None:
+            return PoolContainer(self.pool, index, random_seed=random_seed, history_spill_path=spill_path,
+                history_resolution=self.history_resolution)
+        return EukaryoticCellContainer(self.env, capacity=float('inf'), init=amount, random_seed=random_seed,
+            history_spill_path=spill_path, history_resolution=self.history_resolution)
 
     def request(self, nucleotide, amount):
         return self.nucleotides_containers_dict[nucleotide].get(amount)
     
+    def reserve(self, bases_count):
+        """
+        Reserve the amounts of several bases, a dictionary by base or a sequence of amounts in
+        the order U, A, G, C. The returned event is triggered when all the amounts are
+        available at once and the bases are taken together, so that a sequence never holds
+        some of its bases while waiting for the others.
+        """
+        reservation = NucleotidesReservation(self, self._bases_count(bases_count))
+        if not self._blocked(reservation.bases_count, self._reservations) and self._take(reservation.bases_count):
+            reservation.succeed()
+        else:
+            self._reservations.append(reservation)
+        return reservation
+
+    def try_reserve(self, bases_count):
+        """
+        Reserve the amounts of several bases if they are all available now, without waiting
+        and without events. Return True if the bases are taken, False otherwise.
+        """
+        bases_count = self._bases_count(bases_count)
+        return not self._blocked(bases_count, self._reservations) and self._take(bases_count)
+
+    def _bases_count(self, bases_count):
+        if not isinstance(bases_count, dict):
+            bases_count = dict(zip(self.nucleotides_containers_dict, bases_count))
+        return {base: amount for base, amount in bases_count.items() if amount > 0}
+
+    def _take(self, bases_count):
+        containers = self.nucleotides_containers_dict
+        if not all(containers[base].can_get(amount) for base, amount in bases_count.items()):
+            return False
+        for base, amount in bases_count.items():
+            containers[base].take(amount)
+        return True
+
+    def _blocked(self, bases_count, reservations):
+        # a reservation waits behind the earlier reservations of the same bases
+        return any(base in reservation.bases_count for reservation in reservations for base in bases_count)
+
+    def _serve_reservations(self):
+        waiting = []
+        for reservation in self._reservations:
+            if not self._blocked(reservation.bases_count, waiting) and self._take(reservation.bases_count):
+                reservation.succeed()
+            else:
+                waiting.append(reservation)
+        self._reservations = waiting
+
     def release(self, nucleotide, amount):
-        self.env.process(self.nucleotides_containers_dict[nucleotide].put(amount))
+        self.nucleotides_containers_dict[nucleotide].release(amount)
+    
+    def release_degraded(self, bases_count, rng, buckets=DEGRADATION_BUCKETS):
+        """
+        Release the nucleotides of a degraded sequence, counted per base, in a few batches.
+        The degradation times are split in equal buckets: the amount of each base is drawn
+        across the buckets with a multinomial and each batch is put back after a uniform
+        degradation time in its bucket, so that the nucleotides follow the uniform
+        distribution of the degradation time of a single release.
+        """
+        bounds = np.linspace(MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME, buckets + 1)
+        for nucleotide, amount in bases_count.items():
+            if amount <= 0:
+                continue
+
+            amounts = rng.multinomial(amount, [1 / buckets] * buckets)
+            degradation_times = np.round(rng.uniform(bounds[:-1], bounds[1:]), 4)
+            for amount, degradation_time in zip(amounts.tolist(), degradation_times.tolist()):
+                if amount > 0:
+                    self.nucleotides_containers_dict[nucleotide].release(amount, degradation_time)
+
+    def level(self, nucleotide):
+        return self.nucleotides_containers_dict[nucleotide].level
     
     def save_history(self, path_to_save):
         base_path, ext = os.path.splitext(path_to_save)
@@ -0,0 +1,441 @@
+from array import array
+from collections import deque
+import simpy
+import random
+from src.resources.container import Recycler, MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME
+from src.resources.latency import LatencySketch
+from src.resources.history import History, BucketedHistory, QUEUE_HISTORY_COLUMNS, LEVEL_HISTORY_COLUMNS, \
+    QUEUE_BUCKETS_SERIES, LEVEL_BUCKETS_SERIES
+
+class PoolRequest(simpy.events.Event):
+    """
+    This class represents a request of units of a kind of molecule in a EukaryoticCellPool.
+    The request is triggered when the units are acquired. Used as a context manager, the
+    request is cancelled on exit if it is still waiting, and the units are given back to the
+    pool if the request is not a consuming one.
+
+    Parameters:
+    -----------
+    pool : EukaryoticCellPool
+        The pool of the molecules
+    index : int
+        The index of the kind of molecule in the pool
+    amount : int
+        The number of units requested
+    consume : bool
+        If True, the units are consumed, otherwise they are given back on exit
+    resource : PoolResource, optional
+        The resource to release on exit instead of the pool
+    """
+    def __init__(self, pool, index, amount, consume, resource=None):
+        super().__init__(pool.env)
+        self.pool = pool
+        self.index = index
+        self.amount = amount
+        self.consume = consume
+        self.resource = resource
+        pool._acquire(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.triggered:
+            self.pool._cancel(self)
+        elif not self.consume:
+            if self.resource is not None:
+                self.resource.release(self)
+            else:
+                self.pool.put(self.index, self.amount)
+
+class EukaryoticCellPool:
+    """
+    This class represents a pool of fungible molecules of several kinds, identified by an
+    integer index. The level of each kind is stored in an array, units are acquired and
+    given back in O(1) for any amount, and the requests that cannot be satisfied wait in a
+    FIFO queue for each kind.
+
+    Parameters:
+    -----------
+    env : simpy.Environment
+        The simulation environment
+    amounts : list
+        The initial amount of each kind of molecule, integers or floats with an integral value
+
+    Attributes:
+    -----------
+    env : simpy.Environment
+        The simulation environment
+    capacity : array
+        The initial amount of each kind of molecule
+    levels : array
+        The amount available of each kind of molecule
+
+    Methods:
+    --------
+    request(index, amount)
+        Request units of a kind, given back to the pool when the request is released
+    get(index, amount)
+        Get units of a kind, consumed
+    put(index, amount)
+        Put units of a kind into the pool
+    level(index)
+        Return the amount available of a kind
+    queue_length(index)
+        Return the number of requests waiting for a kind
+    contended(index)
+        Return True if a request of a kind would wait
+    """
+    def __init__(self, env, amounts):
+        self.env = env
+        amounts = [self._units(amount) for amount in amounts] # integral floats as 5e+4 accepted
+        self.capacity = array('q', amounts)
+        self.levels = array('q', amounts)
+        self._waiting = [deque() for _ in amounts]
+
+    def request(self, index, amount=1):
+        return PoolRequest(self, index, amount, consume=False)
+
+    def get(self, index, amount):
+        return PoolRequest(self, index, amount, consume=True)
+
+    def put(self, index, amount):
+        self.levels[index] += amount
+
+        # serve the waiting requests in FIFO order
+        waiting = self._waiting[index]
+        while waiting and waiting[0].amount <= self.levels[index]:
+            request = waiting.popleft()
+            self.levels[index] -= request.amount
+            request.succeed()
+
+    def level(self, index):
+        return self.levels[index]
+
+    def queue_length(self, index):
+        return len(self._waiting[index])
+
+    def contended(self, index):
+        return len(self._waiting[index]) > 0 or self.levels[index] == 0
+
+    @staticmethod
+    def _units(amount):
+        if amount != int(amount):
+            raise ValueError(f'the amount of a kind of molecule must be an integer, got {amount}')
+        return int(amount)
+
+    def _acquire(self, request):
+        if not self._waiting[request.index] and request.amount <= self.levels[request.index]:
+            self.levels[request.index] -= request.amount
+            request.succeed()
+        else:
+            self._waiting[request.index].append(request)
+
+    def _cancel(self, request):
+        waiting = self._waiting[request.index]
+        waiting.remove(request)
+        if waiting: # the next request may fit now
+            self.put(request.index, 0)
+
+class PoolResource:
+    """
+    This class represents a kind of molecule of a EukaryoticCellPool used as a resource:
+    each request holds a unit until it is released. It has the same interface and the same
+    history of EukaryoticCellResource.
+
+    Parameters:
+    -----------
+    pool : EukaryoticCellPool
+        The pool of the molecules
+    index : int
+        The index of the kind of molecule in the pool
+    save_history : bool
+        If True, the history of the queue and the usage of the resource is saved
+    history_spill_path : str, optional
+        The path of the file where the history is written in chunks during the simulation,
+        if None the history is kept in memory
+    history_resolution : float, optional
+        The duration of the buckets of the history, if None every request is recorded
+    track_latency : bool, optional
+        If True, the wait time and the usage time of the requests are added to latency sketches
+
+    Attributes:
+    -----------
+    _queue_history : History or BucketedHistory
+        The columnar history of the queue and the usage of the resource
+    wait_time_sketch : LatencySketch
+        The sketch of the wait time of the requests
+    usage_time_sketch : LatencySketch
+        The sketch of the usage time of the requests
+
+    Methods:
+    --------
+    request()
+        Request the resource
+    available(request=None)
+        Save the time when the resource is available for the request
+    release(request)
+        Release the resource
+    hold(amount, usage_time)
+        Use the resource for consecutive uses with a single request
+    contended()
+        Return True if a request would wait for the resource
+    latency_summary()
+        Return the percentiles of the wait time and the usage time of the requests
+    queue_history()
+        Return the queue history
+    save_history(path_to_save)
+        Save the queue history in a json file, or in a history file if it is spilled
+    """
+    __slots__ = ('pool', 'index', '_env', 'save_history_flag', 'history_spill_path', 'history_resolution',
+        'track_latency', '_request_time', '_available_time', 'wait_time_sketch', 'usage_time_sketch',
+        '_queue_history')
+
+    def __init__(self, pool, index, save_history=True, history_spill_path=None, history_resolution=None,
+            track_latency=True):
+        self.pool = pool
+        self.index = index
+        self._env = pool.env
+        self.save_history_flag = save_history
+        self.history_spill_path = history_spill_path
+        self.history_resolution = history_resolution
+        self.track_latency = track_latency
+        self._request_time = None # times of the last request and availability, for calls without the request
+        self._available_time = None
+
+        if self.track_latency:
+            self.wait_time_sketch = LatencySketch()
+            self.usage_time_sketch = LatencySketch()
+
+        if self.save_history_flag:
+            self._reset_queue_history()
+
+    @property
+    def capacity(self):
+        return self.pool.capacity[self.index]
+
+    @property
+    def count(self):
+        return self.pool.capacity[self.index] - self.pool.levels[self.index]
+
+    def request(self):
+        request = PoolRequest(self.pool, self.index, 1, consume=False, resource=self)
+        request.request_time = self._request_time = self._env.now # request token
+
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('queue', self._env.now, self.pool.queue_length(self.index))
+            else:
+                self._queue_history.append('queue', self.pool.queue_length(self.index))
+                self._queue_history.append('request_time', self._env.now)
+
+        return request
+
+    def available(self, request=None):
+        request_time = request.request_time if request is not None else self._request_time
+        if request is not None:
+            request.available_time = self._env.now
+        self._available_time = self._env.now
+        wait_time = self._env.now - request_time
+
+        if self.track_latency:
+            self.wait_time_sketch.add(wait_time)
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('wait_time', self._env.now, wait_time) # at the availability time
+            else:
+                self._queue_history.append('available_time', self._env.now)
+                self._queue_history.append('wait_time', wait_time)
+
+    def release(self, request):
+        self.pool.put(self.index, request.amount)
+        available_time = getattr(request, 'available_time', self._available_time)
+        if available_time is None: # the resource has never been available
+            return
+        usage_time = self._env.now - available_time
+
+        if self.track_latency:
+            self.usage_time_sketch.add(usage_time)
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('usage_time', self._env.now, usage_time)
+            else:
+                self._queue_history.append('end_time', self._env.now)
+                self._queue_history.append('usage_time', usage_time)
+
+    def hold(self, amount, usage_time):
+        """
+        Use the resource amount consecutive times, each for usage_time, with a single request.
+        The history records amount requests made together, each one available when the
+        previous one ends.
+        """
+        request = self.pool.request(self.index)
+        request_time = self._env.now
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('queue', request_time, self.pool.queue_length(self.index), count=amount)
+            else:
+                self._queue_history.extend('queue', [self.pool.queue_length(self.index)] * amount)
+                self._queue_history.extend('request_time', [request_time] * amount)
+
+        yield request
+        start_time = self._env.now
+        wait_time = [start_time + i * usage_time - request_time for i in range(amount)]
+        if self.save_history_flag and self.history_resolution is not None:
+            for time in wait_time: # all known at the availability of the first use
+                self._queue_history.record('wait_time', start_time, time)
+        yield self._env.timeout(amount * usage_time)
+        self.pool.put(self.index, request.amount)
+
+        if self.track_latency:
+            for time in wait_time:
+                self.wait_time_sketch.add(time)
+            self.usage_time_sketch.add(usage_time, count=amount)
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('usage_time', self._env.now, usage_time, count=amount)
+            else:
+                available_time = [start_time + i * usage_time for i in range(amount)]
+                self._queue_history.extend('available_time', available_time)
+                self._queue_history.extend('wait_time', wait_time)
+                self._queue_history.extend('end_time', [time + usage_time for time in available_time])
+                self._queue_history.extend('usage_time', [usage_time] * amount)
+
+    def contended(self):
+        return self.pool.contended(self.index)
+
+    def latency_summary(self):
+        return {'wait_time': self.wait_time_sketch.summary(), 'usage_time': self.usage_time_sketch.summary()}
+
+    def queue_history(self):
+        return self._queue_history
+
+    def save_history(self, path_to_save):
+        self.queue_history().save(path_to_save)
+
+    def _reset_queue_history(self):
+        if self.history_resolution is not None:
+            self._queue_history = BucketedHistory(QUEUE_BUCKETS_SERIES, self.history_resolution,
+                spill_path=self.history_spill_path)
+        else:
+            self._queue_history = History(QUEUE_HISTORY_COLUMNS, spill_path=self.history_spill_path)
+
+class PoolContainer:
+    """
+    This class represents a kind of molecule of a EukaryoticCellPool used as a container:
+    the units got are consumed and the units put back are available after a degradation
+    time. It has the same interface and the same history of EukaryoticCellContainer.
+
+    Parameters:
+    -----------
+    pool : EukaryoticCellPool
+        The pool of the molecules
+    index : int
+        The index of the kind of molecule in the pool
+    random_seed : int
+        The random seed for the degradation time
+    history_spill_path : str, optional
+        The path of the file where the history is written in chunks during the simulation,
+        if None the history is kept in memory
+    history_resolution : float, optional
+        The duration of the buckets of the history, if None every level is recorded
+
+    Attributes:
+    -----------
+    _history : History or BucketedHistory
+        The columnar history of the level and time in the container
+    on_put : callable
+        The function called without arguments after an amount is put into the container
+        and the waiting gets are served, None by default
+
+    Methods:
+    --------
+    get(amount)
+        Get the amount from the container
+    can_get(amount)
+        Return True if the amount can be taken at once, without waiting gets before
+    take(amount)
+        Take the amount from the container at once, without an event
+    put(amount)
+        Put the amount into the container
+    release(amount, degradation_time=None)
+        Put the amount into the container after the degradation time, random if None
+    level_history()
+        Return the level history
+    save_history(path_to_save)
+        Save the level history in a json file, or in a history file if it is spilled
+    """
+    __slots__ = ('pool', 'index', '_env', 'history_spill_path', 'history_resolution', 'on_put', '_recycler',
+        '_history')
+
+    def __init__(self, pool, index, random_seed, history_spill_path=None, history_resolution=None):
+        self.pool = pool
+        self.index = index
+        self._env = pool.env
+        self.history_spill_path = history_spill_path
+        self.history_resolution = history_resolution
+        self.on_put = None
+        random.seed(random_seed)
+        self._recycler = Recycler(self._env, self._put_degraded)
+        self._reset_history()
+
+    @property
+    def level(self):
+        return self.pool.levels[self.index]
+
+    def get(self, amount):
+        get = self.pool.get(self.index, amount) # get the amount from the container
+
+        self._record_level()
+
+        return get
+
+    def can_get(self, amount):
+        return self.pool.queue_length(self.index) == 0 and self.level >= amount
+
+    def take(self, amount):
+        self.pool.levels[self.index] -= amount # the caller checks can_get first
+
+        self._record_level()
+
+    def put(self, amount):
+        degradation_time = round(random.uniform(
+            MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME), 4)
+        yield self._env.timeout(degradation_time)
+
+        self._put_degraded(amount)
+
+    def release(self, amount, degradation_time=None):
+        if degradation_time is None:
+            degradation_time = round(random.uniform(
+                MIN_DEGRADATION_TIME, MAX_DEGRADATION_TIME), 4)
+        self._recycler.push(degradation_time, amount)
+
+    def _put_degraded(self, amount):
+        self.pool.put(self.index, amount) # put the amount into the container, serving the waiting gets
+
+        self._record_level()
+        if self.on_put is not None:
+            self.on_put()
+
+    def level_history(self):
+        return self._history
+
+    def save_history(self, path_to_save):
+        self.level_history().save(path_to_save)
+
+    def _record_level(self):
+        # save level and time in the history
+        if self.history_resolution is not None:
+            self._history.record('level', self._env.now, self.level)
+        else:
+            self._history.append('level', self.level)
+            self._history.append('time', self._env.now)
+
+    def _reset_history(self):
+        if self.history_resolution is not None:
+            self._history = BucketedHistory(LEVEL_BUCKETS_SERIES, self.history_resolution,
+                spill_path=self.history_spill_path)
+        else:
+            self._history = History(LEVEL_HISTORY_COLUMNS, spill_path=self.history_spill_path)
+        self._record_level()
@@ -1,11 +1,15 @@
 import simpy.resources.resource as SimpyResource
-import json
+from src.resources.latency import LatencySketch
+from src.resources.scheduling import HintedRequest, make_queue_discipline, FIFO
+from src.resources.history import History, BucketedHistory, QUEUE_HISTORY_COLUMNS, QUEUE_BUCKETS_SERIES
 
 class EukaryoticCellResource(SimpyResource.Resource):
     """
     This class extends the simpy Resource class to add the history of the queue
     and the usage of the resource. The history is saved in a dictionary with the
     queue, request time, available time, wait time, end time and usage time.
+    With a history resolution, the queue length, the wait time by request time and the
+    usage time by end time are aggregated in buckets of that duration instead.
 
     Parameters:
     -----------
@@ -15,71 +19,180 @@ class EukaryoticCellResource(SimpyResource.Resource):
         The capacity of the resource
     save_history : bool
         If True, the history of the queue and the usage of the resource is saved
+    history_spill_path : str, optional
+        The path of the file where the history is written in chunks during the simulation,
+        if None the history is kept in memory
+    history_resolution : float, optional
+        The duration of the buckets of the history, if None every request is recorded
+    track_latency : bool, optional
+        If True, the wait time and the usage time of the requests are added to latency sketches
+    queue_discipline : str, optional
+        The discipline selecting the next waiting request to serve, one of the keys of
+        QUEUE_DISCIPLINES, default FIFO
 
     Attributes:
     -----------
-    _queue_history : dict
-        The history of the queue and the usage of the resource
+    _queue_history : History or BucketedHistory
+        The columnar history of the queue and the usage of the resource
+    wait_time_sketch : LatencySketch
+        The sketch of the wait time of the requests
+    usage_time_sketch : LatencySketch
+        The sketch of the usage time of the requests
+    queue_discipline : QueueDiscipline
+        The discipline selecting the next waiting request to serve
 
     Methods:
     --------
-    request(*args, **kwargs)
-        Request the resource
-    available()
-        Save the time when the resource is available
-    release(*args, **kwargs)
+    request(size=None, priority=None, owner=None)
+        Request the resource, with the hints of the job for the queue discipline
+    available(request=None)
+        Save the time when the resource is available for the request
+    release(request)
         Release the resource
+    hold(amount, usage_time)
+        Use the resource for consecutive uses with a single request
+    contended()
+        Return True if a request would wait for the resource
+    latency_summary()
+        Return the percentiles of the wait time and the usage time of the requests
     queue_history()
         Return the queue history
     save_history(path_to_save)
-        Save the queue history in a json file
+        Save the queue history in a json file, or in a history file if it is spilled
     """
-    def __init__(self, env, capacity, save_history=True):
+    def __init__(self, env, capacity, save_history=True, history_spill_path=None, history_resolution=None,
+            track_latency=True, queue_discipline=FIFO):
         super().__init__(env, capacity=capacity)
+        self.queue_discipline = make_queue_discipline(queue_discipline)
+        self._fifo = queue_discipline == FIFO
         self.save_history_flag = save_history
+        self.history_spill_path = history_spill_path
+        self.history_resolution = history_resolution
+        self.track_latency = track_latency
+        self._request_time = None # times of the last request and availability, for calls without the request
+        self._available_time = None
+
+        if self.track_latency:
+            self.wait_time_sketch = LatencySketch()
+            self.usage_time_sketch = LatencySketch()
 
         if self.save_history_flag:
             self._reset_queue_history()
     
-    def request(self, *args, **kwargs):
-        request = super().request(*args, **kwargs)
+    def request(self, size=None, priority=None, owner=None):
+        request = HintedRequest(self, size=size, priority=priority, owner=owner)
+        self._request_time = request.request_time
 
         if self.save_history_flag:
-            self._queue_history['queue'].append(len(self.queue))
-            self._queue_history['request_time'].append(self._env.now)
+            if self.history_resolution is not None:
+                self._queue_history.record('queue', self._env.now, len(self.queue))
+            else:
+                self._queue_history.append('queue', len(self.queue))
+                self._queue_history.append('request_time', self._env.now)
 
         return request
     
-    def available(self):
+    def available(self, request=None):
+        """
+        Save the time when the resource is available for the request, the wait time is
+        computed from the request token. Without the request, the resource is available
+        for the last request made.
+        """
+        request_time = request.request_time if request is not None else self._request_time
+        if request is not None:
+            request.available_time = self._env.now
+        self._available_time = self._env.now
+        wait_time = self._env.now - request_time
+
+        if self.track_latency:
+            self.wait_time_sketch.add(wait_time)
         if self.save_history_flag:
-            self._queue_history['available_time'].append(self._env.now)
-            self._queue_history['wait_time'].append(
-                self._queue_history['available_time'][-1] - self._queue_history['request_time'][-1])
+            if self.history_resolution is not None:
+                self._queue_history.record('wait_time', self._env.now, wait_time) # at the availability time
+            else:
+                self._queue_history.append('available_time', self._env.now)
+                self._queue_history.append('wait_time', wait_time)
 
-    def release(self, *args, **kwargs):
-        release = super().release(*args, **kwargs)
+    def release(self, request):
+        release = super().release(request)
+        available_time = getattr(request, 'available_time', self._available_time)
+        if available_time is None: # the resource has never been available
+            return release
+        usage_time = self._env.now - available_time
 
+        if self.track_latency:
+            self.usage_time_sketch.add(usage_time)
         if self.save_history_flag:
-            self._queue_history['end_time'].append(self._env.now)
-            self._queue_history['usage_time'].append(
-                self._queue_history['end_time'][-1] - self._queue_history['available_time'][-1])
+            if self.history_resolution is not None:
+                self._queue_history.record('usage_time', self._env.now, usage_time)
+            else:
+                self._queue_history.append('end_time', self._env.now)
+                self._queue_history.append('usage_time', usage_time)
    
         return release
 
+    def hold(self, amount, usage_time):
+        """
+        Use the resource amount consecutive times, each for usage_time, with a single request.
+        The history records amount requests made together, each one available when the
+        previous one ends.
+        """
+        request = HintedRequest(self)
+        request_time = request.request_time
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('queue', request_time, len(self.queue), count=amount)
+            else:
+                self._queue_history.extend('queue', [len(self.queue)] * amount)
+                self._queue_history.extend('request_time', [request_time] * amount)
+        
+        yield request
+        start_time = self._env.now
+        wait_time = [start_time + i * usage_time - request_time for i in range(amount)]
+        if self.save_history_flag and self.history_resolution is not None:
+            for time in wait_time: # all known at the availability of the first use
+                self._queue_history.record('wait_time', start_time, time)
+        yield self._env.timeout(amount * usage_time)
+        super().release(request)
+
+        if self.track_latency:
+            for time in wait_time:
+                self.wait_time_sketch.add(time)
+            self.usage_time_sketch.add(usage_time, count=amount)
+        if self.save_history_flag:
+            if self.history_resolution is not None:
+                self._queue_history.record('usage_time', self._env.now, usage_time, count=amount)
+            else:
+                available_time = [start_time + i * usage_time for i in range(amount)]
+                self._queue_history.extend('available_time', available_time)
+                self._queue_history.extend('wait_time', wait_time)
+                self._queue_history.extend('end_time', [time + usage_time for time in available_time])
+                self._queue_history.extend('usage_time', [usage_time] * amount)
+
+    def _trigger_put(self, get_event):
+        # serve the waiting requests in the order of the queue discipline
+        if self._fifo:
+            return super()._trigger_put(get_event)
+        while self.put_queue and len(self.users) < self.capacity:
+            request = self.put_queue.pop(self.queue_discipline.select(self.put_queue))
+            self._do_put(request)
+
+    def contended(self):
+        return len(self.queue) > 0 or self.count >= self.capacity
+
+    def latency_summary(self):
+        return {'wait_time': self.wait_time_sketch.summary(), 'usage_time': self.usage_time_sketch.summary()}
+
     def queue_history(self):
         return self._queue_history
     
     def save_history(self, path_to_save):
-        with open(path_to_save, 'w') as outfile:
-            json.dump(self.queue_history(), outfile)
+        self.queue_history().save(path_to_save)
     
     def _reset_queue_history(self):
-        self._queue_history = {
-            'queue': [],
-            'request_time': [], # time when the request is made
-            'available_time': [], # time when the resource is available
-            'wait_time': [], # time the request waited in the queue
-            'end_time': [], # time when the resource is released
-            'usage_time': [] # time the resource is used
-            }
+        if self.history_resolution is not None:
+            self._queue_history = BucketedHistory(QUEUE_BUCKETS_SERIES, self.history_resolution,
+                spill_path=self.history_spill_path)
+        else:
+            self._queue_history = History(QUEUE_HISTORY_COLUMNS, spill_path=self.history_spill_path)
         
@@ -0,0 +1,96 @@
+import simpy.resources.resource as SimpyResource
+
+FIFO = 'fifo'
+SHORTEST_JOB_FIRST = 'shortest_job_first'
+PRIORITY = 'priority'
+FAIR_SHARE = 'fair_share'
+
+class HintedRequest(SimpyResource.Request):
+    """
+    This class extends the simpy Request class with the hints used by the queue disciplines,
+    set before the request is put in the queue.
+
+    Parameters:
+    -----------
+    resource : EukaryoticCellResource
+        The resource requested
+    size : float, optional
+        The size of the job, as the length of the sequence to transcript or translate
+    priority : int, optional
+        The priority of the job, lower values first
+    owner : hashable, optional
+        The owner of the job, as the DNA sequence the job belongs to
+    """
+    def __init__(self, resource, size=None, priority=None, owner=None):
+        self.size = size
+        self.priority = priority
+        self.owner = owner
+        self.request_time = resource._env.now # request token
+        super().__init__(resource)
+
+class QueueDiscipline:
+    """
+    This class represents the discipline selecting the next waiting request to serve when a
+    unit of a resource is available, FIFO order. The waiting requests are in arrival order
+    and the subclasses break the ties in FIFO order.
+
+    Methods:
+    --------
+    select(queue)
+        Return the index in the queue of the next request to serve
+    """
+    def select(self, queue):
+        return 0
+
+class ShortestJobFirst(QueueDiscipline):
+    """
+    Serve first the waiting request with the smallest job size, requests without a size last.
+    """
+    def select(self, queue):
+        return min(range(len(queue)),
+            key=lambda i: queue[i].size if queue[i].size is not None else float('inf'))
+
+class Priority(QueueDiscipline):
+    """
+    Serve first the waiting request with the lowest priority value, requests without a
+    priority last.
+    """
+    def select(self, queue):
+        return min(range(len(queue)),
+            key=lambda i: queue[i].priority if queue[i].priority is not None else float('inf'))
+
+class FairShare(QueueDiscipline):
+    """
+    Serve first the waiting request of the owner that has received the least service, the
+    service of an owner is the sum of the job sizes of its served requests, 1 for the requests
+    without a size.
+
+    Attributes:
+    -----------
+    served : dict
+        The dictionary with the owner as the key and the service received as the value
+    """
+    def __init__(self):
+        self.served = dict()
+
+    def select(self, queue):
+        index = min(range(len(queue)), key=lambda i: self.served.get(queue[i].owner, 0))
+        request = queue[index]
+        self.served[request.owner] = self.served.get(request.owner, 0) + (
+            request.size if request.size is not None else 1)
+        return index
+
+QUEUE_DISCIPLINES = {
+    FIFO: QueueDiscipline,
+    SHORTEST_JOB_FIRST: ShortestJobFirst,
+    PRIORITY: Priority,
+    FAIR_SHARE: FairShare,
+}
+
+def make_queue_discipline(name):
+    """
+    Return a new queue discipline by name, one of the keys of QUEUE_DISCIPLINES.
+    """
+    if name not in QUEUE_DISCIPLINES:
+        raise ValueError(f'unknown queue discipline {name}, expected one of {list(QUEUE_DISCIPLINES)}')
+    return QUEUE_DISCIPLINES[name]()
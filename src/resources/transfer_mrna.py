@@ -1,4 +1,7 @@
 from src.resources.resource import EukaryoticCellResource
+from src.resources.pool import EukaryoticCellPool, PoolResource
+from src.resources.history import history_spill_path
+from src.resources.latency import LatencySketch
 import random
 import os
 DEV_AMOUNT_TRNA_PER_CODON = 0.1
@@ -19,33 +22,60 @@ class TransferRNA:
         The list with the coding codons
     random_seed : int
         The random seed for the degradation time
+    use_pool : bool, optional
+        If True, the transfer RNA of all the codons are stored in a single EukaryoticCellPool
+    history_spill_folder : str, optional
+        The folder where the histories are written in chunks during the simulation, if None
+        the histories are kept in memory
+    history_resolution : float, optional
+        The duration of the buckets in which the histories are aggregated, if None every
+        event is recorded
     
     Attributes:
     -----------
     env : simpy.Environment
         The simulation environment
+    pool : EukaryoticCellPool
+        The pool of the transfer RNA, None if the codons have separate resources
     trna_resources_dict : dict
         The dictionary with the codon as the key and the resource as the value
 
     Methods:
     --------
+    latency_summary()
+        Return the percentiles of the wait time and the usage time of the transfer RNA of all the codons
     save_history(path_to_save)
         Save the level history of the resources in a json file
     """
-    def __init__(self, environment, amount, codons_list, random_seed):
+    def __init__(self, environment, amount, codons_list, random_seed, use_pool=False,
+            history_spill_folder=None, history_resolution=None):
         self.env = environment
         random.seed(random_seed)
 
-        self.trna_resources_dict = dict()
-        for codon in codons_list:
-            self.trna_resources_dict[codon] = self._init_trna(amount)
+        trna_amounts = [self._init_trna_amount(amount) for _ in codons_list]
+        if use_pool:
+            self.pool = EukaryoticCellPool(self.env, trna_amounts)
+            self.trna_resources_dict = {codon: PoolResource(self.pool, index,
+                history_spill_path=history_spill_path(history_spill_folder, f'rna_transfer_history_{codon}'),
+                history_resolution=history_resolution) for index, codon in enumerate(codons_list)}
+        else:
+            self.pool = None
+            self.trna_resources_dict = {codon: EukaryoticCellResource(self.env, capacity=trna_amount,
+                history_spill_path=history_spill_path(history_spill_folder, f'rna_transfer_history_{codon}'),
+                history_resolution=history_resolution) for codon, trna_amount in zip(codons_list, trna_amounts)}
 
-    def _init_trna(self, amount):
-        trna_amount = random.randint(
+    def _init_trna_amount(self, amount):
+        return random.randint(
             int(amount * (1 - DEV_AMOUNT_TRNA_PER_CODON)),
             int(amount * (1 + DEV_AMOUNT_TRNA_PER_CODON)))
-        return EukaryoticCellResource(self.env, capacity=trna_amount)
     
+    def latency_summary(self):
+        wait_time_sketch, usage_time_sketch = LatencySketch(), LatencySketch()
+        for resource in self.trna_resources_dict.values():
+            wait_time_sketch.merge(resource.wait_time_sketch)
+            usage_time_sketch.merge(resource.usage_time_sketch)
+        return {'wait_time': wait_time_sketch.summary(), 'usage_time': usage_time_sketch.summary()}
+
     def save_history(self, path_to_save):
         base_path, ext = os.path.splitext(path_to_save)
         for codons, resource in self.trna_resources_dict.items():
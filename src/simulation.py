@@ -4,9 +4,13 @@ import itertools
 import json
 import os
 from src.process.protein_synthesis import EukaryoticCell
+from src.process.transcription import PROMOTERS, LENGTH_PROMOTER, MIN_LENGTH_PROMOTER
 from src.variables.variables import EukaryoticCellVariables
 from src.resources.resource import EukaryoticCellResource
-from src.utils.utils import save_proteins_synthesized, post_processing_results
+from src.utils.utils import post_processing_results
+from src.utils.results_collector import ResultsCollector
+from src.utils.arrivals import ArrivalScheduler, make_arrival_process
+from src.utils.promoter_index import PromoterIndex
 
 LENGTH_AMIO_GROUP = 4 # length of amino acid group
 LENGTH_CARBOXYL_GROUP = 5 # length of carboxyl group
@@ -24,6 +28,13 @@ ADENINE_INITIAL_AMOUNT = 5000
 GUANINE_INITIAL_AMOUNT = 5000
 CYTOSINE_INITIAL_AMOUNT = 5000
 RANDOM_SEED = None
+TRANSCRIPTION_GRANULARITY = 1
+TRNA_BULK_ACQUISITION = False
+USE_MOLECULES_POOL = False
+HISTORY_RESOLUTION = None
+QUEUE_DISCIPLINE = 'fifo'
+ARRIVAL_PROCESS = 'uniform'
+ARRIVAL_RATE = 0.2 # arrivals per second, Poisson arrivals
 
 class ProteinSinthesisProcess:
     """
@@ -54,6 +65,56 @@ class ProteinSinthesisProcess:
         Random seed to reproduce the results. The default is None.
     verbose: bool, optional
         If True, print the simulation process. The default is False.
+    promoter_index_path: str, optional
+        Folder of the on-disk index of the promoters of the DNA sequences, the index is built
+        the first time the dataset is used and shared by the following simulations.
+        If None, the promoters are detected at each synthesis. The default is None.
+    transcription_granularity: int, optional
+        Number of nucleotides transcribed in a single simulation step while the nucleotides
+        levels are high, 1 to simulate each nucleotide. The default is 1.
+    trna_bulk_acquisition: bool, optional
+        If True, the ribosomes request the transfer RNA once for each codon type of the mRNA
+        sequence, with the combined attach time, and per codon while the transfer RNA of the
+        codon is contended. The default is False.
+    use_molecules_pool: bool, optional
+        If True, the nucleotides and the transfer RNA are stored in array-backed pools, with
+        O(1) acquisition of any amount, instead of SimPy containers and resources. The default is False.
+    history_spill_folder: str, optional
+        Folder where the histories of the resources are written in chunks during the simulation,
+        to keep the memory bounded in long simulations. The histories are then saved as binary
+        history files, read with src.resources.history.load_history, instead of json files.
+        If None, the histories are kept in memory. The default is None.
+    history_resolution: float, optional
+        Duration, in the simulation time unit, of the buckets in which the histories of the
+        resources and the nucleotides are aggregated while recording, with the min, max, last
+        value, count and mean of each bucket, so that the histories grow with the simulated
+        time instead of the number of events. If None, every event is recorded. The default
+        is HISTORY_RESOLUTION.
+    queue_discipline: str, optional
+        Discipline selecting the next request served by the RNA polymerases and the ribosomes
+        among the waiting ones: 'fifo', 'shortest_job_first' by length of the sequence,
+        'priority' by promoter box or 'fair_share' per DNA sequence. The default is QUEUE_DISCIPLINE.
+    arrival_process: str, optional
+        Arrival process of the DNA sequences: 'uniform' with a random time in [0, 10] seconds
+        between two arrivals, 'poisson' at arrival_rate or 'trace' to replay arrival_trace.
+        The default is ARRIVAL_PROCESS.
+    arrival_rate: float, optional
+        Mean number of arrivals per second of the Poisson arrivals. The default is ARRIVAL_RATE.
+    arrival_trace: list or str, optional
+        Arrival times in seconds of the trace arrivals, or path of a json file with the arrival
+        times or of the results.csv file of a simulation to replay. The default is None.
+
+    Attributes
+    ----------
+    results: ResultsCollector
+        Collector of the results of the synthesized DNA sequences, appended at the end of
+        each synthesis by the row of the DNA sequence.
+    arrivals: ArrivalScheduler
+        Scheduler of the arrivals of the DNA sequences, sampled by row without replacement.
+        Each row is synthesized at most once and the arrivals stop when the dataset is exhausted.
+    dna_sequences_df: pandas.DataFrame
+        DataFrame of the DNA sequences with the results, built from the results collector
+        when accessed.
 
     Methods
     -------
@@ -72,8 +133,12 @@ class ProteinSinthesisProcess:
             adenine_initial_amount=ADENINE_INITIAL_AMOUNT, 
             guanine_initial_amount=GUANINE_INITIAL_AMOUNT, 
             cytosine_initial_amount=CYTOSINE_INITIAL_AMOUNT,
-            random_seed=RANDOM_SEED, verbose=False):
-        self.dna_sequences_df = dna_sequences_df
+            random_seed=RANDOM_SEED, verbose=False, promoter_index_path=None,
+            transcription_granularity=TRANSCRIPTION_GRANULARITY, trna_bulk_acquisition=TRNA_BULK_ACQUISITION,
+            use_molecules_pool=USE_MOLECULES_POOL, history_spill_folder=None,
+            history_resolution=HISTORY_RESOLUTION, queue_discipline=QUEUE_DISCIPLINE,
+            arrival_process=ARRIVAL_PROCESS, arrival_rate=ARRIVAL_RATE, arrival_trace=None):
+        self.results = ResultsCollector(dna_sequences_df)
         self.verbose = verbose
 
         # nucleotides
@@ -85,26 +150,24 @@ class ProteinSinthesisProcess:
         # codons to translate into amino acids
         self.codons = list(json.load(open(CODONS_PATH)).keys())
 
-        # add columns to store the results
-        columns = ['mrna_sequences', 'polypeptides_chains', 'polypeptides_chains_ext',
-            'length_mrna_sequences', 'number_of_proteins_synthesized_per_mrna', 
-            'number_of_proteins_synthesized', 'protein_synthesized', 'request_start_process_time',
-            'start_process_time', 'start_transcription_time', 'start_translation_time',
-            'end_translation_time', 'end_process_time']
-        for col in columns:
-            self.dna_sequences_df[col] = None
-        
         # initialize the simulation environment
-        self.dna_sequences = self.dna_sequences_df['sequence'].values
-        self.available =  {row['sequence']: True if row['protein_synthesized']==None else False
-            for _, row in self.dna_sequences_df.iterrows()}
+        self.dna_sequences = dna_sequences_df['sequence'].values
+        self.arrivals = ArrivalScheduler(len(self.dna_sequences),
+            make_arrival_process(arrival_process, rate=arrival_rate, trace=arrival_trace), random_seed)
         
+        if history_spill_folder is not None:
+            os.makedirs(history_spill_folder, exist_ok=True)
+
         random.seed(random_seed) # set the random seed
         self.env = simpy.Environment() # create the Simpy simulation environment
         self.resources = EukaryoticCellResource(
-            self.env, capacity=number_resources, save_history=False) 
+            self.env, capacity=number_resources, save_history=False, track_latency=False) 
         self.env.process(self._setup_process())
 
+        # index of the promoters of the dataset
+        self.promoter_index = PromoterIndex.load_or_build(promoter_index_path, self.dna_sequences,
+            PROMOTERS, LENGTH_PROMOTER, MIN_LENGTH_PROMOTER) if promoter_index_path is not None else None
+
         self.eukaryotic_cell = EukaryoticCell(
             environment=self.env, 
             number_rna_polymerases=number_rna_polymerases,
@@ -115,7 +178,14 @@ class ProteinSinthesisProcess:
             guanine_initial_amount=guanine_initial_amount,
             cytosine_initial_amount=cytosine_initial_amount, 
             random_seed=random_seed, 
-            verbose=self.verbose
+            verbose=self.verbose,
+            promoter_index=self.promoter_index,
+            transcription_granularity=transcription_granularity,
+            trna_bulk_acquisition=trna_bulk_acquisition,
+            use_molecules_pool=use_molecules_pool,
+            history_spill_folder=history_spill_folder,
+            history_resolution=history_resolution,
+            queue_discipline=queue_discipline
             )
         
         print('Simulation environment initialized, time unit: 0.0001 second.')
@@ -156,40 +226,36 @@ class ProteinSinthesisProcess:
         print('Simulation started')
         self.env.run(until=simulation_time)
 
-        # save simulation results
-        proteins_number = self.dna_sequences_df[self.dna_sequences_df[
-            'protein_synthesized'].notna()]['number_of_proteins_synthesized'].sum()
-        dna_sequences_processed_number = self.dna_sequences_df[
-            self.dna_sequences_df['protein_synthesized'].notna()].shape[0]
-        
-        print(f'End simulation: {proteins_number} proteins synthesized from '
-            f'{dna_sequences_processed_number} DNA sequences.')
+        print(f'End simulation: {self.results.number_of_proteins()} proteins synthesized from '
+            f'{len(self.results)} DNA sequences.')
+
+    @property
+    def dna_sequences_df(self):
+        return self.results.to_dataframe()
     
     def _setup_process(self):
         """
         Setup the simulation process.
-        Chose the dna sequences, check the availability of the dna sequences to 
-        be synthesized and start the protein synthesis process.
+        Start the protein synthesis process of the dna sequences at their arrival, until
+        the dataset is exhausted or the arrival process ends.
         """
-        process_queue = []
         sequences_count = itertools.count()
 
-        while True:
-            dna_sequence = random.choice(self.dna_sequences)
-            if self.available[dna_sequence]:
-                # initialize the variables related to the dna sequence
-                variables = EukaryoticCellVariables()
-                variables.dna_sequence = dna_sequence
-                variables.sequence_count = next(sequences_count)
+        for delay, sequence_id in self.arrivals:
+            # time between start of protein synthesis
+            if delay > 0:
+                yield self.env.timeout(delay)
 
-                process_queue.append(self.env.process(self._process(variables)))
-                
-                self.available[dna_sequence] = False
-                # time between start of protein synthesis
-                yield self.env.timeout(round(random.random()*10, ndigits=4))
+            # initialize the variables related to the dna sequence
+            variables = EukaryoticCellVariables()
+            variables.sequence_id = sequence_id
+            variables.dna_sequences = self.dna_sequences
+            variables.sequence_count = next(sequences_count)
 
-                while process_queue: # wait for all the protein synthesis to be completed
-                    process_queue.pop(0)
+            self.env.process(self._process(variables))
+
+        if self.verbose:
+            print(f'Time {self.env.now:.4f}: all DNA sequences arrived')
         
     def _process(self, variables):
         """
@@ -223,16 +289,15 @@ class ProteinSinthesisProcess:
         
     def _save_proteins_synthesized_in_df(self, variables):
         """
-        Save the results of the protein synthesis process in the dataframe.
+        Save the results of the protein synthesis process in the results collector.
 
         Parameters
         ----------
         variables: EukaryoticCellVariables
             Variables related to the dna sequence to be synthesized.
         """
-        self.dna_sequences_df = save_proteins_synthesized(
-            dna_sequences_df=self.dna_sequences_df, 
-            dna_sequence=variables.get_dna(),
+        self.results.append(
+            row=variables.sequence_id,
             mrna_sequences=variables.get_mrna(),
             polypeptides_chain=variables.get_proteins(),
             polypeptides_chain_ext=variables.get_extended_proteins_name(),
@@ -242,7 +307,6 @@ class ProteinSinthesisProcess:
             start_translation_time=variables.start_translation_time,
             end_translation_time=variables.end_translation_time,
             end_process_time=variables.end_process_time,
-            promoters_box=variables.promoters_box,
             proteins_sintetized=variables.proteins_sintetized
             )
         
@@ -253,12 +317,12 @@ class ProteinSinthesisProcess:
         Parameters
         ----------
         folder_test_name: str, optional
-            By default, the results are saved in the root of the results folder.
+            Folder, or path of nested folders, in the results folder where the results are
+            saved. By default, the results are saved in the root of the results folder.
         """
         # create folder to save the results
         if folder_test_name != '':
-            if not os.path.exists(RESULTS_FOLDER+folder_test_name):
-                os.mkdir(RESULTS_FOLDER+folder_test_name)
+            os.makedirs(RESULTS_FOLDER+folder_test_name, exist_ok=True)
             folder_test_name = folder_test_name + '/'
 
         # save dataframe with the results    
@@ -273,14 +337,20 @@ class ProteinSinthesisProcess:
         self.eukaryotic_cell.ribosome.ribosomes.save_history(
             RESULTS_FOLDER+folder_test_name+'ribosome_history.json')
         
-        if not os.path.exists(RESULTS_FOLDER+folder_test_name+'nucleotides'):
-            os.mkdir(RESULTS_FOLDER+folder_test_name+'nucleotides')
+        os.makedirs(RESULTS_FOLDER+folder_test_name+'nucleotides', exist_ok=True)
         self.eukaryotic_cell.nucleotides.save_history(
             RESULTS_FOLDER+folder_test_name+'nucleotides/'+'nucleotides_history.json')
 
-        if not os.path.exists(RESULTS_FOLDER+folder_test_name+'rna_transfer'):
-            os.mkdir(RESULTS_FOLDER+folder_test_name+'rna_transfer')
+        os.makedirs(RESULTS_FOLDER+folder_test_name+'rna_transfer', exist_ok=True)
         self.eukaryotic_cell.ribosome.rna_transfer.save_history(
             RESULTS_FOLDER+folder_test_name+'rna_transfer/'+'rna_transfer_history.json')
+
+        # save wait and usage time percentiles of the resources
+        with open(RESULTS_FOLDER+folder_test_name+'latency_percentiles.json', 'w') as outfile:
+            json.dump({
+                'rna_polymerase': self.eukaryotic_cell.nucleus.rna_polymerase.latency_summary(),
+                'ribosome': self.eukaryotic_cell.ribosome.ribosomes.latency_summary(),
+                'rna_transfer': self.eukaryotic_cell.ribosome.rna_transfer.latency_summary()
+                }, outfile, indent=4)
         
         print('Process saved.')
@@ -0,0 +1,301 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from src.simulation import ProteinSinthesisProcess, RESULTS_FOLDER, SIM_TIME
+from src.resources.history import load_history
+from src.utils.job_cache import JobCache, CACHE_FOLDER, code_version, dataset_fingerprint, job_key
+
+SWEEP_NAME = 'sweep'
+NUMBER_REPLICATES = 1
+SWEEP_SEED = 0
+PARAMETERS_FILE = 'parameters.json'
+LOG_FILE = 'log.txt'
+SUMMARY_FILE = 'summary.csv'
+
+def load_grid(path):
+    """
+    Return the list of the parameters sets of a parameters grid file, a json file with
+    a list of values for each parameter of ProteinSinthesisProcess and simulation_time.
+    """
+    with open(path) as infile:
+        grid = json.load(infile)
+    return [dict(zip(grid.keys(), values)) for values in itertools.product(*grid.values())]
+
+def expand_jobs(grid_paths, replicates=NUMBER_REPLICATES, seed=SWEEP_SEED):
+    """
+    Return the jobs of the parameters grids, one for each parameters set and replicate.
+    The seed of a replicate is the random_seed of the parameters set, or seed if it is
+    None, plus the replicate number.
+    """
+    jobs = []
+    for grid_path in grid_paths:
+        grid_name = os.path.splitext(os.path.basename(grid_path))[0]
+        for set_number, parameters in enumerate(load_grid(grid_path)):
+            base_seed = parameters.get('random_seed')
+            base_seed = seed if base_seed is None else base_seed
+            for replicate in range(replicates):
+                jobs.append({
+                    'job': len(jobs),
+                    'name': f'{grid_name}_{set_number}_replicate_{replicate}',
+                    'grid': grid_name,
+                    'set': set_number,
+                    'replicate': replicate,
+                    'parameters': {**parameters, 'random_seed': base_seed + replicate}
+                    })
+    return jobs
+
+_dna_sequences_df = None # dataset of the worker process
+
+def _init_worker(dna_sequences_df):
+    global _dna_sequences_df
+    _dna_sequences_df = dna_sequences_df
+
+def run_job(job):
+    """
+    Run the simulation of a job in the worker process and save its outputs in the folder
+    of the job. The exceptions of the simulation are caught and reported in the result,
+    with the traceback in the log of the job.
+    """
+    folder_test_name = job['folder_test_name']
+    folder = os.path.join(RESULTS_FOLDER, folder_test_name)
+    os.makedirs(folder, exist_ok=True)
+
+    parameters = dict(job['parameters'])
+    simulation_time = parameters.pop('simulation_time', SIM_TIME)
+    if parameters.get('history_spill_folder') is not None: # the jobs run concurrently, one spill folder each
+        parameters['history_spill_folder'] = os.path.join(parameters['history_spill_folder'],
+            os.path.basename(folder_test_name))
+    with open(os.path.join(folder, PARAMETERS_FILE), 'w') as outfile:
+        json.dump(job['parameters'], outfile, indent=4)
+
+    result = {'status': 'completed', 'error': None, 'number_of_proteins_synthesized': None,
+        'dna_sequences_synthesized': None, 'cached': False}
+    start = time.perf_counter()
+    with open(os.path.join(folder, LOG_FILE), 'w') as log, contextlib.redirect_stdout(log):
+        try:
+            process = ProteinSinthesisProcess(_dna_sequences_df, **parameters)
+            process.run(simulation_time)
+            process.save_process(folder_test_name=folder_test_name)
+
+            result['number_of_proteins_synthesized'] = int(process.results.number_of_proteins())
+            result['dna_sequences_synthesized'] = len(process.results)
+        except Exception as exception:
+            traceback.print_exc(file=log)
+            result['status'] = 'failed'
+            result['error'] = f'{type(exception).__name__}: {exception}'
+    result['wall_time'] = time.perf_counter() - start
+    return result
+
+class ParameterSweep:
+    """
+    Parameter sweep, this class runs the jobs of the parameters grids on a pool of processes,
+    one job per core, and writes the outputs of each job in its own folder of the results
+    folder, with the parameters of the job and the log of the simulation. The failed
+    jobs are reported without stopping the sweep, and the jobs lost with a crashed worker
+    process are run again each one in its own worker process, so that only the crashing job is
+    reported as crashed. The progress is printed at each completed job and the summary table
+    of the jobs is saved in the folder of the sweep.
+    With the cache, the outputs of each job are stored in the job cache under the key of the
+    job, the hash of its parameters, seed included, of the dataset and of the code version.
+    The jobs already completed by a previous sweep are not run again, so a sweep interrupted
+    or extended with new parameters values runs only the missing jobs, and the identical jobs
+    of a sweep are run once.
+
+    Parameters
+    ----------
+    dna_sequences_df : pandas.DataFrame
+        DataFrame containing a column 'sequence' with the DNA sequences to be synthesized,
+        sent once to each worker process.
+    grid_paths : list
+        The paths of the parameters grids json files.
+    sweep_name : str, optional
+        The folder of the sweep in the results folder. The default is SWEEP_NAME.
+    replicates : int, optional
+        The number of replicates of each parameters set, with consecutive seeds.
+        The default is NUMBER_REPLICATES.
+    seed : int, optional
+        The seed of the first replicate of the parameters sets without random_seed.
+        The default is SWEEP_SEED.
+    max_workers : int, optional
+        The number of worker processes. If None, one per core. The default is None.
+    use_cache : bool, optional
+        If True, the outputs of the jobs are stored in the job cache and the completed jobs
+        are not run again, otherwise in folders of the sweep named after the jobs. The default
+        is True.
+    cache_folder : str, optional
+        The folder of the job cache. The default is CACHE_FOLDER.
+
+    Attributes
+    ----------
+    jobs : list
+        The jobs of the sweep, each one with its name, grid, parameters set, replicate,
+        parameters, key in the job cache and folder of the outputs in the results folder.
+    cache : JobCache
+        The job cache, None without cache.
+    summary : pandas.DataFrame
+        The summary table of the jobs, with their parameters, status, error, wall time,
+        number of proteins and DNA sequences synthesized, whether they were cached, key and
+        folder, None before run.
+
+    Methods
+    -------
+    run()
+        Run the jobs and return the summary table.
+    """
+    def __init__(self, dna_sequences_df, grid_paths, sweep_name=SWEEP_NAME, replicates=NUMBER_REPLICATES,
+            seed=SWEEP_SEED, max_workers=None, use_cache=True, cache_folder=CACHE_FOLDER):
+        self.dna_sequences_df = dna_sequences_df
+        self.sweep_name = sweep_name
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.jobs = expand_jobs(grid_paths, replicates, seed)
+        self.cache = JobCache(cache_folder) if use_cache else None
+        self.summary = None
+
+        if self.cache is not None:
+            self.dataset = dataset_fingerprint(dna_sequences_df)
+            self.code = code_version()
+        for job in self.jobs:
+            if self.cache is not None:
+                job['key'] = job_key(job['parameters'], self.dataset, self.code)
+                job['folder_test_name'] = os.path.relpath(self.cache.entry_folder(job['key']), RESULTS_FOLDER)
+            else:
+                job['key'] = None
+                job['folder_test_name'] = os.path.join(self.sweep_name, job['name'])
+
+    def run(self):
+        os.makedirs(os.path.join(RESULTS_FOLDER, self.sweep_name), exist_ok=True)
+        results = dict()
+        start = time.perf_counter()
+
+        print(f'Sweep {self.sweep_name}: {len(self.jobs)} jobs on {self.max_workers} processes.')
+        pending, duplicates = self._pending_jobs(results, start)
+        crashed = self._run_pool(pending, self.max_workers, results, start)
+        for job in crashed: # run alone the jobs of the crashed pool to isolate the crashing job
+            if self._run_pool([job], 1, results, start):
+                results[job['job']] = {'status': 'crashed', 'error': 'worker process terminated abruptly',
+                    'number_of_proteins_synthesized': None, 'dna_sequences_synthesized': None,
+                    'cached': False, 'wall_time': None}
+                self._report_progress(job, results, start)
+        for job, first_job in duplicates: # identical jobs, run once
+            results[job['job']] = results[first_job['job']]
+
+        self.summary = self._summary(results)
+        self.summary.to_csv(os.path.join(RESULTS_FOLDER, self.sweep_name, SUMMARY_FILE), index=False)
+        print(f'Sweep {self.sweep_name} ended in {time.perf_counter() - start:.1f} s: '
+            f'{(self.summary["status"] == "completed").sum()}/{len(self.jobs)} jobs completed.')
+        return self.summary
+
+    def _pending_jobs(self, results, start):
+        """
+        Return the jobs to run, the ones not completed in the cache, and the pairs of the
+        identical jobs with the job to run in their place. The results of the completed
+        jobs are taken from the cache.
+        """
+        pending, duplicates, pending_keys = [], [], dict()
+        for job in self.jobs:
+            metadata = self.cache.lookup(job['key']) if self.cache is not None else None
+            if metadata is not None:
+                results[job['job']] = {**metadata['result'], 'cached': True}
+                self._report_progress(job, results, start)
+            elif job['key'] is not None and job['key'] in pending_keys:
+                duplicates.append((job, pending_keys[job['key']]))
+            else:
+                if self.cache is not None:
+                    self.cache.begin(job['key'])
+                    pending_keys[job['key']] = job
+                pending.append(job)
+        return pending, duplicates
+
+    def _run_pool(self, jobs, max_workers, results, start):
+        """
+        Run the jobs on a pool of processes, return the jobs lost with a crashed worker process.
+        """
+        crashed = []
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                initargs=(self.dna_sequences_df,)) as executor:
+            futures = {executor.submit(run_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results[job['job']] = future.result()
+                except BrokenProcessPool:
+                    crashed.append(job)
+                    continue
+                if self.cache is not None and results[job['job']]['status'] == 'completed':
+                    self.cache.commit(job['key'], {'parameters': job['parameters'], 'dataset': self.dataset,
+                        'code': self.code, 'wall_time': results[job['job']]['wall_time'],
+                        'result': results[job['job']]})
+                self._report_progress(job, results, start)
+        return crashed
+
+    def _report_progress(self, job, results, start):
+        result = results[job['job']]
+        completed = len(results)
+        run = sum(not result['cached'] for result in results.values()) # cached jobs take no time
+        elapsed = time.perf_counter() - start
+        remaining = elapsed / run * (len(self.jobs) - completed) if run > 0 else 0.
+        print(f'[{completed}/{len(self.jobs)}] {job["name"]} {result["status"]}'
+            + (' (cached)' if result['cached'] else '')
+            + (f' in {result["wall_time"]:.1f} s' if result['wall_time'] is not None else '')
+            + (f' ({result["error"]})' if result['error'] is not None else '')
+            + f', elapsed {elapsed:.1f} s, remaining {remaining:.1f} s')
+
+    def _summary(self, results):
+        rows = []
+        for job in self.jobs:
+            rows.append({'job': job['job'], 'name': job['name'], 'grid': job['grid'], 'set': job['set'],
+                'replicate': job['replicate'], **job['parameters'], **results[job['job']], 'key': job['key'],
+                'folder': os.path.join(RESULTS_FOLDER, job['folder_test_name'])})
+        return pd.DataFrame(rows)
+
+def load_sweep_results(summary, replicate=0):
+    """
+    Return the results dataframes, the RNA polymerase and ribosome histories and the
+    parameters of the completed jobs of a replicate of a sweep, in the order of the jobs,
+    as the lists of the compare functions of plot_utils. The summary is the summary table
+    of the sweep or the path of its csv file. The histories spilled during the simulation
+    are read from their history files.
+    """
+    if isinstance(summary, str):
+        summary = pd.read_csv(summary)
+    jobs = summary[(summary['replicate'] == replicate) & (summary['status'] == 'completed')]
+
+    results_df_list, rna_polymerase_dict_list, ribosome_dict_list, parameters_dict_list = [], [], [], []
+    for folder in jobs['folder']:
+        results_df_list.append(pd.read_csv(os.path.join(folder, 'results.csv'), index_col=0))
+        # json histories, or history files of the jobs run with the history spill folder
+        rna_polymerase_dict_list.append(load_history(os.path.join(folder, 'rna_polymerase_history.json')))
+        ribosome_dict_list.append(load_history(os.path.join(folder, 'ribosome_history.json')))
+        with open(os.path.join(folder, PARAMETERS_FILE)) as infile:
+            parameters_dict_list.append(json.load(infile))
+    return results_df_list, rna_polymerase_dict_list, ribosome_dict_list, parameters_dict_list
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the parameters grids of the protein synthesis '
+        'process on a pool of processes, from the root of the repository: python -m src.sweep')
+    parser.add_argument('grids', nargs='*', default=['data/parameters_ribosome.json',
+        'data/parameters_rna_polymerases.json'])
+    parser.add_argument('--dataset', default=None,
+        help='csv file of the DNA sequences, the HumanGenomeDataset by default')
+    parser.add_argument('--name', default=SWEEP_NAME)
+    parser.add_argument('--replicates', type=int, default=NUMBER_REPLICATES)
+    parser.add_argument('--seed', type=int, default=SWEEP_SEED)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true', help='run all the jobs without the job cache')
+    args = parser.parse_args()
+
+    if args.dataset is not None:
+        data_df = pd.read_csv(args.dataset)
+    else:
+        from HumanGenomeDataset.load_dataset import load_dataset
+        data_df = load_dataset('dna_protein_coding_sequences')
+
+    ParameterSweep(data_df, args.grids, sweep_name=args.name, replicates=args.replicates,
+        seed=args.seed, max_workers=args.workers, use_cache=not args.no_cache).run()
@@ -0,0 +1,148 @@
+import json
+import numpy as np
+import pandas as pd
+
+UNIFORM = 'uniform'
+POISSON = 'poisson'
+TRACE = 'trace'
+MAX_INTERARRIVAL_TIME = 10 # seconds, uniform arrivals
+TIME_DECIMALS = 4 # time unit: 0.0001 second
+TRACE_COLUMN = 'request_start_process_time' # arrival times in the results of a simulation
+
+class ArrivalProcess:
+    """
+    Arrival process, this class generates the delays before the arrivals of the DNA sequences,
+    the first DNA sequence arrives at time 0 and the following ones after a random time
+    uniform in [0, max_interarrival_time].
+
+    Parameters
+    ----------
+    max_interarrival_time : float, optional
+        The maximum time between two arrivals. The default is MAX_INTERARRIVAL_TIME.
+
+    Methods
+    -------
+    delays(rng)
+        Generate the delay before each arrival, stop when there are no more arrivals.
+    """
+    def __init__(self, max_interarrival_time=MAX_INTERARRIVAL_TIME):
+        self.max_interarrival_time = max_interarrival_time
+
+    def delays(self, rng):
+        yield 0.
+        while True:
+            yield round(rng.random() * self.max_interarrival_time, TIME_DECIMALS)
+
+class PoissonArrivals(ArrivalProcess):
+    """
+    Poisson arrivals, the DNA sequences arrive at a mean rate per second, with exponential
+    times between two arrivals, the first DNA sequence arrives at time 0.
+
+    Parameters
+    ----------
+    rate : float
+        The mean number of arrivals per second.
+    """
+    def __init__(self, rate):
+        if rate is None or rate <= 0:
+            raise ValueError(f'the rate of the Poisson arrivals must be positive, got {rate}')
+        self.rate = rate
+
+    def delays(self, rng):
+        yield 0.
+        while True:
+            yield round(rng.exponential(1 / self.rate), TIME_DECIMALS)
+
+class TraceArrivals(ArrivalProcess):
+    """
+    Replay of a recorded arrival trace, the DNA sequences arrive at the times of the trace,
+    sorted, and the arrivals stop at the end of the trace.
+
+    Parameters
+    ----------
+    arrival_times : list or str
+        The arrival times in seconds, or the path of a json file with the list of arrival
+        times or of the results csv file of a simulation, whose request_start_process_time
+        column is replayed.
+    """
+    def __init__(self, arrival_times):
+        if isinstance(arrival_times, str):
+            arrival_times = self.load(arrival_times)
+        self.arrival_times = np.sort(np.asarray(arrival_times, dtype=float))
+
+    @staticmethod
+    def load(path):
+        """
+        Load the arrival times of a json or csv file.
+        """
+        if path.endswith('.json'):
+            with open(path) as infile:
+                return json.load(infile)
+        return pd.read_csv(path)[TRACE_COLUMN].dropna().values
+
+    def delays(self, rng):
+        previous_time = 0.
+        for arrival_time in self.arrival_times:
+            yield round(max(arrival_time - previous_time, 0.), TIME_DECIMALS)
+            previous_time = arrival_time
+
+ARRIVAL_PROCESSES = [UNIFORM, POISSON, TRACE]
+
+def make_arrival_process(name, rate=None, trace=None):
+    """
+    Return a new arrival process by name, one of ARRIVAL_PROCESSES.
+    """
+    if name == UNIFORM:
+        return ArrivalProcess()
+    if name == POISSON:
+        return PoissonArrivals(rate)
+    if name == TRACE:
+        if trace is None:
+            raise ValueError('the trace arrival process requires an arrival trace')
+        return TraceArrivals(trace)
+    raise ValueError(f'unknown arrival process {name}, expected one of {ARRIVAL_PROCESSES}')
+
+class ArrivalScheduler:
+    """
+    Arrival scheduler, this class schedules the arrivals of the DNA sequences of a dataset,
+    sampled without replacement. The rows of the DNA sequences are shuffled once in a
+    permutation, and each arrival takes the next row of the permutation in O(1), so every
+    DNA sequence arrives at most once and the arrivals stop when the dataset is exhausted
+    or the arrival process ends.
+
+    Parameters
+    ----------
+    number_sequences : int
+        The number of DNA sequences of the dataset.
+    arrival_process : ArrivalProcess
+        The arrival process generating the delays before the arrivals.
+    random_seed : int, optional
+        The random seed of the permutation and of the arrival process. The default is None.
+
+    Methods
+    -------
+    remaining()
+        Return the number of DNA sequences not arrived yet.
+    __iter__()
+        Generate the (delay, row) of each arrival, the delay before the arrival of the DNA
+        sequence in the row.
+    """
+    def __init__(self, number_sequences, arrival_process, random_seed=None):
+        self.arrival_process = arrival_process
+        self.rng = np.random.default_rng(random_seed)
+        self.permutation = self.rng.permutation(number_sequences)
+        self.position = 0 # next row of the permutation
+
+    def __len__(self):
+        return len(self.permutation)
+
+    def remaining(self):
+        return len(self.permutation) - self.position
+
+    def __iter__(self):
+        for delay in self.arrival_process.delays(self.rng):
+            if self.position == len(self.permutation): # dataset exhausted
+                return
+            row = int(self.permutation[self.position])
+            self.position += 1
+            yield delay, row
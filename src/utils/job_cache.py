@@ -0,0 +1,201 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import socket
+import time
+import pandas as pd
+
+CACHE_FOLDER = 'results/cache/'
+CODE_FOLDER = 'src/'
+METADATA_FILE = 'job.json'
+COMPLETED = 'completed'
+INCOMPLETE = 'incomplete'
+RUNNING = 'running'
+OWNER_FILE = 'owner.json'
+OWNER_MAX_AGE = 24 * 3600 # seconds, age after which an owner on another host is considered dead
+
+def code_version(code_folder=CODE_FOLDER):
+    """
+    Return the fingerprint of the source code of the simulation, the hash of the python
+    files of the code folder.
+    """
+    code = hashlib.blake2b(digest_size=8)
+    for path in sorted(glob.glob(os.path.join(code_folder, '**', '*.py'), recursive=True)):
+        code.update(os.path.relpath(path, code_folder).encode())
+        with open(path, 'rb') as infile:
+            code.update(infile.read())
+    return code.hexdigest()
+
+def dataset_fingerprint(dna_sequences_df):
+    """
+    Return the fingerprint of a dataset of DNA sequences, the hash of its rows and index.
+    """
+    rows_hashes = pd.util.hash_pandas_object(dna_sequences_df, index=True).values
+    return hashlib.blake2b(rows_hashes.tobytes(), digest_size=8).hexdigest()
+
+def job_key(parameters, dataset, code):
+    """
+    Return the key of a job, the hash of its parameters, seed included, of the dataset
+    fingerprint and of the code version.
+    """
+    content = json.dumps({'parameters': parameters, 'dataset': dataset, 'code': code}, sort_keys=True)
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+class JobCache:
+    """
+    Job cache, this class stores the outputs of the simulation jobs in a folder named after
+    the key of the job, the hash of its parameters, of the dataset fingerprint and of the code
+    version, so that a job already completed is not run again. The metadata of a completed job,
+    with its parameters and results, is written last in the folder of the job, the folders
+    without it are left by interrupted or failed jobs and are cleared before running the job.
+    The process running a job, its owner, is written in the folder of the job when it begins,
+    so that the garbage collection does not remove the jobs of a sweep still running: an
+    incomplete entry is removed only if its owner is no longer running, or, for an owner on
+    another host, if it is older than OWNER_MAX_AGE.
+
+    Parameters
+    ----------
+    folder : str, optional
+        The folder of the cache. The default is CACHE_FOLDER.
+
+    Methods
+    -------
+    entry_folder(key)
+        Return the folder of the outputs of a job.
+    lookup(key)
+        Return the metadata of a completed job, None if the job is not completed.
+    begin(key)
+        Create an empty folder for the outputs of a job.
+    commit(key, metadata)
+        Mark a job as completed with its metadata.
+    running(key)
+        Return True if the owner of an incomplete entry may still be running the job.
+    inspect()
+        Return the table of the entries of the cache.
+    gc(code=None, remove_all=False)
+        Remove the stale entries of the cache.
+    """
+    def __init__(self, folder=CACHE_FOLDER):
+        self.folder = folder
+
+    def entry_folder(self, key):
+        return os.path.join(self.folder, key)
+
+    def lookup(self, key):
+        metadata_path = os.path.join(self.entry_folder(key), METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            return None
+        with open(metadata_path) as infile:
+            return json.load(infile)
+
+    def begin(self, key):
+        folder = self.entry_folder(key)
+        if os.path.exists(folder): # outputs of an interrupted or failed run
+            shutil.rmtree(folder)
+        os.makedirs(folder)
+        with open(os.path.join(folder, OWNER_FILE), 'w') as outfile:
+            json.dump({'pid': os.getpid(), 'host': socket.gethostname(), 'started': time.time()}, outfile)
+        return folder
+
+    def commit(self, key, metadata):
+        # write in a temporary file and rename it, the entry is never seen partially written
+        metadata_path = os.path.join(self.entry_folder(key), METADATA_FILE)
+        with open(metadata_path + '.tmp', 'w') as outfile:
+            json.dump({**metadata, 'key': key, 'status': COMPLETED, 'created': time.time()}, outfile, indent=4)
+        os.replace(metadata_path + '.tmp', metadata_path)
+        owner_path = os.path.join(self.entry_folder(key), OWNER_FILE)
+        if os.path.exists(owner_path):
+            os.remove(owner_path)
+
+    def running(self, key):
+        """
+        Return True if the owner of an incomplete entry may still be running the job.
+        """
+        owner_path = os.path.join(self.entry_folder(key), OWNER_FILE)
+        try:
+            with open(owner_path) as infile:
+                owner = json.load(infile)
+        except (OSError, ValueError): # no owner, or owner file not written yet
+            return os.path.exists(self.entry_folder(key)) and \
+                time.time() - os.path.getmtime(self.entry_folder(key)) < OWNER_MAX_AGE
+        if owner['host'] != socket.gethostname():
+            return time.time() - owner['started'] < OWNER_MAX_AGE
+        try:
+            os.kill(owner['pid'], 0) # signal 0: check that the process exists
+        except ProcessLookupError:
+            return False
+        except PermissionError: # process of another user
+            return True
+        return True
+
+    def entries(self):
+        """
+        Generate the key, the metadata, None for incomplete entries, and the size in bytes
+        of the entries of the cache.
+        """
+        if not os.path.exists(self.folder):
+            return
+        for key in sorted(os.listdir(self.folder)):
+            folder = self.entry_folder(key)
+            if os.path.isdir(folder):
+                size = sum(os.path.getsize(os.path.join(root, name))
+                    for root, _, names in os.walk(folder) for name in names)
+                yield key, self.lookup(key), size
+
+    def inspect(self, code=None):
+        """
+        Return the table of the entries of the cache, with their status, code version, dataset
+        fingerprint, creation time, wall time, size and parameters, and whether their code
+        version is the current one.
+        """
+        code = code if code is not None else code_version()
+        rows = []
+        for key, metadata, size in self.entries():
+            metadata = metadata if metadata is not None else {'status': RUNNING if self.running(key) else INCOMPLETE}
+            rows.append({'key': key, 'status': metadata['status'], 'code': metadata.get('code'),
+                'current_code': metadata.get('code') == code, 'dataset': metadata.get('dataset'),
+                'created': pd.to_datetime(metadata['created'], unit='s') if 'created' in metadata else None,
+                'wall_time': metadata.get('wall_time'), 'size_mb': size / 2**20,
+                'parameters': json.dumps(metadata.get('parameters'))})
+        return pd.DataFrame(rows, columns=['key', 'status', 'code', 'current_code', 'dataset', 'created',
+            'wall_time', 'size_mb', 'parameters'])
+
+    def gc(self, code=None, remove_all=False):
+        """
+        Remove the stale entries of the cache, the incomplete ones whose owner is no longer
+        running and the completed ones of another code version than code, the current one by
+        default, or all the entries but the running ones if remove_all.
+        Return the keys of the removed entries.
+        """
+        code = code if code is not None else code_version()
+        removed = []
+        for key, metadata, _ in list(self.entries()):
+            if metadata is None and self.running(key): # job of a sweep still running
+                continue
+            if remove_all or metadata is None or metadata.get('code') != code:
+                shutil.rmtree(self.entry_folder(key))
+                removed.append(key)
+        return removed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect the cache of the simulation jobs and remove '
+        'its stale entries, from the root of the repository: python -m src.utils.job_cache')
+    parser.add_argument('--folder', default=CACHE_FOLDER)
+    parser.add_argument('--gc', action='store_true',
+        help='remove the incomplete entries of jobs no longer running and the entries of other code versions')
+    parser.add_argument('--all', action='store_true', help='with --gc, remove all the entries but the running ones')
+    args = parser.parse_args()
+
+    cache = JobCache(args.folder)
+    if args.gc:
+        removed = cache.gc(remove_all=args.all)
+        print(f'{len(removed)} entries removed.')
+    else:
+        entries = cache.inspect()
+        print(entries.drop(columns=['parameters']).to_string(index=False))
+        print(f'{len(entries)} entries, {(entries["status"] == COMPLETED).sum()} completed, '
+            f'{((entries["status"] == COMPLETED) & ~entries["current_code"]).sum()} of other code versions, '
+            f'{entries["size_mb"].sum():.1f} MB.')
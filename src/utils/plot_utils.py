@@ -4,6 +4,7 @@ import pandas as pd
 import plotly.express as px
 import ast
 import json
+from src.resources.history import load_history
 
 TIME_UNIT = 0.0001
 CODONS_PATH = 'data\codons.json'
@@ -195,6 +196,22 @@ def level_series_over_time(nucleotide_dict, time_unit=TIME_UNIT):
 
 def plot_nucleotide_level_over_time(
         uracil_dict, adenine_dict, guanine_dict, cytosine_dict, time_unit=TIME_UNIT):
+    if all('level_mean' in nucleotide_dict for nucleotide_dict in
+            (uracil_dict, adenine_dict, guanine_dict, cytosine_dict)):
+        # histories aggregated in buckets: mean level and min-max band of each bucket
+        plt.figure(figsize=(20, 5))
+        for name, nucleotide_dict in zip(['Uracil', 'Adenine', 'Guanine', 'Cytosine'],
+                [uracil_dict, adenine_dict, guanine_dict, cytosine_dict]):
+            line, = plt.step(nucleotide_dict['level_time'], nucleotide_dict['level_mean'], where='post', label=name)
+            plt.fill_between(nucleotide_dict['level_time'], nucleotide_dict['level_min'], nucleotide_dict['level_max'],
+                step='post', color=line.get_color(), alpha=0.2)
+        plt.title('Nucleotides levels over time')
+        plt.xlabel('Time (s)')
+        plt.ylabel('Nucleotides level')
+        plt.legend()
+        plt.show()
+        return
+
     uracil_levels = level_series_over_time(uracil_dict, time_unit)
     adenine_levels = level_series_over_time(adenine_dict, time_unit)
     guanine_levels = level_series_over_time(guanine_dict, time_unit)
@@ -220,6 +237,9 @@ def plot_nucleotide_level_over_time(
     plt.show()
 
 def dict_to_dataframe(resources_dict):
+    if 'wait_time_mean' in resources_dict:
+        # history aggregated in buckets, the series have a different number of buckets
+        resources_dict = {k: v for k, v in resources_dict.items() if k.startswith('wait_time_')}
     min_len = min([len(v) for v in resources_dict.values()])
     resources_dict = {k: v[:min_len] for k, v in resources_dict.items()}
     df = pd.DataFrame(resources_dict)
@@ -227,14 +247,16 @@ def dict_to_dataframe(resources_dict):
 
 def resources_request_wait_time(rna_polymerase_df, ribosome_df):
     plt.figure(figsize=(20, 5))
-    plt.plot(rna_polymerase_df['request_time'], rna_polymerase_df['wait_time'], 
-        'm.', label='RNA polymerase')
-    plt.plot(rna_polymerase_df['request_time'], rna_polymerase_df['wait_time'], 
-        'm--', alpha=0.5)
-    plt.plot(ribosome_df['request_time'], ribosome_df['wait_time'], 
-        'g.', label='Ribosome')
-    plt.plot(ribosome_df['request_time'], ribosome_df['wait_time'], 
-        'g--', alpha=0.5)
+    for df, color, label in [(rna_polymerase_df, 'm', 'RNA polymerase'), (ribosome_df, 'g', 'Ribosome')]:
+        if 'wait_time_mean' in df:
+            # history aggregated in buckets of the availability time: mean wait time and min-max band
+            plt.plot(df['wait_time_time'], df['wait_time_mean'], f'{color}.', label=f'{label} (by availability time)')
+            plt.plot(df['wait_time_time'], df['wait_time_mean'], f'{color}--', alpha=0.5)
+            plt.fill_between(df['wait_time_time'], df['wait_time_min'], df['wait_time_max'],
+                color=color, alpha=0.2)
+        else:
+            plt.plot(df['request_time'], df['wait_time'], f'{color}.', label=label)
+            plt.plot(df['request_time'], df['wait_time'], f'{color}--', alpha=0.5)
     plt.title('Resources request time vs wait time')
     plt.xlabel('Request time (s)')
     plt.ylabel('Wait time (s)')
@@ -244,8 +266,7 @@ def resources_request_wait_time(rna_polymerase_df, ribosome_df):
 def plot_codons_request_per_aminoacid(file_path, time_unit=TIME_UNIT):
     codon_dict_list = []
     for codon in CODONS:
-        with open(file_path+f'rna_transfer_history_{codon}.json') as f:
-            codon_dict_list.append(json.load(f))
+        codon_dict_list.append(load_history(file_path+f'rna_transfer_history_{codon}.json'))
     
     with open(CODONS_PATH) as f:
         codons_dict = json.load(f)
@@ -272,8 +293,7 @@ def plot_codons_request_per_aminoacid(file_path, time_unit=TIME_UNIT):
 def plot_codons_request(file_path, time_unit=TIME_UNIT):
     codon_dict_list = []
     for codon in CODONS:
-        with open(file_path+f'rna_transfer_history_{codon}.json') as f:
-            codon_dict_list.append(json.load(f))
+        codon_dict_list.append(load_history(file_path+f'rna_transfer_history_{codon}.json'))
     
     max_time = max([max(codon_dict['request_time']) for codon_dict in codon_dict_list])
     time = np.arange(0, max_time, time_unit)
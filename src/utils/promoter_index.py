@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from src.utils.promoter_scanner import PromoterScanner
+
+INDEX_VERSION = 2
+INDEX_FILES = ['hashes', 'rows', 'boxes', 'offsets', 'positions', 'segments']
+NO_PROMOTER = -1
+
+def sequence_hash(dna_sequence):
+    """
+    Return the 64 bit hash of a DNA sequence used as key of the promoter index.
+    """
+    return int.from_bytes(hashlib.blake2b(dna_sequence.encode(), digest_size=8).digest(), 'little')
+
+class PromoterIndex:
+    """
+    Promoter index, this class stores on disk the promoters found in the DNA sequences of a
+    dataset, so that the promoter detection is computed once per dataset and shared between
+    simulations. For each DNA sequence, identified by its hash, the index holds the promoter
+    box, the promoter positions and the bounds of the DNA segments to transcript. The DNA
+    sequences are hashed once when the index is built or loaded, and the entry of each row of
+    the dataset is stored, so the DNA sequences of the dataset are looked up by row without
+    hashing them again.
+    The index is saved in a folder named after the fingerprint of the promoters configuration
+    and of the dataset, so it is rebuilt when the promoters or the minimum length between
+    promoters change. The arrays are loaded memory-mapped and shared between processes.
+
+    Parameters
+    ----------
+    folder : str
+        The folder of the index.
+    boxes_names : list
+        The list of the promoter boxes names.
+    hashes : numpy.ndarray
+        The sorted hashes of the DNA sequences.
+    rows : numpy.ndarray
+        The entry of the DNA sequence of each row of the dataset.
+    boxes : numpy.ndarray
+        The index of the promoter box found in each DNA sequence, -1 if no promoter is found.
+    offsets : numpy.ndarray
+        The offsets of the promoters of each DNA sequence in the positions and segments arrays.
+    positions : numpy.ndarray
+        The positions of the promoters.
+    segments : numpy.ndarray
+        The (start, end) bounds of the DNA segments to transcript.
+
+    Methods
+    -------
+    lookup(dna_sequence)
+        Return the promoter box and the segments bounds of a DNA sequence, if indexed.
+    lookup_row(row)
+        Return the promoter box and the segments bounds of the DNA sequence of a row of the dataset.
+    build(path, dna_sequences, promoters, length_promoter, min_length_promoter)
+        Build the index of a dataset and save it on disk.
+    load(folder)
+        Load the index memory-mapped from disk.
+    load_or_build(path, dna_sequences, promoters, length_promoter, min_length_promoter)
+        Load the index of a dataset if present on disk, build it otherwise.
+    """
+    def __init__(self, folder, boxes_names, hashes, rows, boxes, offsets, positions, segments):
+        self.folder = folder
+        self.boxes_names = boxes_names
+        self.hashes = hashes
+        self.rows = rows
+        self.boxes = boxes
+        self.offsets = offsets
+        self.positions = positions
+        self.segments = segments
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def lookup(self, dna_sequence):
+        """
+        Return the promoter box and the list of (start, end) bounds of the DNA segments
+        to transcript of a DNA sequence. The promoter box is None if no promoter is found.
+        Return None if the DNA sequence is not indexed.
+        """
+        key = np.uint64(sequence_hash(dna_sequence))
+        i = int(np.searchsorted(self.hashes, key))
+        if i == len(self.hashes) or self.hashes[i] != key:
+            return None
+        return self._entry(i)
+
+    def lookup_row(self, row):
+        """
+        Return the promoter box and the list of (start, end) bounds of the DNA segments
+        to transcript of the DNA sequence of a row of the dataset, without hashing it.
+        """
+        return self._entry(int(self.rows[row]))
+
+    def _entry(self, i):
+        if self.boxes[i] == NO_PROMOTER:
+            return None, []
+
+        segments = self.segments[self.offsets[i]:self.offsets[i+1]]
+        return self.boxes_names[self.boxes[i]], [(int(start), int(end)) for start, end in segments]
+
+    @classmethod
+    def build(cls, path, dna_sequences, promoters, length_promoter, min_length_promoter, rows_hashes=None):
+        """
+        Scan the DNA sequences, build the index and save it in a folder of path.
+        The hashes of the DNA sequences are computed unless given in rows_hashes.
+        """
+        rows_hashes = rows_hashes if rows_hashes is not None else cls._rows_hashes(dna_sequences)
+        folder = os.path.join(path, cls._fingerprint(
+            rows_hashes, promoters, length_promoter, min_length_promoter))
+        scanner = PromoterScanner(promoters, min_length_promoter)
+        boxes_names = list(promoters.keys())
+
+        indexed = dict()
+        for dna_sequence, key in zip(dna_sequences, rows_hashes.tolist()):
+            if key not in indexed:
+                promoter, promoter_positions_list = scanner.find(dna_sequence)
+                segments = scanner.segments(promoter_positions_list, length_promoter.get(promoter, 0),
+                    len(dna_sequence))
+                indexed[key] = (boxes_names.index(promoter) if promoter is not None else NO_PROMOTER,
+                    promoter_positions_list, segments)
+
+        keys = sorted(indexed)
+        lengths = [len(indexed[key][1]) for key in keys]
+        hashes = np.array(keys, dtype=np.uint64)
+        arrays = {
+            'hashes': hashes,
+            'rows': np.searchsorted(hashes, rows_hashes).astype(np.int64),
+            'boxes': np.array([indexed[key][0] for key in keys], dtype=np.int8),
+            'offsets': np.concatenate(([0], np.cumsum(lengths, dtype=np.int64))).astype(np.int64),
+            'positions': np.array([p for key in keys for p in indexed[key][1]], dtype=np.int64),
+            'segments': np.array([s for key in keys for s in indexed[key][2]], dtype=np.int64).reshape(-1, 2),
+        }
+
+        # write in a temporary folder and rename it, concurrent builders do not see partial indexes
+        tmp_folder = folder + f'.tmp{os.getpid()}'
+        os.makedirs(tmp_folder, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_folder, name + '.npy'), array)
+        with open(os.path.join(tmp_folder, 'metadata.json'), 'w') as outfile:
+            json.dump({'version': INDEX_VERSION, 'boxes_names': boxes_names, 'promoters': promoters,
+                'length_promoter': length_promoter, 'min_length_promoter': min_length_promoter}, outfile)
+        try:
+            os.rename(tmp_folder, folder)
+        except OSError: # index already built by another process
+            shutil.rmtree(tmp_folder)
+
+        return cls.load(folder)
+
+    @classmethod
+    def load(cls, folder):
+        """
+        Load the index memory-mapped from a folder.
+        """
+        with open(os.path.join(folder, 'metadata.json')) as infile:
+            metadata = json.load(infile)
+        arrays = {name: np.load(os.path.join(folder, name + '.npy'), mmap_mode='r') for name in INDEX_FILES}
+        return cls(folder, metadata['boxes_names'], **arrays)
+
+    @classmethod
+    def load_or_build(cls, path, dna_sequences, promoters, length_promoter, min_length_promoter):
+        """
+        Load the index of the DNA sequences from path if present, build it otherwise.
+        """
+        rows_hashes = cls._rows_hashes(dna_sequences) # hashed once, for the fingerprint and the build
+        folder = os.path.join(path, cls._fingerprint(
+            rows_hashes, promoters, length_promoter, min_length_promoter))
+        if os.path.exists(os.path.join(folder, 'metadata.json')):
+            return cls.load(folder)
+        return cls.build(path, dna_sequences, promoters, length_promoter, min_length_promoter, rows_hashes)
+
+    @staticmethod
+    def _rows_hashes(dna_sequences):
+        return np.fromiter((sequence_hash(dna_sequence) for dna_sequence in dna_sequences),
+            dtype=np.uint64, count=len(dna_sequences))
+
+    @staticmethod
+    def _fingerprint(rows_hashes, promoters, length_promoter, min_length_promoter):
+        configuration = json.dumps({'version': INDEX_VERSION, 'promoters': promoters,
+            'length_promoter': length_promoter, 'min_length_promoter': min_length_promoter}, sort_keys=True)
+        # the hashes of the rows in order
+        dataset = hashlib.blake2b(rows_hashes.astype('<u8').tobytes(), digest_size=8)
+
+        return (hashlib.blake2b(configuration.encode(), digest_size=8).hexdigest() + '-' +
+            dataset.hexdigest())
@@ -0,0 +1,97 @@
+import re
+
+class PromoterScanner:
+    """
+    Promoter scanner, this class finds the positions of all the promoter boxes of a DNA
+    sequence in a single pass over the sequence.
+    The promoters are compiled once in a regular expression automaton, each match is assigned
+    to its promoter box and the minimum length between promoters is applied while scanning.
+
+    Parameters
+    ----------
+    promoters : dict
+        The dictionary with the promoter box name as the key and the list of promoter
+        sequences as the value.
+    min_length_promoter : int
+        The minimum length between two promoters of the same box, promoters closer than
+        this length are considered as a single promoter.
+
+    Attributes
+    ----------
+    promoters : dict
+        The dictionary of the promoter boxes.
+    min_length_promoter : int
+        The minimum length between two promoters of the same box.
+
+    Methods
+    -------
+    scan(dna_sequence)
+        Find the positions of the promoters of each box in a DNA sequence.
+    find(dna_sequence)
+        Find the first promoter box present in a DNA sequence and its positions.
+    segments(promoter_positions_list, promoter_length, sequence_length)
+        Return the bounds of the DNA segments between the promoters.
+    """
+    def __init__(self, promoters, min_length_promoter):
+        self.promoters = promoters
+        self.min_length_promoter = min_length_promoter
+
+        # promoters of different boxes starting in the same position can not be matched
+        # by the same automaton, in that case each box is scanned with its own automaton
+        if self._boxes_overlap(promoters):
+            self._patterns = [self._compile({box: sequences}) for box, sequences in promoters.items()]
+        else:
+            self._patterns = [self._compile(promoters)]
+
+    def scan(self, dna_sequence):
+        """
+        Find the positions of the promoters of each box in a DNA sequence.
+        Return a dictionary with the promoter box name as the key and the sorted list of
+        promoter positions as the value.
+        """
+        promoters_positions_dict = {box: [] for box in self.promoters}
+
+        for pattern in self._patterns:
+            for match in pattern.finditer(dna_sequence):
+                promoter_positions_list = promoters_positions_dict[match.lastgroup]
+                position = match.start()
+
+                # if dist between promoters is less than the minimum, consider it as a single promoter
+                if (not promoter_positions_list or
+                        position - promoter_positions_list[-1] >= self.min_length_promoter):
+                    promoter_positions_list.append(position)
+
+        return promoters_positions_dict
+
+    def find(self, dna_sequence):
+        """
+        Find the first promoter box, in the order of the promoters dictionary, present in a
+        DNA sequence. Return the promoter box name and the list of its positions, or None
+        and an empty list if no promoter is found.
+        """
+        promoters_positions_dict = self.scan(dna_sequence)
+
+        for promoter in self.promoters:
+            if len(promoters_positions_dict[promoter]) != 0:
+                return promoter, promoters_positions_dict[promoter]
+
+        return None, []
+
+    def segments(self, promoter_positions_list, promoter_length, sequence_length):
+        """
+        Return the (start, end) bounds of the DNA segments to transcript, each segment goes
+        from the end of a promoter to the start of the next one or to the end of the sequence.
+        """
+        ends = promoter_positions_list[1:] + [sequence_length]
+        return [(position + promoter_length, end) for position, end in zip(promoter_positions_list, ends)]
+
+    def _compile(self, promoters):
+        # zero-width lookahead to find overlapping promoters
+        boxes = ['(?P<{}>{})'.format(box, '|'.join(re.escape(sequence) for sequence in sequences))
+            for box, sequences in promoters.items()]
+        return re.compile('(?=(?:{}))'.format('|'.join(boxes)))
+
+    def _boxes_overlap(self, promoters):
+        sequences = [(box, sequence) for box, sequences in promoters.items() for sequence in sequences]
+        return any(box_a != box_b and sequence_b.startswith(sequence_a)
+            for box_a, sequence_a in sequences for box_b, sequence_b in sequences)
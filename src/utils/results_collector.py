@@ -0,0 +1,88 @@
+from array import array
+import numpy as np
+
+RESULTS_COLUMNS = ['mrna_sequences', 'polypeptides_chains', 'polypeptides_chains_ext',
+    'length_mrna_sequences', 'number_of_proteins_synthesized_per_mrna',
+    'number_of_proteins_synthesized', 'protein_synthesized', 'request_start_process_time',
+    'start_process_time', 'start_transcription_time', 'start_translation_time',
+    'end_translation_time', 'end_process_time']
+NUMERIC_COLUMNS = { # typecode of the columns stored in arrays
+    'number_of_proteins_synthesized': 'q',
+    'request_start_process_time': 'd',
+    'start_process_time': 'd',
+    'end_process_time': 'd',
+}
+
+class ResultsCollector:
+    """
+    Results collector, this class collects the results of the synthesized DNA sequences
+    during the simulation. Each result is appended in O(1) to the columns of the results,
+    with the integer row of its DNA sequence in the dataframe, and the dataframe of the DNA
+    sequences with the results is built only when it is requested, then cached until the
+    next result is appended. The rows without results have None in the results columns.
+
+    Parameters
+    ----------
+    dna_sequences_df : pandas.DataFrame
+        The dataframe of DNA sequences.
+
+    Methods
+    -------
+    append(row, mrna_sequences, polypeptides_chain, polypeptides_chain_ext, request_start_process_time,
+            start_process_time, start_transcription_time, start_translation_time, end_translation_time,
+            end_process_time, proteins_sintetized)
+        Append the results of the DNA sequence in a row of the dataframe.
+    number_of_proteins()
+        Return the number of proteins synthesized.
+    to_dataframe()
+        Return the dataframe of DNA sequences with the results.
+    """
+    def __init__(self, dna_sequences_df):
+        self.dna_sequences_df = dna_sequences_df
+        self._rows = array('q')
+        self._columns = {column: array(NUMERIC_COLUMNS[column]) if column in NUMERIC_COLUMNS else []
+            for column in RESULTS_COLUMNS}
+        self._dataframe = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def append(self, row, mrna_sequences, polypeptides_chain, polypeptides_chain_ext, request_start_process_time,
+            start_process_time, start_transcription_time, start_translation_time, end_translation_time,
+            end_process_time, proteins_sintetized):
+        results = {
+            'mrna_sequences': mrna_sequences,
+            'length_mrna_sequences': [len(mrna) for mrna in mrna_sequences] if mrna_sequences else 0,
+            'polypeptides_chains': polypeptides_chain,
+            'polypeptides_chains_ext': polypeptides_chain_ext,
+            'number_of_proteins_synthesized_per_mrna': proteins_sintetized,
+            'number_of_proteins_synthesized': sum(proteins_sintetized) if proteins_sintetized else 0,
+            'protein_synthesized': True if mrna_sequences else False, # boolean
+            'request_start_process_time': request_start_process_time,
+            'start_process_time': start_process_time,
+            'start_transcription_time': start_transcription_time,
+            'start_translation_time': start_translation_time,
+            'end_translation_time': end_translation_time,
+            'end_process_time': end_process_time,
+        }
+        self._rows.append(row)
+        for column, value in results.items():
+            self._columns[column].append(value)
+        self._dataframe = None
+
+    def number_of_proteins(self):
+        return sum(self._columns['number_of_proteins_synthesized'])
+
+    def to_dataframe(self):
+        """
+        Return the dataframe of DNA sequences with the results columns, built once for the
+        results appended so far.
+        """
+        if self._dataframe is None:
+            self._dataframe = self.dna_sequences_df.copy()
+            for column, values in self._columns.items():
+                column_values = np.full(len(self._dataframe), None, dtype=object)
+                for row, value in zip(self._rows, values.tolist() if isinstance(values, array) else values):
+                    column_values[row] = value
+                self._dataframe[column] = column_values
+        return self._dataframe
@@ -0,0 +1,124 @@
+from collections import Counter, deque
+
+class RNAEditor:
+    """
+    RNA editor, this class compiles a dictionary of editing sites once in an Aho-Corasick
+    automaton and edits a RNA sequence in a single pass, whatever the number of editing sites.
+    The editing sites are replaced leftmost first, and the longest one when several editing
+    sites start at the same position; replaced sites do not overlap.
+
+    Parameters
+    ----------
+    editing_sites_dict : dict
+        The dictionary with the editing site as the key and the edited site as the value.
+
+    Attributes
+    ----------
+    editing_sites_dict : dict
+        The dictionary of the editing sites.
+
+    Methods
+    -------
+    find(rna_sequence)
+        Find the non overlapping editing sites in a RNA sequence.
+    edit(rna_sequence)
+        Replace the editing sites of a RNA sequence with the edited sites.
+    """
+    def __init__(self, editing_sites_dict):
+        self.editing_sites_dict = {site: edited for site, edited in editing_sites_dict.items() if site}
+        self._build_automaton()
+
+    def find(self, rna_sequence):
+        """
+        Return the sorted list of (position, length) of the non overlapping editing sites found
+        in a RNA sequence.
+        """
+        if not self.editing_sites_dict:
+            return []
+
+        # longest editing site starting at each position
+        sites_length_dict = dict()
+        transitions, outputs = self._transitions, self._outputs
+        state = 0
+        for i, base in enumerate(rna_sequence):
+            state = transitions[state].get(base, 0)
+            for length in outputs[state]:
+                start = i - length + 1
+                if length > sites_length_dict.get(start, 0):
+                    sites_length_dict[start] = length
+
+        # leftmost-longest non overlapping editing sites
+        sites_list = []
+        end = 0
+        for start in sorted(sites_length_dict):
+            if start >= end:
+                sites_list.append((start, sites_length_dict[start]))
+                end = start + sites_length_dict[start]
+
+        return sites_list
+
+    def edit(self, rna_sequence):
+        """
+        Replace the editing sites of a RNA sequence with the edited sites.
+        Return the edited RNA sequence, the count of the bases removed with the editing sites
+        and the count of the bases inserted with the edited sites.
+        """
+        edited_list = []
+        sites_count = Counter()
+        end = 0
+        for start, length in self.find(rna_sequence):
+            editing_site = rna_sequence[start:start+length]
+            edited_list.append(rna_sequence[end:start])
+            edited_list.append(self.editing_sites_dict[editing_site])
+            sites_count[editing_site] += 1
+            end = start + length
+        edited_list.append(rna_sequence[end:])
+
+        removed_bases_count, inserted_bases_count = Counter(), Counter()
+        for editing_site, count in sites_count.items():
+            for base, amount in self._removed_bases[editing_site].items():
+                removed_bases_count[base] += amount * count
+            for base, amount in self._inserted_bases[editing_site].items():
+                inserted_bases_count[base] += amount * count
+
+        return ''.join(edited_list), removed_bases_count, inserted_bases_count
+
+    def _build_automaton(self):
+        # trie of the editing sites
+        goto, outputs = [dict()], [[]]
+        for editing_site in self.editing_sites_dict:
+            state = 0
+            for base in editing_site:
+                if base not in goto[state]:
+                    goto.append(dict())
+                    outputs.append([])
+                    goto[state][base] = len(goto) - 1
+                state = goto[state][base]
+            outputs[state].append(len(editing_site))
+
+        # failure links in breadth first order, transitions completed into a deterministic automaton
+        alphabet = set(base for editing_site in self.editing_sites_dict for base in editing_site)
+        fail = [0] * len(goto)
+        transitions = [dict() for _ in goto]
+        queue = deque()
+        for base in alphabet:
+            state = goto[0].get(base, 0)
+            transitions[0][base] = state
+            if state:
+                queue.append(state)
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for base in alphabet:
+                if base in goto[state]:
+                    next_state = goto[state][base]
+                    fail[next_state] = transitions[fail[state]][base]
+                    transitions[state][base] = next_state
+                    queue.append(next_state)
+                else:
+                    transitions[state][base] = transitions[fail[state]][base]
+
+        self._transitions = transitions
+        self._outputs = [tuple(output) for output in outputs]
+        self._removed_bases = {site: Counter(site) for site in self.editing_sites_dict}
+        self._inserted_bases = {site: Counter(edited) for site, edited in self.editing_sites_dict.items()}
@@ -0,0 +1,108 @@
+import numpy as np
+
+class TranscriptionKernel:
+    """
+    Transcription kernel, this class transcribes a whole DNA segment to a RNA sequence with
+    NumPy array operations. The DNA segment is encoded as an uint8 array, the ambiguity symbols
+    are resolved with a lookup table of the allowed bases, the bases are replaced by their
+    complement and the errors of the RNA polymerase are placed with a single binomial draw.
+
+    Parameters
+    ----------
+    symbols_allocations : dict
+        The dictionary with the nucleotide symbol as the key and the list of the bases it
+        can represent as the value.
+    base_complement : dict
+        The dictionary with the DNA base as the key and its RNA complement base as the value.
+    error_rate : float
+        The probability that a base is transcribed with a wrong complement base.
+    random_seed : int
+        The random seed of the kernel.
+
+    Attributes
+    ----------
+    rng : numpy.random.Generator
+        The random generator of the kernel.
+    error_rate : float
+        The probability that a base is transcribed with a wrong complement base.
+
+    Methods
+    -------
+    encode(dna_sequence)
+        Encode a DNA sequence as an array of symbol codes.
+    resolve(dna_sequence)
+        Resolve the ambiguity symbols of a DNA sequence.
+    complement(bases)
+        Return the complement RNA bases, with the transcription errors.
+    transcript(dna_sequence)
+        Transcribe a DNA sequence to a RNA sequence.
+    """
+    def __init__(self, symbols_allocations, base_complement, error_rate, random_seed):
+        self.rng = np.random.default_rng(random_seed)
+        self.error_rate = error_rate
+
+        # bases and complement bases are identified by their index in base_complement
+        bases = list(base_complement.keys())
+        self._complement_bases = np.frombuffer(''.join(base_complement.values()).encode(), dtype=np.uint8)
+
+        # lookup table of the bases each symbol can represent, -1 for unknown symbols
+        symbols = [symbol for symbol, allocations in symbols_allocations.items()
+            if all(base in bases for base in allocations)]
+        max_allocations = max(len(symbols_allocations[symbol]) for symbol in symbols)
+        self._allocations = np.full((256, max_allocations), -1, dtype=np.int8)
+        self._allocations_count = np.zeros(256, dtype=np.int8)
+        for symbol in symbols:
+            allocations = [bases.index(base) for base in symbols_allocations[symbol]]
+            self._allocations[ord(symbol), :len(allocations)] = allocations
+            self._allocations_count[ord(symbol)] = len(allocations)
+
+    def encode(self, dna_sequence):
+        """
+        Encode a DNA sequence as an uint8 array of symbol codes.
+        """
+        return np.frombuffer(dna_sequence.encode('ascii'), dtype=np.uint8)
+
+    def resolve(self, dna_sequence):
+        """
+        Resolve the ambiguity symbols of a DNA sequence, each symbol is replaced by one of the
+        bases it represents chosen uniformly at random. Return the array of the bases indexes.
+        """
+        codes = self.encode(dna_sequence)
+        allocations_count = self._allocations_count[codes]
+
+        if np.any(allocations_count == 0):
+            raise KeyError(chr(codes[np.argmax(allocations_count == 0)]))
+
+        bases = self._allocations[codes, 0]
+        ambiguous = np.flatnonzero(allocations_count > 1)
+        if len(ambiguous) > 0:
+            choices = (self.rng.random(len(ambiguous)) * allocations_count[ambiguous]).astype(np.int8)
+            bases[ambiguous] = self._allocations[codes[ambiguous], choices]
+
+        return bases
+
+    def complement(self, bases):
+        """
+        Return the indexes of the complement RNA bases of an array of bases indexes.
+        Each base is replaced by one of the other complement bases with probability error_rate.
+        """
+        complement = bases.copy()
+
+        # number of errors in the segment, then their positions
+        errors_count = self.rng.binomial(len(complement), self.error_rate)
+        if errors_count > 0:
+            positions = self.rng.choice(len(complement), size=errors_count, replace=False)
+            shifts = self.rng.integers(1, len(self._complement_bases), size=errors_count)
+            complement[positions] = (complement[positions] + shifts) % len(self._complement_bases)
+
+        return complement
+
+    def transcript(self, dna_sequence):
+        """
+        Transcribe a DNA sequence to a RNA sequence.
+        """
+        if len(dna_sequence) == 0:
+            return ''
+
+        complement = self.complement(self.resolve(dna_sequence))
+        return self._complement_bases.take(complement).tobytes().decode('ascii')
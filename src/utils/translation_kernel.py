@@ -0,0 +1,113 @@
+import numpy as np
+
+RNA_BASES = 'UCAG' # order of the bases in the codon index
+STOP_CODON_NAME = 'STOP'
+STOP_SYMBOL = '*'
+UNKNOWN_SYMBOL = 'X'
+UNKNOWN_AMINOACID = 'Xaa'
+
+class TranslationKernel:
+    """
+    Translation kernel, this class translates a mRNA sequence to a polypeptides chain with a
+    precompiled integer codon table. Each codon is encoded as an integer between 0 and 63, and
+    the codons are translated by array indexing up to the first stop codon. Codons with bases
+    other than U, C, A, G are encoded as 64 and translated as an unknown amino acid.
+
+    Parameters
+    ----------
+    codons_dict : dict
+        The dictionary with the codon as the key and the three-letter amino acid as the value,
+        'STOP' for the stop codons.
+    peptides_dict : dict
+        The dictionary with the three-letter amino acid as the key and the one-letter amino
+        acid as the value.
+
+    Attributes
+    ----------
+    codons : list
+        The list of the codons, ordered by their index.
+
+    Methods
+    -------
+    encode(mrna_sequence)
+        Encode a mRNA sequence as an array of codon indexes.
+    translate(codons)
+        Translate an array of codon indexes up to the first stop codon.
+    mutate(polypeptides_chain, error_rate, rng)
+        Replace the amino acids of a polypeptides chain with decoding errors.
+    three_letter(polypeptides_chain)
+        Return the three-letter name of a one-letter polypeptides chain.
+    """
+    def __init__(self, codons_dict, peptides_dict):
+        self.codons = [a + b + c for a in RNA_BASES for b in RNA_BASES for c in RNA_BASES]
+
+        # base code for each byte, 4 for the bases that are not in RNA_BASES
+        self._bases_codes = np.full(256, len(RNA_BASES), dtype=np.int64)
+        for i, base in enumerate(RNA_BASES):
+            self._bases_codes[ord(base)] = i
+
+        # one-letter amino acid of each codon index, the last one for the unknown codons
+        self._codons_table = np.full(len(self.codons) + 1, ord(UNKNOWN_SYMBOL), dtype=np.uint8)
+        for i, codon in enumerate(self.codons):
+            aminoacid = codons_dict[codon]
+            self._codons_table[i] = ord(STOP_SYMBOL if aminoacid == STOP_CODON_NAME else peptides_dict[aminoacid])
+
+        # amino acids of the sense codons, a decoding error reads the amino acid of a random sense codon
+        self._sense_aminoacids = self._codons_table[:len(self.codons)][
+            self._codons_table[:len(self.codons)] != ord(STOP_SYMBOL)]
+
+        self._three_letter_dict = {letter: aminoacid for aminoacid, letter in peptides_dict.items() if letter}
+        self._three_letter_dict[UNKNOWN_SYMBOL] = UNKNOWN_AMINOACID
+
+    def encode(self, mrna_sequence):
+        """
+        Encode the complete codons of a mRNA sequence as an array of integer codon indexes.
+        """
+        bases = self._bases_codes[np.frombuffer(mrna_sequence.encode('ascii'), dtype=np.uint8)]
+        bases = bases[:len(bases) - len(bases) % 3].reshape(-1, 3)
+
+        codons = bases[:, 0] * 16 + bases[:, 1] * 4 + bases[:, 2]
+        codons[(bases == len(RNA_BASES)).any(axis=1)] = len(self.codons)
+        return codons.astype(np.uint8)
+
+    def translate(self, codons):
+        """
+        Translate an array of codon indexes to a one-letter polypeptides chain, up to the first
+        stop codon excluded.
+        """
+        aminoacids = self._codons_table[codons]
+        stop = np.flatnonzero(aminoacids == ord(STOP_SYMBOL))
+        if len(stop) > 0:
+            aminoacids = aminoacids[:stop[0]]
+
+        return aminoacids.tobytes().decode('ascii')
+
+    def mutate(self, polypeptides_chain, error_rate, rng):
+        """
+        Replace each amino acid of a polypeptides chain, with probability error_rate, with a
+        different amino acid read from a random sense codon. The number of errors is drawn
+        once for the whole chain.
+        """
+        errors_count = rng.binomial(len(polypeptides_chain), error_rate)
+        if errors_count == 0:
+            return polypeptides_chain
+
+        aminoacids = np.frombuffer(polypeptides_chain.encode('ascii'), dtype=np.uint8).copy()
+        positions = rng.choice(len(aminoacids), size=errors_count, replace=False)
+
+        # draw the wrong amino acids, again for the ones equal to the correct amino acid
+        mutations = rng.choice(self._sense_aminoacids, size=errors_count)
+        unchanged = np.flatnonzero(mutations == aminoacids[positions])
+        while len(unchanged) > 0:
+            mutations[unchanged] = rng.choice(self._sense_aminoacids, size=len(unchanged))
+            unchanged = unchanged[mutations[unchanged] == aminoacids[positions[unchanged]]]
+        aminoacids[positions] = mutations
+
+        return aminoacids.tobytes().decode('ascii')
+
+    def three_letter(self, polypeptides_chain):
+        """
+        Return the three-letter name of a one-letter polypeptides chain.
+        """
+        return ''.join([self._three_letter_dict.get(aminoacid, UNKNOWN_AMINOACID)
+            for aminoacid in polypeptides_chain])
@@ -6,7 +6,11 @@ class EukaryoticCellVariables:
     Attributes
     ----------
     dna_sequence : str
-        The DNA
+        The DNA sequence, fetched from dna_sequences by sequence_id when it is not set
+    sequence_id : int
+        Row of the DNA sequence in the dataset of DNA sequences
+    dna_sequences : numpy.ndarray
+        The DNA sequences of the dataset
     sequence_count : int
         Counter of the DNA sequence currently being processed
     dna_sequences_to_transcript_list : list
@@ -40,12 +44,12 @@ class EukaryoticCellVariables:
         List of polypeptides chains extended name
     proteins_sintetized: list
         List of number of polypeptides chains sintetized for each mRNA sequence
+    translation_cache: dict
+        Dictionary of the translation of each mRNA sequence, computed by the first ribosome
+        and reused by the following ones until the mRNA sequence is degraded
     transcription_queue: list
         List of simpy processes for the transcription, 
         this list is used to store and relase the simpy processes for each mRNA sequence
-    complement_base_queue_dict: dict
-        Dictionary of list of simpy processes for each complement base,
-        this dictionary is used to store and relase the simpy processes
     polyadenylation_queue: list
         List of simpy processes for the polyadenylation, 
         this list is used to store and relase the simpy processes for each mRNA sequence
@@ -67,6 +71,8 @@ class EukaryoticCellVariables:
     def __init__(self):
         # input variables
         self.dna_sequence = None # template strand (3' to 5' direction)
+        self.sequence_id = None
+        self.dna_sequences = None
 
         # intermediate variables
         self.sequence_count = None
@@ -93,10 +99,10 @@ class EukaryoticCellVariables:
         self.proteins_list = None # polypeptides chains
         self.proteins_extended_name_list = None
         self.proteins_sintetized = None
+        self.translation_cache = dict()
         
         # simulation variables: list of simpy processes
         self.transcription_queue = []
-        self.complement_base_queue_dict = dict()
         self.polyadenylation_queue = []
         self.translation_queue = []
 
@@ -110,6 +116,16 @@ class EukaryoticCellVariables:
         self.proteins_sintetized = [0] * len(self.dna_sequences_to_transcript_list)
         self.mrna_degradation_rate = [1e-4] * len(self.dna_sequences_to_transcript_list)
 
+    @property
+    def dna_sequence(self):
+        if self._dna_sequence is None and self.sequence_id is not None:
+            return self.dna_sequences[self.sequence_id] # fetched only when needed
+        return self._dna_sequence
+
+    @dna_sequence.setter
+    def dna_sequence(self, dna_sequence):
+        self._dna_sequence = dna_sequence
+
     def get_dna(self):
         return self.dna_sequence
     